@@ -1,35 +1,32 @@
 import streamlit as st
 
+from electromagnetismo.recursos import miniatura
+
 st.set_page_config(
     page_title="Laboratorio Virtual de Electromagnetismo",
     page_icon="⚡",
     layout="wide"
 )
 
-st.sidebar.image(
-    "https://raw.githubusercontent.com/Jmontoyaor/Computational-electromagnetics/main/Imagenes/Propela_logo.png",
-    use_container_width=True
-)
+st.sidebar.image(miniatura("Propela_logo.png"), width="stretch")
 
 custom_css = """
 <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;700&display=swap');
-
     .stApp {
         background-color: #0e1a40; /* Fondo de la app */
         color: #E0E0E0; /* Texto principal */
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     h1, h2, h3 {
         color: #00BFFF; /* Títulos */
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     section[data-testid="stSidebar"] {
         background-color: #222f5b !important; /* Sidebar */
         border-radius: 10px;
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     section[data-testid="stSidebar"] * {
@@ -56,8 +53,8 @@ no solo realice cálculos, sino que también comprenda a fondo los principios qu
 col1, col2, col3 = st.columns([1, 2, 1])  # proporción para centrar
 with col2:
     st.image(
-        "https://github.com/Jmontoyaor/Computational-electromagnetics/blob/main/Imagenes/Background%20(2).png?raw=true",
-        use_container_width=True,
+        miniatura("Background (2).png"),
+        width="stretch",
         caption="Ilustración conceptual de un campo electromagnético"
     )
 
@@ -0,0 +1,77 @@
+"""Evaluaciones y error del muestreo adaptativo frente a mallas uniformes.
+
+El potencial de unas cargas se remuestrea sobre una malla fina de
+referencia y se compara con el valor exacto: error máximo (lejos de las
+cargas, relativo a la escala de las equipotenciales) y fracción de píxeles
+que caen en otra banda de potencial que en la referencia.
+
+Uso:
+    python benchmarks/adaptativo.py --cargas 3 --referencia 800
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.adaptativo import MuestreoAdaptativo  # noqa: E402
+from electromagnetismo.electrostatica import campo_electrico_malla  # noqa: E402
+from electromagnetismo.escenarios import niveles_equipotenciales  # noqa: E402
+
+LIMITES = (-6, 6, -6, 6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cargas", type=int, default=3)
+    parser.add_argument("--referencia", type=int, default=800,
+                        help="puntos por lado de la malla de referencia")
+    parser.add_argument("--tolerancias", type=float, nargs="+", default=[0.005, 0.01, 0.02])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    posiciones = rng.uniform(-4, 4, (args.cargas, 2))
+    cargas = rng.choice([-1, 1], args.cargas) * rng.uniform(0.5, 2, args.cargas) * 1e-9
+
+    def potencial(x, y):
+        return campo_electrico_malla(posiciones, cargas, x, y, potencial=True)[2]
+
+    x = np.linspace(LIMITES[0], LIMITES[1], args.referencia)
+    X, Y = np.meshgrid(x, x)
+    referencia = potencial(X, Y)
+    niveles = niveles_equipotenciales(referencia)
+    escala = niveles[-1]
+    bandas = np.digitize(referencia, niveles)
+    distancia = np.min(np.hypot(X[..., None] - posiciones[:, 0],
+                                Y[..., None] - posiciones[:, 1]), axis=-1)
+    lejos = distancia > 0.1
+
+    print(f"{args.cargas} cargas, referencia {args.referencia}x{args.referencia}")
+    print(f"{'muestreo':>22} {'evaluaciones':>13} {'tiempo (ms)':>12} "
+          f"{'error máx.':>11} {'bandas mal':>11}")
+
+    def informar(nombre, crear):
+        inicio = time.perf_counter()
+        muestreo = crear()
+        valores = muestreo.remuestrear(X, Y)
+        tiempo = time.perf_counter() - inicio
+        error = np.abs(valores - referencia)[lejos].max() / escala
+        mal = np.mean(np.digitize(valores, niveles)[lejos] != bandas[lejos])
+        print(f"{nombre:>22} {muestreo.evaluaciones:>13} {tiempo * 1e3:>12.0f} "
+              f"{error:>11.2e} {mal:>11.2%}")
+
+    # Una malla uniforme de 2**k celdas por lado es el quadtree sin refinar
+    for nivel in range(5, 10):
+        informar(f"uniforme {2**nivel + 1}²",
+                 lambda: MuestreoAdaptativo(potencial, LIMITES, nivel, nivel))
+    for tolerancia in args.tolerancias:
+        informar(f"adaptativo tol={tolerancia:g}",
+                 lambda: MuestreoAdaptativo(potencial, LIMITES, nivel_min=3, nivel_max=9,
+                                            tolerancia=tolerancia))
+
+
+if __name__ == "__main__":
+    main()
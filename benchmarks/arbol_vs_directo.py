@@ -0,0 +1,76 @@
+"""Compara la suma directa con el árbol de Barnes–Hut y estima el cruce.
+
+Uso:
+    python benchmarks/arbol_vs_directo.py --malla 100 --theta 0.5 --orden 2
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.arbol import ArbolCargas  # noqa: E402
+from electromagnetismo.electrostatica import campo_electrico_malla  # noqa: E402
+
+
+def cronometrar(funcion, repeticiones=3):
+    mejor = np.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--malla", type=int, default=100,
+                        help="puntos por lado de la malla de evaluación")
+    parser.add_argument("--theta", type=float, default=0.5)
+    parser.add_argument("--orden", type=int, default=2, choices=(0, 1, 2))
+    parser.add_argument("--tamanos", type=int, nargs="+",
+                        default=[100, 300, 1000, 3000, 10000, 30000, 100000])
+    parser.add_argument("--max-directo", type=int, default=30000,
+                        help="no ejecutar la suma directa por encima de este N")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(-6, 6, args.malla)
+    X, Y = np.meshgrid(x, x)
+
+    print(f"Malla {args.malla}x{args.malla}, theta={args.theta}, orden={args.orden}")
+    print(f"{'N':>8} {'directo (s)':>12} {'árbol (s)':>10} {'construir (s)':>14} {'error E':>10}")
+    cruce = None
+    hubo_directo = False
+    for n in args.tamanos:
+        posiciones = rng.normal(scale=2.0, size=(n, 2))
+        cargas = rng.uniform(-1, 1, n) * 1e-9
+
+        t_construir, arbol = cronometrar(
+            lambda: ArbolCargas(posiciones, cargas, orden=args.orden), 1)
+        t_arbol, aprox = cronometrar(lambda: arbol.evaluar(X, Y, theta=args.theta))
+        t_arbol += t_construir
+
+        if n <= args.max_directo:
+            t_directo, exacto = cronometrar(
+                lambda: campo_electrico_malla(posiciones, cargas, X, Y))
+            norma = np.hypot(*exacto)
+            hubo_directo = True
+            error = np.median(np.hypot(aprox[0] - exacto[0], aprox[1] - exacto[1]) / norma)
+            if cruce is None and t_arbol < t_directo:
+                cruce = n
+            print(f"{n:>8} {t_directo:>12.4f} {t_arbol:>10.4f} {t_construir:>14.4f} {error:>10.2e}")
+        else:
+            print(f"{n:>8} {'-':>12} {t_arbol:>10.4f} {t_construir:>14.4f} {'-':>10}")
+
+    if hubo_directo and cruce is None:
+        print("El árbol no superó a la suma directa en los tamaños probados.")
+    elif hubo_directo:
+        print(f"El árbol es más rápido a partir de N ≈ {cruce} cargas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Arranque en frío y en caliente del servidor.
+
+Para cada modo (EM_CALENTAR=0 y EM_CALENTAR=1) y cada página se arranca
+`streamlit run servidor.py` con un almacén en disco vacío, se mide el
+tiempo hasta que /_stcore/health responde y se abre la página desde una
+sesión nueva: se informa la latencia de la primera ejecución (la página de
+inicio) y la de la página. Cada servidor atiende una sola página, para que
+ninguna aproveche lo que importó o calculó la anterior.
+
+Uso:
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --paginas B C --repeticiones 3 --salida arranque.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import websockets
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from carga import Sesion, arrancar_servidor, puerto_libre  # noqa: E402
+
+MODOS = {"frio": "0", "caliente": "1"}
+
+
+async def primera_visita(url, pagina):
+    """Latencias (s) de la primera ejecución de una sesión y de la página."""
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        sesion = Sesion(ws, np.random.default_rng(0))
+        inicio = await sesion.ejecutar()
+        return inicio, await sesion.abrir(pagina), sesion.errores
+
+
+def medir(modo, pagina):
+    puerto = puerto_libre()
+    inicio = time.perf_counter()
+    servidor = arrancar_servidor(puerto, tempfile.mkdtemp(prefix="em-arranque-"),
+                                 script="servidor.py",
+                                 variables={"EM_CALENTAR": MODOS[modo]})
+    arranque = time.perf_counter() - inicio
+    try:
+        primera, visita, errores = asyncio.run(
+            primera_visita(f"ws://localhost:{puerto}/_stcore/stream", pagina))
+    finally:
+        servidor.terminate()
+        servidor.wait()
+    return {"arranque_s": arranque, "primera_ms": primera * 1e3, "pagina_ms": visita * 1e3,
+            "errores": errores}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", nargs="+", default=["A", "B", "C"],
+                        help="inicio del nombre de cada página que se prueba")
+    parser.add_argument("--repeticiones", type=int, default=1,
+                        help="arranques por modo y página (se informa la mediana)")
+    parser.add_argument("--salida", help="archivo JSON para los resultados")
+    args = parser.parse_args()
+
+    print(f"{'modo':>9} {'página':>7} {'arranque (s)':>13} {'1.ª ejecución (ms)':>19} "
+          f"{'página (ms)':>12}")
+    resultados = {}
+    for modo in MODOS:
+        for pagina in args.paginas:
+            corridas = [medir(modo, pagina) for _ in range(args.repeticiones)]
+            r = {medida: float(np.median([c[medida] for c in corridas]))
+                 for medida in ("arranque_s", "primera_ms", "pagina_ms")}
+            r["errores"] = sorted({e for c in corridas for e in c["errores"]})
+            resultados[f"{modo}/{pagina}"] = r
+            print(f"{modo:>9} {pagina:>7} {r['arranque_s']:>13.2f} {r['primera_ms']:>19.0f} "
+                  f"{r['pagina_ms']:>12.0f}")
+            for error in r["errores"]:
+                print(f"{'':>17} error: {error}")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({"parametros": vars(args), "resultados": resultados}, archivo,
+                      indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Tiempo del motor de Biot–Savart por segmentos frente al número de segmentos.
+
+Uso:
+    python benchmarks/biot_savart.py --malla 200 --segmentos 10 100 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.magnetostatica import (  # noqa: E402
+    MU0, campo_b_segmentos, espira_poligonal, segmentos_polilinea)
+
+
+def cronometrar(funcion, repeticiones=3):
+    mejor = np.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--malla", type=int, default=200,
+                        help="puntos por lado de la malla de evaluación")
+    parser.add_argument("--segmentos", type=int, nargs="+",
+                        default=[10, 100, 300, 1000, 3000])
+    args = parser.parse_args()
+
+    x = np.linspace(-5, 5, args.malla)
+    X, Y = np.meshgrid(x, x)
+    # Puntos sobre el eje de una espira de radio 1: comparación con la
+    # expresión exacta B = μ0 I a² / (2 (a² + x²)^(3/2))
+    eje = np.linspace(-3, 3, 101)
+
+    print(f"Malla {args.malla}x{args.malla} (espira de N lados, corte z = 0)")
+    print(f"{'N':>8} {'tiempo (s)':>11} {'ns/par':>8} {'error eje':>10}")
+    for n in args.segmentos:
+        inicios, finales = segmentos_polilinea(espira_poligonal(1.0, n, normal="x"),
+                                               cerrada=True)
+        corrientes = np.ones(n)
+        tiempo, _ = cronometrar(
+            lambda: campo_b_segmentos(corrientes, inicios, finales, X, Y))
+        Bx, _, _ = campo_b_segmentos(corrientes, inicios, finales, eje, np.zeros_like(eje))
+        exacto = MU0 / (2 * (1 + eje**2)**1.5)
+        error = np.abs(Bx - exacto).max() / exacto.max()
+        print(f"{n:>8} {tiempo:>11.4f} {tiempo / (n * X.size) * 1e9:>8.2f} {error:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
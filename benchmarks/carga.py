@@ -0,0 +1,270 @@
+"""Prueba de carga: N sesiones simultáneas contra un servidor local.
+
+Cada sesión se conecta por websocket como lo haría el navegador, abre una
+página y la usa como un estudiante: mueve sliders al azar en pequeños
+pasos (una caminata aleatoria reproducible a partir de --semilla) o, en el
+quiz, elige una opción y pasa a la siguiente pregunta. Entre una acción y
+otra espera un tiempo aleatorio (--pausa) y nunca envía una acción
+mientras la anterior sigue ejecutándose.
+
+Las páginas se prueban una tras otra, con todas las sesiones en la misma
+página a la vez (una clase entera siguiendo la misma guía). Para cada una
+se informan los percentiles 50/95/99 de la latencia de las ejecuciones
+(desde que se envía la acción hasta que llega script_finished), el
+rendimiento (ejecuciones por segundo) y la memoria residente máxima del
+servidor.
+
+Por defecto se arranca un servidor propio con un almacén en disco vacío;
+con --url se usa uno que ya esté corriendo (y --pid para medir su memoria).
+
+Uso:
+    python benchmarks/carga.py --sesiones 30 --acciones 20
+    python benchmarks/carga.py --url http://localhost:8501 --pid 1234 --paginas B C
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.Slider_pb2 import Slider
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def memoria_residente(pid):
+    """Memoria residente de un proceso en MB (Linux)."""
+    with open(f"/proc/{pid}/statm") as archivo:
+        return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def arrancar_servidor(puerto, almacen, script="Introducción.py", variables=None):
+    """Lanza `streamlit run <script>` (con las variables de entorno dadas)
+    y espera a que responda."""
+    entorno = dict(os.environ, EM_ALMACEN_DIR=almacen, **(variables or {}))
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script,
+         "--server.headless", "true", "--server.port", str(puerto),
+         "--browser.gatherUsageStats", "false"],
+        cwd=RAIZ, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(300):
+        try:
+            with urllib.request.urlopen(f"http://localhost:{puerto}/_stcore/health", timeout=1):
+                return proceso
+        except OSError:
+            if proceso.poll() is not None:
+                raise RuntimeError("El servidor de Streamlit terminó al arrancar")
+            time.sleep(0.1)
+    proceso.terminate()
+    raise RuntimeError("El servidor de Streamlit no respondió en 30 s")
+
+
+class Sesion:
+    """Una sesión de navegador simulada sobre el websocket de Streamlit."""
+
+    def __init__(self, ws, rng):
+        self.ws = ws
+        self.rng = rng
+        self.widgets = {}   # id -> (tipo, proto, fragment_id)
+        self.estados = {}   # id -> WidgetState que se reenvía en cada ejecución
+        self.paginas = {}   # nombre -> page_script_hash
+        self.pagina = ""
+        self._indices = {}  # opción actual de cada select_slider
+        self.errores = []  # mensajes de las excepciones que mostró la página
+
+    async def ejecutar(self, disparador=None, fragmento=""):
+        """Envía una ejecución con el estado actual de los widgets (y un
+        botón pulsado, si se da) y espera a que termine. Devuelve la
+        latencia en segundos."""
+        mensaje = BackMsg()
+        estado_cliente = mensaje.rerun_script
+        estado_cliente.page_script_hash = self.pagina
+        estado_cliente.fragment_id = fragmento
+        for estado in self.estados.values():
+            estado_cliente.widget_states.widgets.append(estado)
+        if disparador is not None:
+            estado_cliente.widget_states.widgets.append(
+                WidgetState(id=disparador, trigger_value=True))
+
+        inicio = time.perf_counter()
+        await self.ws.send(mensaje.SerializeToString())
+        if not fragmento:
+            self.widgets.clear()
+        while True:
+            recibido = ForwardMsg()
+            recibido.ParseFromString(await self.ws.recv())
+            tipo = recibido.WhichOneof("type")
+            if tipo == "script_finished":
+                # Un st.rerun() en la página termina esta ejecución y empieza otra
+                if recibido.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    self.widgets.clear()
+                    continue
+                return time.perf_counter() - inicio
+            if tipo == "navigation":
+                self.paginas = {p.page_name: p.page_script_hash
+                                for p in recibido.navigation.app_pages}
+            elif tipo == "delta" and recibido.delta.HasField("new_element"):
+                elemento = recibido.delta.new_element
+                clase = elemento.WhichOneof("type")
+                if clase == "exception":
+                    self.errores.append(elemento.exception.message)
+                elif clase in ("slider", "radio", "button"):
+                    proto = getattr(elemento, clase)
+                    self.widgets[proto.id] = (clase, proto, recibido.delta.fragment_id)
+
+    async def abrir(self, nombre):
+        """Abre la página cuyo nombre empieza por `nombre` (A, B, ...)."""
+        if not self.paginas:
+            # La primera ejecución de la sesión trae la lista de páginas
+            await self.ejecutar()
+        coincidencias = [h for p, h in self.paginas.items() if p.startswith(nombre)]
+        if not coincidencias:
+            raise ValueError(f"No hay una página que empiece por {nombre!r}")
+        self.pagina = coincidencias[0]
+        self.estados.clear()
+        self._indices.clear()
+        return await self.ejecutar()
+
+    async def accion(self):
+        """Una acción al azar del usuario; devuelve su latencia."""
+        sliders = [w for w in self.widgets.items() if w[1][0] == "slider"]
+        if sliders:
+            return await self._mover_slider(sliders)
+        return await self._responder_quiz()
+
+    async def _mover_slider(self, sliders):
+        identificador, (_, slider, fragmento) = sliders[self.rng.integers(len(sliders))]
+        # Caminata aleatoria de 1 a 3 pasos del slider
+        pasos = self.rng.choice([-3, -2, -1, 1, 2, 3])
+        estado = WidgetState(id=identificador)
+        if slider.type == Slider.SELECT_SLIDER:
+            # select_slider: se mueve por el índice de la opción y se envía su texto
+            actual = self._indices.get(identificador, (slider.value or slider.default)[0])
+            indice = int(np.clip(actual + pasos, 0, len(slider.options) - 1))
+            self._indices[identificador] = indice
+            estado.string_array_value.data.append(slider.options[indice])
+        else:
+            actual = self.estados[identificador].double_array_value.data[0] \
+                if identificador in self.estados else (slider.value or slider.default)[0]
+            paso = slider.step or (slider.max - slider.min) / 100
+            estado.double_array_value.data.append(
+                float(np.clip(actual + paso * pasos, slider.min, slider.max)))
+        self.estados[identificador] = estado
+        return await self.ejecutar(fragmento=fragmento)
+
+    async def _responder_quiz(self):
+        botones = {proto.label: i for i, (clase, proto, _) in self.widgets.items()
+                   if clase == "button"}
+        for identificador, (clase, radio, _) in self.widgets.items():
+            if clase == "radio":
+                opcion = radio.options[self.rng.integers(len(radio.options))]
+                self.estados[identificador] = WidgetState(id=identificador, string_value=opcion)
+        siguiente = next((i for etiqueta, i in botones.items()
+                          if "Siguiente" in etiqueta or "Reiniciar" in etiqueta), None)
+        return await self.ejecutar(disparador=siguiente)
+
+
+async def usuario(url, pagina, acciones, pausa, semilla, latencias, sesiones):
+    rng = np.random.default_rng(semilla)
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        sesion = Sesion(ws, rng)
+        sesiones.append(sesion)
+        latencias.append(await sesion.abrir(pagina))
+        for _ in range(acciones):
+            await asyncio.sleep(rng.exponential(pausa))
+            latencias.append(await sesion.accion())
+
+
+async def probar_pagina(url, pagina, args, pid):
+    latencias, sesiones = [], []
+    memoria = [memoria_residente(pid)] if pid else []
+
+    async def muestrear():
+        while True:
+            await asyncio.sleep(0.1)
+            memoria.append(memoria_residente(pid))
+
+    muestreo = asyncio.create_task(muestrear()) if pid else None
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        usuario(url, pagina, args.acciones, args.pausa, [args.semilla, i], latencias, sesiones)
+        for i in range(args.sesiones)))
+    duracion = time.perf_counter() - inicio
+    if muestreo:
+        muestreo.cancel()
+    t = np.array(latencias) * 1e3
+    return {"sesiones": args.sesiones, "ejecuciones": len(t),
+            "p50_ms": float(np.percentile(t, 50)), "p95_ms": float(np.percentile(t, 95)),
+            "p99_ms": float(np.percentile(t, 99)), "max_ms": float(t.max()),
+            "ejecuciones_por_s": len(t) / duracion,
+            "rss_max_mb": max(memoria) if memoria else None,
+            "errores": sorted({e for s in sesiones for e in s.errores})}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sesiones", type=int, default=20)
+    parser.add_argument("--acciones", type=int, default=20,
+                        help="acciones de cada sesión después de abrir la página")
+    parser.add_argument("--pausa", type=float, default=0.5,
+                        help="tiempo medio entre acciones de una sesión (s)")
+    parser.add_argument("--paginas", nargs="+", default=["Introducción", "A", "B", "C", "D"],
+                        help="inicio del nombre de cada página que se prueba")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--url", help="servidor ya en marcha (por defecto se arranca uno)")
+    parser.add_argument("--pid", type=int, help="proceso del servidor de --url, para la memoria")
+    parser.add_argument("--salida", help="archivo JSON para los resultados")
+    args = parser.parse_args()
+
+    servidor = None
+    if args.url:
+        base, pid = args.url.rstrip("/"), args.pid
+    else:
+        puerto = puerto_libre()
+        servidor = arrancar_servidor(puerto, tempfile.mkdtemp(prefix="em-carga-"))
+        base, pid = f"http://localhost:{puerto}", servidor.pid
+    url = base.replace("http", "ws", 1) + "/_stcore/stream"
+
+    print(f"{args.sesiones} sesiones, {args.acciones} acciones cada una, "
+          f"pausa media {args.pausa} s, {os.cpu_count()} núcleos")
+    print(f"{'página':>14} {'ejec.':>6} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} "
+          f"{'ejec./s':>8} {'RSS máx. (MB)':>14} {'errores':>8}")
+    resultados = {}
+    try:
+        for pagina in args.paginas:
+            r = asyncio.run(probar_pagina(url, pagina, args, pid))
+            resultados[pagina] = r
+            rss = f"{r['rss_max_mb']:.0f}" if r["rss_max_mb"] else "-"
+            print(f"{pagina:>14} {r['ejecuciones']:>6} {r['p50_ms']:>9.0f} {r['p95_ms']:>9.0f} "
+                  f"{r['p99_ms']:>9.0f} {r['ejecuciones_por_s']:>8.1f} {rss:>14} "
+                  f"{len(r['errores']):>8}")
+            for error in r["errores"]:
+                print(f"{'':>14} error: {error}")
+    finally:
+        if servidor:
+            servidor.terminate()
+            servidor.wait()
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({"parametros": vars(args), "resultados": resultados}, archivo,
+                      indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
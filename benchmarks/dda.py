@@ -0,0 +1,57 @@
+"""DDA de una esfera frente al número de dipolos: tiempo, productos G P,
+memoria y error de la eficiencia de extinción respecto de Mie.
+
+La esfera tiene parámetro de tamaño x = ka fijo; al aumentar los dipolos
+baja kd y el error de la DDA. La memoria es el máximo residente del proceso
+(crece con la red, O(N), no con N²).
+
+Uso:
+    python benchmarks/dda.py
+    python benchmarks/dda.py --diametros 20 60 124 --dtype complex64 --x 3 --m 1.33
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.dipolos import DDA, esfera, mie  # noqa: E402
+
+LONGITUD_ONDA = 500e-9  # m
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--diametros", type=int, nargs="+", default=[16, 24, 32, 46, 58],
+                        help="dipolos en el diámetro de la esfera")
+    parser.add_argument("--x", type=float, default=2.0, help="parámetro de tamaño ka")
+    parser.add_argument("--m", type=complex, default=1.5, help="índice de refracción")
+    parser.add_argument("--metodo", default="bicgstab", choices=["bicgstab", "gmres"])
+    parser.add_argument("--tolerancia", type=float, default=1e-5)
+    parser.add_argument("--dtype", default="complex128", choices=["complex64", "complex128"])
+    args = parser.parse_args()
+
+    k = 2 * np.pi / LONGITUD_ONDA
+    q_mie = mie(args.m, args.x)[0]
+    print(f"Esfera x = {args.x}, m = {args.m}: Q_ext de Mie = {q_mie:.5f}")
+    print(f"{'dipolos':>10} {'kd':>6} {'tiempo (s)':>11} {'productos':>10} {'Q_ext':>9} "
+          f"{'error':>9} {'MB':>8}")
+    for n in args.diametros:
+        ocupacion = esfera(n)
+        d = args.x / k * (4 * np.pi / (3 * ocupacion.sum()))**(1 / 3)
+        inicio = time.perf_counter()
+        dda = DDA(ocupacion, d, LONGITUD_ONDA, args.m**2, dtype=args.dtype)
+        dda.resolver(args.metodo, args.tolerancia)
+        tiempo = time.perf_counter() - inicio
+        q = dda.secciones()["Q_extincion"]
+        memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{dda.n:>10,} {k * d:>6.3f} {tiempo:>11.2f} {dda.productos:>10} {q:>9.5f} "
+              f"{abs(q - q_mie) / q_mie:>9.2e} {memoria:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
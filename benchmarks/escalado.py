@@ -0,0 +1,70 @@
+"""Escalado de la evaluación por teselas con el número de trabajadores.
+
+Uso:
+    python benchmarks/escalado.py --malla 1000 --cargas 50 --trabajadores 1 2 4 8
+"""
+import argparse
+import functools
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.electrostatica import campo_electrico_malla  # noqa: E402
+from electromagnetismo.magnetostatica import campo_b_segmentos  # noqa: E402
+from electromagnetismo.paralelo import cerrar_ejecutores, evaluar_en_teselas  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--malla", type=int, default=1000,
+                        help="puntos por lado de la malla de evaluación")
+    parser.add_argument("--cargas", type=int, default=50)
+    parser.add_argument("--segmentos", type=int, default=50)
+    parser.add_argument("--trabajadores", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--tipo", nargs="+", default=["hilos", "procesos"],
+                        choices=["hilos", "procesos"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(-6, 6, args.malla)
+    X, Y = np.meshgrid(x, x)
+    posiciones = rng.uniform(-5, 5, (args.cargas, 2))
+    cargas = rng.uniform(-1, 1, args.cargas) * 1e-9
+    inicios = rng.uniform(-5, 5, (args.segmentos, 3))
+    finales = inicios + rng.normal(scale=0.5, size=(args.segmentos, 3))
+    corrientes = rng.uniform(-5, 5, args.segmentos)
+    kernels = {
+        "E, φ": functools.partial(campo_electrico_malla, posiciones, cargas, potencial=True),
+        "B seg.": functools.partial(campo_b_segmentos, corrientes, inicios, finales),
+    }
+
+    print(f"Malla {args.malla}x{args.malla}, {args.cargas} cargas, "
+          f"{args.segmentos} segmentos, {os.cpu_count()} núcleos")
+    print(f"{'kernel':>8} {'tipo':>9} {'trab.':>6} {'tiempo (s)':>11} "
+          f"{'acelera':>8} {'idéntico':>9}")
+    for nombre, kernel in kernels.items():
+        referencia, t_uno = None, None
+        for tipo in args.tipo:
+            for trabajadores in args.trabajadores:
+                # Una primera llamada con teselas diminutas arranca los trabajadores
+                evaluar_en_teselas(kernel, X[:1, :4 * trabajadores], Y[:1, :4 * trabajadores],
+                                   trabajadores=trabajadores, tipo=tipo, puntos_por_tesela=1)
+                inicio = time.perf_counter()
+                resultado = evaluar_en_teselas(kernel, X, Y, trabajadores=trabajadores,
+                                               tipo=tipo)
+                tiempo = time.perf_counter() - inicio
+                if referencia is None:
+                    referencia, t_uno = resultado, tiempo
+                identico = all(np.array_equal(r, ref) for r, ref in zip(resultado, referencia))
+                print(f"{nombre:>8} {tipo:>9} {trabajadores:>6} {tiempo:>11.3f} "
+                      f"{t_uno / tiempo:>8.2f} {'sí' if identico else 'NO':>9}")
+    cerrar_ejecutores()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Tiempo del trazado de líneas de campo de la página B (RK4 y RK45).
+
+Uso:
+    python benchmarks/lineas.py --lineas 100 500 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.electrostatica import campo_electrico_malla  # noqa: E402
+from electromagnetismo.escenarios import LIMITE_B, cargas_por_defecto, fuentes_B  # noqa: E402
+from electromagnetismo.lineas import semillas_cargas, trazar_lineas  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lineas", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--paso", type=float, default=0.05)
+    args = parser.parse_args()
+
+    fuentes = fuentes_B(cargas_por_defecto())
+    posiciones = np.array([f[1:] for f in fuentes])
+    cargas = np.array([f[0] for f in fuentes])
+
+    def campo(x, y):
+        return campo_electrico_malla(posiciones, cargas, x, y)
+
+    print(f"{'líneas':>8} {'método':>7} {'tiempo (s)':>11} {'puntos':>9}")
+    for total in args.lineas:
+        semillas, sentido = semillas_cargas(posiciones, cargas, total=total, radio=0.1)
+        for metodo in ("rk4", "rk45"):
+            inicio = time.perf_counter()
+            lineas = trazar_lineas(campo, semillas, paso=args.paso, pasos_max=800,
+                                   limites=(-LIMITE_B, LIMITE_B, -LIMITE_B, LIMITE_B),
+                                   sumideros=posiciones, sentido=sentido, metodo=metodo)
+            tiempo = time.perf_counter() - inicio
+            puntos = int(np.isfinite(lineas[:, :, 0]).sum())
+            print(f"{len(semillas):>8} {metodo:>7} {tiempo:>11.4f} {puntos:>9}")
+
+
+if __name__ == "__main__":
+    main()
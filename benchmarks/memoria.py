@@ -0,0 +1,78 @@
+"""Memoria máxima y error de float32 de la evaluación por teselas.
+
+Uso:
+    python benchmarks/memoria.py --malla 2000 --cargas 200 --presupuestos 1 4 16
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.electrostatica import campo_electrico_malla  # noqa: E402
+from electromagnetismo.magnetostatica import campo_b_segmentos  # noqa: E402
+
+
+def medir(funcion):
+    """Tiempo y memoria máxima (MB) asignada por numpy durante funcion()."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tiempo, pico / 2**20, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--malla", type=int, default=2000,
+                        help="puntos por lado de la malla de evaluación")
+    parser.add_argument("--cargas", type=int, default=200)
+    parser.add_argument("--segmentos", type=int, default=100)
+    parser.add_argument("--presupuestos", type=float, nargs="+", default=[1, 4, 16],
+                        help="presupuestos de memoria para los temporales (MB)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x = np.linspace(-6, 6, args.malla)
+    X, Y = np.meshgrid(x, x)
+    malla_mb = X.nbytes / 2**20
+    posiciones = rng.uniform(-5, 5, (args.cargas, 2))
+    cargas = rng.uniform(-1, 1, args.cargas) * 1e-9
+    inicios = rng.uniform(-5, 5, (args.segmentos, 3))
+    finales = inicios + rng.normal(scale=0.5, size=(args.segmentos, 3))
+    corrientes = rng.uniform(-5, 5, args.segmentos)
+
+    print(f"Malla {args.malla}x{args.malla} ({malla_mb:.0f} MB por arreglo float64), "
+          f"{args.cargas} cargas, {args.segmentos} segmentos")
+    print(f"{'kernel':>10} {'MB pres.':>9} {'dtype':>8} {'tiempo (s)':>11} "
+          f"{'pico (MB)':>10} {'error rel.':>11}")
+    kernels = {
+        "E, φ": lambda memoria, dtype: campo_electrico_malla(
+            posiciones, cargas, X, Y, potencial=True, memoria=memoria, dtype=dtype),
+        "B seg.": lambda memoria, dtype: campo_b_segmentos(
+            corrientes, inicios, finales, X, Y, memoria=memoria, dtype=dtype),
+    }
+    for nombre, kernel in kernels.items():
+        referencia = None
+        for presupuesto in args.presupuestos:
+            for dtype in (np.float64, np.float32):
+                tiempo, pico, resultado = medir(
+                    lambda: kernel(int(presupuesto * 2**20), dtype))
+                if referencia is None:
+                    referencia = resultado
+                # Error relativo al máximo de cada componente (el campo
+                # diverge junto a las fuentes)
+                error = max(np.abs(r.astype(float) - ref).max() / np.abs(ref).max()
+                            for r, ref in zip(resultado, referencia))
+                print(f"{nombre:>10} {presupuesto:>9.0f} {np.dtype(dtype).name:>8} "
+                      f"{tiempo:>11.2f} {pico:>10.1f} {error:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
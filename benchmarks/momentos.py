@@ -0,0 +1,73 @@
+"""Tiempo del Método de Momentos frente al número de elementos: matriz densa
+(np.linalg.solve) contra Toeplitz con FFT y gradiente conjugado.
+
+Se resuelve la varilla del cuaderno (L = 1 m, radio 10 µm) y la placa
+cuadrada de 1 m, cuya capacitancia tiende a 40.8 pF. La solución densa sólo
+se mide hasta --max-denso elementos: su memoria crece con N².
+
+Uso:
+    python benchmarks/momentos.py
+    python benchmarks/momentos.py --varilla 1000 100000 --placa 100 300 --max-denso 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.momentos import Placa, Varilla  # noqa: E402
+
+
+def cronometrar(funcion, repeticiones=3):
+    mejor = np.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def medir(conductor, max_denso):
+    fila = {"n": conductor.n}
+    for metodo in ("denso", "toeplitz"):
+        if metodo == "denso" and conductor.n > max_denso:
+            fila[metodo] = None
+            continue
+        fila[metodo], _ = cronometrar(lambda: conductor.resolver(metodo))
+    fila["iteraciones"] = conductor.iteraciones
+    fila["capacitancia"] = conductor.capacitancia()
+    return fila
+
+
+def imprimir(fila):
+    denso = f"{fila['denso']:>10.4f}" if fila["denso"] is not None else f"{'-':>10}"
+    print(f"{fila['n']:>9,} {denso} {fila['toeplitz']:>10.4f} {fila['iteraciones']:>6} "
+          f"{fila['capacitancia'] * 1e12:>10.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--varilla", type=int, nargs="+", default=[100, 1000, 10_000, 100_000],
+                        help="segmentos de la varilla")
+    parser.add_argument("--placa", type=int, nargs="+", default=[20, 40, 100, 320],
+                        help="celdas por lado de la placa")
+    parser.add_argument("--max-denso", type=int, default=3000,
+                        help="elementos máximos para la solución densa")
+    args = parser.parse_args()
+
+    encabezado = f"{'N':>9} {'denso (s)':>10} {'FFT+CG (s)':>10} {'iter':>6} {'C (pF)':>10}"
+    print("Varilla de 1 m, radio 10 µm")
+    print(encabezado)
+    for n in args.varilla:
+        imprimir(medir(Varilla(a=1e-5, N=n), args.max_denso))
+    print("\nPlaca cuadrada de 1 m")
+    print(encabezado)
+    for n in args.placa:
+        imprimir(medir(Placa(nx=n, ny=n), args.max_denso))
+
+
+if __name__ == "__main__":
+    main()
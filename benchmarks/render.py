@@ -0,0 +1,74 @@
+"""Tiempo por imagen y memoria residente de las figuras de las páginas B y C.
+
+Compara una figura nueva por imagen con un lienzo que se reutiliza y sólo
+actualiza sus artistas, como hacen las páginas en cada sesión.
+
+Uso:
+    python benchmarks/render.py --imagenes 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo import escenarios as esc  # noqa: E402
+
+
+def memoria_residente():
+    """Memoria residente del proceso en MB (Linux)."""
+    with open("/proc/self/statm") as archivo:
+        return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def escenarios(n, semilla=0):
+    """n configuraciones aleatorias de las páginas B y C con sus campos."""
+    rng = np.random.default_rng(semilla)
+    X_B, Y_B = esc.malla_B()
+    X_C, Y_C = esc.malla_C()
+    for _ in range(n):
+        fuentes = esc.fuentes_B([(rng.uniform(-5, 5), *rng.uniform(-5, 5, 2))
+                                 for _ in range(3)])
+        conductores = [(rng.uniform(-10, 10), *rng.uniform(-4, 4, 2))]
+        yield ((fuentes, X_B, Y_B, *esc.campo_B(fuentes, X_B, Y_B)),
+               (conductores, X_C, Y_C, *esc.campo_C(conductores, X_C, Y_C)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--imagenes", type=int, default=50)
+    args = parser.parse_args()
+    datos = list(escenarios(args.imagenes))
+
+    print(f"{args.imagenes} imágenes por figura")
+    print(f"{'modo':>12} {'figura':>7} {'mediana (ms)':>13} {'p95 (ms)':>9} "
+          f"{'PNG (kB)':>9} {'Δ RSS (MB)':>11}")
+    for modo in ("nueva", "persistente"):
+        lienzos = {"B": esc.lienzo_B(), "C": esc.lienzo_C()} if modo == "persistente" \
+            else {"B": None, "C": None}
+        inicio_rss = memoria_residente()
+        tiempos = {"B": [], "C": []}
+        tamanos = {"B": 0, "C": 0}
+        for argumentos_B, argumentos_C in datos:
+            for nombre, figura, argumentos in (("B", esc.figura_B, argumentos_B),
+                                               ("C", esc.figura_C, argumentos_C)):
+                inicio = time.perf_counter()
+                png = figura(*argumentos, lienzo=lienzos[nombre])
+                tiempos[nombre].append(time.perf_counter() - inicio)
+                tamanos[nombre] = len(png)
+        delta_rss = memoria_residente() - inicio_rss
+        for nombre in ("B", "C"):
+            t = np.array(tiempos[nombre]) * 1e3
+            print(f"{modo:>12} {nombre:>7} {np.median(t):>13.1f} "
+                  f"{np.percentile(t, 95):>9.1f} {tamanos[nombre] / 1024:>9.0f} "
+                  f"{delta_rss:>11.1f}")
+        for lienzo in lienzos.values():
+            if lienzo is not None:
+                lienzo.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""Suite de rendimiento sin navegador: kernels y páginas completas.
+
+Mide los kernels que hay detrás de las páginas, con varios tamaños de
+problema cada uno:
+
+- calcular_distancia y campo_electrico_punto,
+- el campo H de la página C,
+- la puntuación del quiz,
+- el potencial de la microstrip del Workshop 2,
+- el FDTD 1D y el de Yee en 2D,
+- el método de momentos sobre una placa (mom_placa) y
+- la aproximación de dipolos discretos de una esfera (dda_esfera).
+
+Además ejecuta cada página con el arnés AppTest de Streamlit para registrar
+el tiempo de la primera ejecución y de las repeticiones, la memoria máxima
+asignada y el tiempo de rasterizar figuras.
+
+También mide, en procesos nuevos, cuánto tarda en importarse el núcleo de
+cálculo (lo que paga cada proceso trabajador o herramienta de línea de
+comandos) y comprueba que no arrastra matplotlib, scipy, sympy ni
+Streamlit. El tiempo se compara con el de un `import numpy` solo, medido
+igual en la misma máquina: si alguna importación tarda más que numpy más
+--presupuesto-importacion o carga uno de esos módulos, el programa termina
+con código 1.
+
+Los resultados se escriben en JSON. Con --comparar se contrastan con una
+línea base guardada y el programa termina con código 1 si alguna medida
+empeora más que --umbral (relativo) y más que un mínimo absoluto (1 ms o
+1 MB), para no fallar por ruido en medidas diminutas.
+
+Uso:
+    python benchmarks/suite.py --salida base.json
+    python benchmarks/suite.py --comparar base.json --umbral 0.25
+"""
+import argparse
+import ast
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Las páginas no deben leer ni llenar el almacén en disco del usuario: cada
+# corrida empieza con uno vacío (antes de importar el paquete)
+os.environ.setdefault("EM_ALMACEN_DIR", tempfile.mkdtemp(prefix="em-suite-"))
+
+from electromagnetismo import figuras  # noqa: E402
+from electromagnetismo.electrostatica import campo_electrico_punto  # noqa: E402
+from electromagnetismo.magnetostatica import campo_h_conductor  # noqa: E402
+
+PAGINAS = ["Introducción.py", "pages/A-Carga_eléctrica.py", "pages/B-Campo_eléctrico.py",
+           "pages/C-Campo_magnetostático.py", "pages/D-Quizz.py", "pages/E-Ondas_FDTD.py"]
+
+# Módulos del núcleo de cálculo cuya importación se mide
+NUCLEO = ["electromagnetismo", "electromagnetismo.electrostatica",
+          "electromagnetismo.magnetostatica", "electromagnetismo.bobinas",
+          "electromagnetismo.arbol", "electromagnetismo.microstrip", "electromagnetismo.fdtd",
+          "electromagnetismo.yee", "electromagnetismo.instantaneas",
+          "electromagnetismo.momentos", "electromagnetismo.dipolos",
+          "electromagnetismo.escenarios"]
+
+# Módulos que el núcleo sólo debe importar cuando se necesitan
+PESADOS = ("matplotlib", "scipy", "sympy", "streamlit")
+
+# Medidas que se comparan con la línea base y mínimo absoluto de cada una
+# para considerarla una regresión
+COMPARADAS = {"mediana_s": 1e-3, "primera_s": 1e-3, "pico_mb": 1.0, "render_s": 1e-3}
+
+
+def definiciones_pagina(ruta, nombres):
+    """Ejecuta sólo las asignaciones y funciones `nombres` de una página,
+    sin el resto del script (que necesita una sesión de Streamlit)."""
+    with open(os.path.join(RAIZ, ruta), encoding="utf-8") as archivo:
+        modulo = ast.parse(archivo.read())
+    cuerpo = [nodo for nodo in modulo.body
+              if (isinstance(nodo, ast.FunctionDef) and nodo.name in nombres)
+              or (isinstance(nodo, ast.Assign)
+                  and any(getattr(t, "id", None) in nombres for t in nodo.targets))]
+    espacio = {"math": __import__("math"), "np": np}
+    exec(compile(ast.Module(body=cuerpo, type_ignores=[]), ruta, "exec"), espacio)
+    return espacio
+
+
+def medir(funcion, repeticiones):
+    """Mediana y p95 del tiempo de funcion() y memoria máxima asignada (MB)
+    en una ejecución adicional con tracemalloc."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"mediana_s": float(np.median(tiempos)),
+            "p95_s": float(np.percentile(tiempos, 95)),
+            "pico_mb": pico / 2**20}
+
+
+def medir_importacion(modulo, repeticiones):
+    """Mediana y p95 del tiempo de `import modulo` en procesos nuevos y
+    módulos de PESADOS que quedan cargados."""
+    codigo = ("import sys, time\n"
+              "inicio = time.perf_counter()\n"
+              f"import {modulo}\n"
+              "print(time.perf_counter() - inicio)\n"
+              f"print(*[m for m in {PESADOS!r} if m in sys.modules])")
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True,
+                                capture_output=True, text=True).stdout.splitlines()
+        tiempos.append(float(salida[0]))
+    return {"mediana_s": float(np.median(tiempos)),
+            "p95_s": float(np.percentile(tiempos, 95)),
+            "pesados": salida[1].split() if len(salida) > 1 else []}
+
+
+# --- Kernels: cada uno recibe el tamaño del problema y devuelve la función
+# que se mide ---
+
+def kernel_distancia(n):
+    from electromagnetismo.electrostatica import calcular_distancia
+    puntos = np.random.default_rng(0).uniform(-10, 10, (n, 2, 2)).tolist()
+    return lambda: [calcular_distancia(p, q) for p, q in puntos]
+
+
+def kernel_campo_punto(n):
+    # Superposición punto a punto de 3 cargas en una malla n×n, como se
+    # haría sin el kernel vectorizado
+    rng = np.random.default_rng(0)
+    posiciones = rng.uniform(-5, 5, (3, 2))
+    cargas = rng.uniform(-1, 1, 3) * 1e-9
+    x = np.linspace(-6, 6, n)
+    puntos = np.stack(np.meshgrid(x, x), axis=-1).reshape(-1, 2)
+    return lambda: [sum(campo_electrico_punto(q, r, p) for q, r in zip(cargas, posiciones))
+                    for p in puntos]
+
+
+def kernel_campo_h(n):
+    x = np.linspace(-10, 10, n)
+    X, Y = np.meshgrid(x, x)
+    return lambda: campo_h_conductor(5.0, 1.0, -2.0, X, Y)
+
+
+def kernel_quiz(n):
+    # Quiz con n preguntas (las del quiz repetidas), todas respondidas
+    definiciones = definiciones_pagina("pages/D-Quizz.py", {"quiz_data", "calculate_score"})
+    preguntas = definiciones["quiz_data"]["questions"]
+    copias = [dict(preguntas[i % len(preguntas)], id=i + 1) for i in range(n)]
+    definiciones["quiz_data"] = {"questions": copias}
+    respuestas = {p["id"]: p["correct_answer"] if p["id"] % 2 else 0 for p in copias}
+    definiciones["st"] = types.SimpleNamespace(
+        session_state=types.SimpleNamespace(answers=respuestas))
+    return definiciones["calculate_score"]
+
+
+def kernel_microstrip(n):
+    from electromagnetismo.microstrip import MicrostripGalerkin
+    microstrip = MicrostripGalerkin(W=10, h=1.6, d=30, er=4.3, V0=10, N=151)
+    return lambda: microstrip.calculate_field_2d(n, n)
+
+
+def kernel_fdtd(n):
+    from electromagnetismo.fdtd import FDTD1D, perfil_bloque
+    # n corridas de 1000 celdas, cada una con un material distinto
+    epsilon_r = perfil_bloque(1000, 500, valor=np.linspace(1, 10, n), fondo=1.0)
+    return lambda: FDTD1D(1000, epsilon_r, sigma=0.01).avanzar(500)
+
+
+def kernel_yee(n):
+    from electromagnetismo.fdtd import pulso_gaussiano
+    from electromagnetismo.yee import Yee, fuente_puntual
+    simulacion = Yee((n, n), modo="TM", capas=10)
+    simulacion.fuentes.append(fuente_puntual("Ez", (n // 2, n // 2), pulso_gaussiano(30, 8)))
+    return lambda: simulacion.avanzar(20)
+
+
+def kernel_momentos(n):
+    from electromagnetismo.momentos import Placa
+    placa = Placa(nx=n, ny=n)
+    return lambda: placa.resolver()
+
+
+def kernel_dda(n):
+    from electromagnetismo.dipolos import DDA, esfera
+    # Esfera de n dipolos de diámetro con ka = 2
+    ocupacion = esfera(n)
+    d = 2.0 / (2 * np.pi / 500e-9) * (4 * np.pi / (3 * ocupacion.sum()))**(1 / 3)
+    dda = DDA(ocupacion, d, 500e-9, 2.25)
+    return lambda: dda.resolver()
+
+
+KERNELS = {
+    "calcular_distancia": (kernel_distancia, [1_000, 10_000, 100_000]),
+    "campo_electrico_punto": (kernel_campo_punto, [20, 50, 100]),
+    "campo_h_conductor": (kernel_campo_h, [100, 400, 1000]),
+    "puntuacion_quiz": (kernel_quiz, [7, 70, 700]),
+    "microstrip_potencial": (kernel_microstrip, [50, 150, 300]),
+    "fdtd_1d": (kernel_fdtd, [1, 16, 64]),
+    "yee_tm": (kernel_yee, [100, 300, 1000]),
+    "mom_placa": (kernel_momentos, [40, 100, 320]),
+    "dda_esfera": (kernel_dda, [8, 16, 24]),
+}
+
+
+# --- Páginas ---
+
+class Cronometro:
+    """Suma el tiempo que pasa en las funciones que rasterizan figuras
+    (Lienzo.png y figura_a_png) mientras está activo."""
+
+    def __init__(self):
+        self.total = 0.0
+        self._originales = []
+
+    def _envolver(self, objeto, nombre):
+        original = getattr(objeto, nombre)
+        self._originales.append((objeto, nombre, original))
+
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.total += time.perf_counter() - inicio
+        setattr(objeto, nombre, envoltura)
+
+    def __enter__(self):
+        from electromagnetismo import escenarios
+        self._envolver(figuras.Lienzo, "png")
+        self._envolver(figuras, "figura_a_png")
+        self._envolver(escenarios, "figura_a_png")
+        return self
+
+    def __exit__(self, *excepcion):
+        for objeto, nombre, original in reversed(self._originales):
+            setattr(objeto, nombre, original)
+        self._originales.clear()
+
+
+def medir_pagina(ruta, repeticiones, tiempo_max):
+    """Primera ejecución, repeticiones (con las cachés ya llenas) y memoria
+    máxima de una ejecución más, en una sesión de AppTest."""
+    from streamlit.testing.v1 import AppTest
+
+    prueba = AppTest.from_file(os.path.join(RAIZ, ruta), default_timeout=tiempo_max)
+    with Cronometro() as cronometro:
+        inicio = time.perf_counter()
+        prueba.run()
+        primera = time.perf_counter() - inicio
+        render = cronometro.total
+    if prueba.exception:
+        raise RuntimeError(f"{ruta}: {prueba.exception[0].value}")
+    resultado = medir(prueba.run, repeticiones)
+    resultado.update(primera_s=primera, render_s=render)
+    return resultado
+
+
+def comparar(actual, base, umbral):
+    """Lista de (medida, base, actual) que empeoran más que el umbral."""
+    regresiones = []
+    for clave, medidas in actual.items():
+        for medida, minimo in COMPARADAS.items():
+            if medida not in medidas or medida not in base.get(clave, {}):
+                continue
+            antes, ahora = base[clave][medida], medidas[medida]
+            if ahora > antes * (1 + umbral) and ahora - antes > minimo:
+                regresiones.append((f"{clave} {medida}", antes, ahora))
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--salida", help="archivo JSON para los resultados")
+    parser.add_argument("--comparar", metavar="BASE",
+                        help="JSON de una corrida anterior contra el que comparar")
+    parser.add_argument("--umbral", type=float, default=0.2,
+                        help="empeoramiento relativo permitido (0.2 = 20 %%)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--solo", nargs="+", choices=["importaciones", "kernels", "paginas"],
+                        default=["importaciones", "kernels", "paginas"])
+    parser.add_argument("--presupuesto-importacion", type=float, default=0.100,
+                        help="segundos que cada módulo del núcleo puede tardar en "
+                             "importarse por encima de un import numpy solo")
+    parser.add_argument("--tiempo-max", type=float, default=300,
+                        help="segundos máximos por ejecución de una página")
+    args = parser.parse_args()
+
+    resultados = {}
+    excedidos = []
+    if "importaciones" in args.solo:
+        # numpy domina la importación y su costo depende de la máquina: el
+        # presupuesto se cuenta a partir de él
+        resultados["importacion/numpy"] = base_numpy = medir_importacion("numpy", args.repeticiones)
+        maximo_importacion = base_numpy["mediana_s"] + args.presupuesto_importacion
+        print(f"{'importacion/numpy':>48} {base_numpy['mediana_s'] * 1e3:>10.2f} ms")
+        for modulo in NUCLEO:
+            clave = f"importacion/{modulo}"
+            resultados[clave] = r = medir_importacion(modulo, args.repeticiones)
+            print(f"{clave:>48} {r['mediana_s'] * 1e3:>10.2f} ms "
+                  f"{' '.join(r['pesados'])}")
+            if r["mediana_s"] > maximo_importacion or r["pesados"]:
+                excedidos.append(clave)
+    if "kernels" in args.solo:
+        for nombre, (preparar, tamanos) in KERNELS.items():
+            for n in tamanos:
+                clave = f"kernel/{nombre}/n={n}"
+                resultados[clave] = medir(preparar(n), args.repeticiones)
+                print(f"{clave:>48} {resultados[clave]['mediana_s'] * 1e3:>10.2f} ms "
+                      f"{resultados[clave]['pico_mb']:>8.1f} MB")
+    if "paginas" in args.solo:
+        for ruta in PAGINAS:
+            clave = f"pagina/{os.path.basename(ruta)}"
+            resultados[clave] = medir_pagina(ruta, args.repeticiones, args.tiempo_max)
+            r = resultados[clave]
+            print(f"{clave:>48} {r['mediana_s'] * 1e3:>10.2f} ms "
+                  f"{r['pico_mb']:>8.1f} MB  primera {r['primera_s'] * 1e3:.0f} ms, "
+                  f"figuras {r['render_s'] * 1e3:.0f} ms")
+
+    informe = {
+        "entorno": {"fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(), "numpy": np.__version__,
+                    "plataforma": platform.platform(), "nucleos": os.cpu_count(),
+                    "repeticiones": args.repeticiones},
+        "resultados": resultados,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+
+    for clave in excedidos:
+        r = resultados[clave]
+        print(f"PRESUPUESTO {clave}: {r['mediana_s'] * 1e3:.0f} ms "
+              f"(máximo {maximo_importacion * 1e3:.0f} ms: numpy más "
+              f"{args.presupuesto_importacion * 1e3:.0f} ms)"
+              + (f", importa {', '.join(r['pesados'])}" if r["pesados"] else ""))
+
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            base = json.load(archivo)["resultados"]
+        regresiones = comparar(resultados, base, args.umbral)
+        for medida, antes, ahora in regresiones:
+            print(f"REGRESIÓN {medida}: {antes:.4g} -> {ahora:.4g} "
+                  f"(+{(ahora / antes - 1) * 100:.0f} %)")
+        if not regresiones:
+            print(f"Sin regresiones mayores que {args.umbral:.0%} respecto a {args.comparar}")
+    if excedidos or regresiones:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
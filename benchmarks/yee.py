@@ -0,0 +1,81 @@
+"""Celdas actualizadas por segundo del solver de Yee (2D TM/TE y 3D).
+
+Para cada modo y número aproximado de celdas se construye una malla
+cuadrada o cúbica con capas CPML y una fuente puntual, se dan unos pasos de
+calentamiento y se miden varias tandas de pasos: se informa la mediana de
+celdas por segundo (millones), que es el ritmo sostenido con el que se
+dimensionan las simulaciones (pasos × celdas / ritmo = segundos).
+
+Uso:
+    python benchmarks/yee.py
+    python benchmarks/yee.py --modos 3D --celdas 1e6 1e7 --pasos 20 --salida yee.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from electromagnetismo.fdtd import pulso_gaussiano  # noqa: E402
+from electromagnetismo.yee import Yee, fuente_puntual  # noqa: E402
+
+
+def malla(modo, celdas, capas, dtype):
+    if modo == "3D":
+        n = max(2 * capas + 4, round(celdas ** (1 / 3)))
+        return Yee((n, n, n), capas=capas, dtype=dtype)
+    n = max(2 * capas + 4, round(celdas ** 0.5))
+    return Yee((n, n), modo=modo, capas=capas, dtype=dtype)
+
+
+def medir(modo, celdas, pasos, tandas, capas, dtype):
+    simulacion = malla(modo, celdas, capas, dtype)
+    centro = tuple(n // 2 for n in simulacion.forma)
+    componente = "Hz" if modo == "TE" else "Ez"
+    simulacion.fuentes.append(fuente_puntual(componente, centro, pulso_gaussiano(30, 8)))
+    simulacion.avanzar(3)
+    ritmos = []
+    for _ in range(tandas):
+        inicio = time.perf_counter()
+        simulacion.avanzar(pasos)
+        ritmos.append(simulacion.celdas * pasos / (time.perf_counter() - inicio))
+    return {"forma": list(simulacion.forma), "celdas": simulacion.celdas,
+            "losa": simulacion.losa, "mceldas_s": float(np.median(ritmos)) / 1e6,
+            "mceldas_s_min": min(ritmos) / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modos", nargs="+", default=["TM", "TE", "3D"],
+                        choices=["TM", "TE", "3D"])
+    parser.add_argument("--celdas", nargs="+", type=float, default=[1e5, 1e6, 1e7],
+                        help="celdas aproximadas de cada malla")
+    parser.add_argument("--pasos", type=int, default=10, help="pasos por tanda")
+    parser.add_argument("--tandas", type=int, default=3)
+    parser.add_argument("--capas", type=int, default=10, help="espesor de la CPML")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("--salida", help="archivo JSON para los resultados")
+    args = parser.parse_args()
+
+    print(f"{'modo':>5} {'malla':>16} {'celdas':>12} {'Mceldas/s':>10} {'ns/celda':>9}")
+    resultados = {}
+    for modo in args.modos:
+        for celdas in args.celdas:
+            r = medir(modo, celdas, args.pasos, args.tandas, args.capas, args.dtype)
+            resultados[f"{modo}/{r['celdas']}"] = r
+            forma = "×".join(str(n) for n in r["forma"] if n > 1)
+            print(f"{modo:>5} {forma:>16} {r['celdas']:>12,} {r['mceldas_s']:>10.1f} "
+                  f"{1e3 / r['mceldas_s']:>9.1f}")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({"parametros": vars(args), "maquina": platform.platform(),
+                       "resultados": resultados}, archivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
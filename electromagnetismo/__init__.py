@@ -0,0 +1,50 @@
+"""Núcleo de cálculo del Laboratorio Virtual de Electromagnetismo.
+
+Los módulos de este paquete contienen los kernels numéricos que usan las
+páginas de Streamlit, separados de la interfaz para poder reutilizarlos
+desde trabajos por lotes, procesos trabajadores o la línea de comandos.
+
+Importar el paquete no importa nada más: los kernels de uso frecuente se
+pueden pedir directamente (``electromagnetismo.campo_h_conductor``) y su
+módulo se carga la primera vez. Los kernels sólo necesitan numpy;
+matplotlib se importa al dibujar la primera figura (figuras, escenarios).
+"""
+import importlib
+
+# Nombre exportado -> módulo que lo define
+_EXPORTADOS = {
+    "calcular_distancia": "electrostatica",
+    "campo_electrico_punto": "electrostatica",
+    "campo_electrico_malla": "electrostatica",
+    "energia_electrostatica": "electrostatica",
+    "campo_h_conductor": "magnetostatica",
+    "campo_b_hilos": "magnetostatica",
+    "campo_b_segmentos": "magnetostatica",
+    "campo_b_polilineas": "magnetostatica",
+    "campo_espiras": "bobinas",
+    "campo_arbol": "arbol",
+    "MicrostripGalerkin": "microstrip",
+    "FDTD1D": "fdtd",
+    "Yee": "yee",
+    "EscritorInstantaneas": "instantaneas",
+    "LectorInstantaneas": "instantaneas",
+    "Varilla": "momentos",
+    "Cinta": "momentos",
+    "Placa": "momentos",
+    "DDA": "dipolos",
+}
+
+__all__ = sorted(_EXPORTADOS)
+
+
+def __getattr__(nombre):
+    modulo = _EXPORTADOS.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(f"{__name__}.{modulo}"), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTADOS))
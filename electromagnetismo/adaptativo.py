@@ -0,0 +1,152 @@
+"""Muestreo adaptativo (quadtree) de campos con fuentes singulares.
+
+Una malla uniforme gasta casi todos sus puntos lejos de las cargas y
+conductores, donde el campo apenas cambia, y se queda corta junto a ellos.
+El quadtree empieza con una malla gruesa y divide en cuatro las celdas en
+las que el campo varía demasiado entre sus esquinas; los vértices viven en
+una retícula fina de 2**nivel_max celdas por lado, así que los que
+comparten celdas vecinas se evalúan una sola vez. El resultado se
+remuestrea por interpolación bilineal en cada hoja sobre la malla regular
+que necesite la figura (contour, pcolormesh, imshow).
+"""
+import numpy as np
+
+
+class MuestreoAdaptativo:
+    """Muestreo de campo(x, y) -> arreglo o tupla de arreglos en el
+    rectángulo limites = (x_min, x_max, y_min, y_max).
+
+    Una celda se divide si alguna esquina no es finita, si la razón entre
+    el máximo y el mínimo de |F| en sus esquinas supera `razon` (lo que
+    refina en progresión geométrica hacia una fuente 1/r) o si alguna
+    esquina se aparta del promedio de la celda más que `tolerancia` veces
+    la escala del campo (el percentil 95 de |F| en la malla inicial, que no
+    depende de los valores divergentes junto a las fuentes). |F| es la
+    norma de las componentes (el valor absoluto para un campo escalar).
+
+    Si el campo devuelve magnitudes distintas (por ejemplo Bx, By y un
+    potencial, con otras unidades), `grupos` da los índices de las
+    componentes de cada una, como ((0, 1), (2,)): cada grupo se compara
+    con su propia escala y la celda se divide si alguno lo pide. Por
+    defecto todas las componentes forman una sola magnitud.
+    """
+
+    def __init__(self, campo, limites, nivel_min=3, nivel_max=8, tolerancia=0.01,
+                 razon=2.0, grupos=None):
+        if not 0 <= nivel_min <= nivel_max:
+            raise ValueError("Se necesita 0 <= nivel_min <= nivel_max")
+        self.limites = tuple(float(v) for v in limites)
+        self.n = 2**nivel_max
+        x_min, x_max, y_min, y_max = self.limites
+        self._x = np.linspace(x_min, x_max, self.n + 1)
+        self._y = np.linspace(y_min, y_max, self.n + 1)
+        self._valores = None
+        self._evaluado = np.zeros((self.n + 1)**2, dtype=bool)
+
+        hojas = []
+        s = self.n >> nivel_min
+        i0, j0 = (a.ravel() for a in np.meshgrid(np.arange(0, self.n, s),
+                                                 np.arange(0, self.n, s), indexing="ij"))
+        escalas = None
+        while True:
+            esquinas = self._evaluar(campo, i0, j0, s)
+            if escalas is None:
+                if grupos is None:
+                    grupos = (tuple(range(esquinas.shape[0])),)
+                grupos = [list(g) for g in grupos]
+                escalas = [_escala(esquinas[g]) for g in grupos]
+            if s == 1:
+                hojas.append((i0, j0, np.full(i0.size, s)))
+                break
+            refinar = np.zeros(i0.size, dtype=bool)
+            for g, escala in zip(grupos, escalas):
+                refinar |= _refinar(esquinas[g], tolerancia * escala, razon)
+            hojas.append((i0[~refinar], j0[~refinar], np.full(int((~refinar).sum()), s)))
+            s //= 2
+            # Las cuatro hijas de cada celda que se refina
+            i0 = (i0[refinar, None] + np.array([0, 0, s, s])).ravel()
+            j0 = (j0[refinar, None] + np.array([0, s, 0, s])).ravel()
+            if i0.size == 0:
+                break
+        self.hojas = np.concatenate([np.column_stack(h) for h in hojas]).astype(np.int64)
+        self.evaluaciones = int(self._evaluado.sum())
+
+        # Hoja que contiene cada celda de la retícula fina, llenado por
+        # tamaño de hoja (las hojas cubren la retícula una sola vez)
+        self._mapa = np.empty((self.n, self.n), dtype=np.int64)
+        for lado in np.unique(self.hojas[:, 2]):
+            k = np.flatnonzero(self.hojas[:, 2] == lado)
+            paso = np.arange(lado)
+            self._mapa[self.hojas[k, 0, None, None] + paso[None, :, None],
+                       self.hojas[k, 1, None, None] + paso[None, None, :]] = k[:, None, None]
+
+    def _evaluar(self, campo, i0, j0, s):
+        """Evalúa los vértices nuevos de las celdas y devuelve los valores
+        de sus cuatro esquinas, con forma (componentes, celdas, 4)."""
+        ancho = self.n + 1
+        vertices = np.stack([i0 * ancho + j0, i0 * ancho + j0 + s,
+                             (i0 + s) * ancho + j0, (i0 + s) * ancho + j0 + s], axis=1)
+        nuevos = np.unique(vertices)
+        nuevos = nuevos[~self._evaluado[nuevos]]
+        if nuevos.size:
+            resultado = campo(self._x[nuevos % ancho], self._y[nuevos // ancho])
+            if not isinstance(resultado, tuple):
+                resultado = (resultado,)
+            if self._valores is None:
+                self._valores = np.full((len(resultado), ancho**2), np.nan)
+            self._valores[:, nuevos] = np.asarray(resultado, dtype=float)
+            self._evaluado[nuevos] = True
+        return self._valores[:, vertices]
+
+    @property
+    def puntos(self):
+        """Coordenadas (M, 2) de los vértices evaluados."""
+        indices = np.flatnonzero(self._evaluado)
+        ancho = self.n + 1
+        return np.column_stack([self._x[indices % ancho], self._y[indices // ancho]])
+
+    def remuestrear(self, X, Y):
+        """Valores interpolados en los puntos (X, Y), con la forma de X: un
+        arreglo si el campo es escalar o una tupla con cada componente."""
+        X, Y = np.asarray(X, dtype=float), np.asarray(Y, dtype=float)
+        x_min, x_max, y_min, y_max = self.limites
+        fx = np.clip((X - x_min) / (x_max - x_min) * self.n, 0, self.n)
+        fy = np.clip((Y - y_min) / (y_max - y_min) * self.n, 0, self.n)
+        celda_i = np.minimum(fy.astype(np.int64), self.n - 1)
+        celda_j = np.minimum(fx.astype(np.int64), self.n - 1)
+        i0, j0, lado = np.moveaxis(self.hojas[self._mapa[celda_i, celda_j]], -1, 0)
+        u = (fx - j0) / lado
+        v = (fy - i0) / lado
+
+        ancho = self.n + 1
+        esquina = i0 * ancho + j0
+        a = self._valores[:, esquina]
+        b = self._valores[:, esquina + lado]
+        c = self._valores[:, esquina + lado * ancho]
+        d = self._valores[:, esquina + lado * ancho + lado]
+        resultado = (1 - v) * ((1 - u) * a + u * b) + v * ((1 - u) * c + u * d)
+        if len(resultado) == 1:
+            return resultado[0]
+        return tuple(resultado)
+
+
+def _escala(esquinas):
+    """Percentil 95 de |F| en las esquinas (componentes, celdas, 4)."""
+    magnitud = np.sqrt((esquinas**2).sum(axis=0))
+    return np.percentile(magnitud[np.isfinite(magnitud)], 95) \
+        if np.isfinite(magnitud).any() else 0.0
+
+
+def _refinar(esquinas, umbral, razon):
+    """Celdas que hay que dividir, según los valores de sus esquinas
+    (componentes, celdas, 4)."""
+    finitas = np.isfinite(esquinas).all(axis=(0, 2))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        magnitud = np.sqrt((esquinas**2).sum(axis=0))
+        cociente = magnitud.max(axis=1) / magnitud.min(axis=1)
+        desvio = esquinas - esquinas.mean(axis=2, keepdims=True)
+        variacion = np.sqrt((desvio**2).sum(axis=0)).max(axis=1)
+    # Una esquina con campo nulo da cociente infinito (o NaN si lo son las
+    # cuatro): en ese caso decide sólo la variación
+    cociente[~np.isfinite(cociente)] = 0
+    return ~finitas | (cociente > razon) | (variacion > umbral)
@@ -0,0 +1,394 @@
+"""Almacén en disco, direccionado por contenido, para campos y figuras.
+
+Cada entrada se identifica con el hash SHA-256 de sus parámetros físicos y
+de la malla (junto con VERSION), y se guarda como un directorio con un `.npy` por arreglo (que
+se abre con memory-map) o un `.bin` para bytes (figuras PNG). El almacén
+sobrevive a reinicios del servidor y lo pueden compartir varios procesos:
+
+- las escrituras se hacen en un directorio temporal que luego se renombra
+  de forma atómica, así que nunca se ve una entrada a medio escribir;
+- los borrados renombran primero la entrada y después la eliminan;
+- la recolección de basura (LRU por fecha de último acceso) se hace con un
+  candado de archivo para que dos procesos no la ejecuten a la vez.
+
+Uso desde la línea de comandos (precalcular antes de la clase):
+    python -m electromagnetismo.almacen precalcular --pagina B C
+    python -m electromagnetismo.almacen estado
+    python -m electromagnetismo.almacen limpiar
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from electromagnetismo.cache import cuantizar
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin candado entre procesos
+    fcntl = None
+
+DIRECTORIO = os.environ.get(
+    "EM_ALMACEN_DIR", os.path.join(os.path.expanduser("~"), ".cache", "electromagnetismo"))
+PRESUPUESTO_MB = float(os.environ.get("EM_ALMACEN_MB", "1024"))
+
+# Los accesos sólo actualizan la fecha de uso si la anterior es más vieja
+# que esto, para no escribir en disco en cada lectura
+_INTERVALO_TOQUE = 60.0
+
+# Cada proceso sólo conoce sus propias escrituras; cada tantas escrituras se
+# vuelve a medir el directorio para tener en cuenta las de los demás
+_ESCRITURAS_POR_MEDICION = 32
+
+# Versión de los resultados guardados: se incrementa con cualquier cambio en
+# cómo se calculan los campos o se dibujan las figuras, y así las entradas
+# de un almacén existente dejan de coincidir en vez de servirse viejas
+VERSION = 3
+
+_almacen = None
+_candado_almacen = threading.Lock()
+
+
+def clave_hash(parametros):
+    """Hash hexadecimal estable de una estructura de parámetros y VERSION."""
+    texto = json.dumps([VERSION, cuantizar(parametros)], separators=(",", ":"), default=repr)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class AlmacenDisco:
+    """Almacén persistente con presupuesto de tamaño y recolección LRU."""
+
+    def __init__(self, directorio=DIRECTORIO, presupuesto_mb=PRESUPUESTO_MB):
+        self.directorio = os.path.abspath(directorio)
+        self.presupuesto = int(presupuesto_mb * 2**20)
+        os.makedirs(self.directorio, exist_ok=True)
+        self._tamano_estimado = self._medir()[1]
+        self._escrituras = 0
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    # --- Rutas ---
+
+    def _ruta(self, h):
+        return os.path.join(self.directorio, h[:2], h)
+
+    def _entradas(self):
+        """Lista (ruta, tamaño en bytes, último acceso) de todas las entradas."""
+        entradas = []
+        for prefijo in os.listdir(self.directorio):
+            carpeta = os.path.join(self.directorio, prefijo)
+            if len(prefijo) != 2 or not os.path.isdir(carpeta):
+                continue
+            for nombre in os.listdir(carpeta):
+                if nombre.startswith(".") or ".borrar-" in nombre:
+                    continue  # escritura o borrado en curso
+                ruta = os.path.join(carpeta, nombre)
+                try:
+                    meta = os.stat(os.path.join(ruta, "meta.json"))
+                    tamano = sum(os.path.getsize(os.path.join(ruta, f))
+                                 for f in os.listdir(ruta))
+                except OSError:
+                    continue  # entrada temporal o borrada por otro proceso
+                entradas.append((ruta, tamano, meta.st_mtime))
+        return entradas
+
+    def _medir(self):
+        entradas = self._entradas()
+        return len(entradas), sum(e[1] for e in entradas)
+
+    # --- Lectura y escritura ---
+
+    def obtener(self, parametros, defecto=None):
+        """Valor guardado para los parámetros, o `defecto` si no existe.
+        Los arreglos se devuelven como memory-maps de sólo lectura."""
+        ruta = self._ruta(clave_hash(parametros))
+        try:
+            with open(os.path.join(ruta, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            partes = []
+            for nombre in meta["partes"]:
+                archivo = os.path.join(ruta, nombre)
+                if nombre.endswith(".npy"):
+                    partes.append(np.load(archivo, mmap_mode="r"))
+                else:
+                    with open(archivo, "rb") as f:
+                        partes.append(f.read())
+            self._tocar(os.path.join(ruta, "meta.json"))
+        except (OSError, ValueError, KeyError):
+            with self._candado:
+                self.fallos += 1
+            return defecto
+        with self._candado:
+            self.aciertos += 1
+        return tuple(partes) if meta["tipo"] == "tupla" else partes[0]
+
+    def guardar(self, parametros, valor):
+        """Guarda un arreglo, bytes o una tupla de arreglos/bytes."""
+        h = clave_hash(parametros)
+        destino = self._ruta(h)
+        if os.path.exists(destino):
+            return valor
+
+        es_tupla = isinstance(valor, tuple)
+        partes = valor if es_tupla else (valor,)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        temporal = tempfile.mkdtemp(prefix=f".{h}.", dir=os.path.dirname(destino))
+        try:
+            nombres = []
+            for i, parte in enumerate(partes):
+                if isinstance(parte, (bytes, bytearray)):
+                    nombre = f"{i}.bin"
+                    with open(os.path.join(temporal, nombre), "wb") as f:
+                        f.write(parte)
+                else:
+                    nombre = f"{i}.npy"
+                    np.save(os.path.join(temporal, nombre), np.asarray(parte))
+                nombres.append(nombre)
+            with open(os.path.join(temporal, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"tipo": "tupla" if es_tupla else "valor", "partes": nombres,
+                           "parametros": repr(parametros)}, f)
+            tamano = sum(os.path.getsize(os.path.join(temporal, n)) for n in os.listdir(temporal))
+            os.rename(temporal, destino)
+        except OSError:
+            # Otro proceso escribió la misma entrada primero (o falló el disco)
+            shutil.rmtree(temporal, ignore_errors=True)
+            return valor
+
+        with self._candado:
+            self._tamano_estimado += tamano
+            self._escrituras += 1
+            revisar = (self._tamano_estimado > self.presupuesto
+                       or self._escrituras % _ESCRITURAS_POR_MEDICION == 0)
+        if revisar:
+            self.recolectar()
+        return valor
+
+    def obtener_o_calcular(self, parametros, calcular):
+        valor = self.obtener(parametros)
+        if valor is None:
+            valor = self.guardar(parametros, calcular())
+        return valor
+
+    def directorio_entrada(self, parametros, llenar):
+        """Ruta de una entrada que es un directorio con archivos propios
+        (por ejemplo, instantáneas de una simulación). Si no existe,
+        llenar(directorio) la escribe en un directorio temporal, que debe
+        quedar con un meta.json, y éste se renombra de forma atómica."""
+        h = clave_hash(parametros)
+        destino = self._ruta(h)
+        if os.path.exists(os.path.join(destino, "meta.json")):
+            self._tocar(os.path.join(destino, "meta.json"))
+            with self._candado:
+                self.aciertos += 1
+            return destino
+
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        temporal = tempfile.mkdtemp(prefix=f".{h}.", dir=os.path.dirname(destino))
+        try:
+            llenar(temporal)
+            tamano = sum(os.path.getsize(os.path.join(temporal, n)) for n in os.listdir(temporal))
+            os.rename(temporal, destino)
+        except OSError:
+            shutil.rmtree(temporal, ignore_errors=True)
+            if not os.path.exists(os.path.join(destino, "meta.json")):
+                raise
+            return destino  # otro proceso la escribió primero
+        except BaseException:
+            # Cualquier otra interrupción (un error de llenar, una parada de
+            # Streamlit, Ctrl-C) no debe dejar el temporal huérfano
+            shutil.rmtree(temporal, ignore_errors=True)
+            raise
+        with self._candado:
+            self.fallos += 1
+            self._tamano_estimado += tamano
+            self._escrituras += 1
+        if self._tamano_estimado > self.presupuesto:
+            self.recolectar()
+        return destino
+
+    def _tocar(self, archivo):
+        try:
+            if time.time() - os.path.getmtime(archivo) > _INTERVALO_TOQUE:
+                os.utime(archivo)
+        except OSError:
+            pass
+
+    # --- Recolección de basura ---
+
+    def recolectar(self, presupuesto=None):
+        """Borra las entradas usadas hace más tiempo hasta quedar por debajo
+        del presupuesto. Devuelve el número de entradas borradas."""
+        presupuesto = self.presupuesto if presupuesto is None else presupuesto
+        with open(os.path.join(self.directorio, ".candado"), "a") as candado:
+            if fcntl is not None:
+                fcntl.flock(candado, fcntl.LOCK_EX)
+            try:
+                entradas = sorted(self._entradas(), key=lambda e: e[2])
+                total = sum(e[1] for e in entradas)
+                borradas = 0
+                for ruta, tamano, _ in entradas:
+                    if total <= presupuesto:
+                        break
+                    self._borrar(ruta)
+                    total -= tamano
+                    borradas += 1
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(candado, fcntl.LOCK_UN)
+        with self._candado:
+            self._tamano_estimado = total
+        return borradas
+
+    def _borrar(self, ruta):
+        papelera = f"{ruta}.borrar-{uuid.uuid4().hex}"
+        try:
+            os.rename(ruta, papelera)
+        except OSError:
+            return
+        shutil.rmtree(papelera, ignore_errors=True)
+
+    def limpiar(self):
+        return self.recolectar(presupuesto=0)
+
+    def estadisticas(self):
+        entradas, tamano = self._medir()
+        return {
+            "directorio": self.directorio,
+            "entradas": entradas,
+            "tamano_mb": tamano / 2**20,
+            "presupuesto_mb": self.presupuesto / 2**20,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+        }
+
+
+def almacen_compartido():
+    """Almacén del proceso configurado por EM_ALMACEN_DIR y EM_ALMACEN_MB.
+    Devuelve None si EM_ALMACEN_DIR está vacío (almacén desactivado) o el
+    directorio no se puede usar."""
+    global _almacen
+    with _candado_almacen:
+        if _almacen is None and DIRECTORIO:
+            try:
+                _almacen = AlmacenDisco()
+            except OSError:
+                return None
+        return _almacen
+
+
+# --- Precálculo desde la línea de comandos ---
+
+def _escenarios_B(submuestreo):
+    """Cada slider de cada carga recorrido en su rango, con los demás en su
+    valor inicial (lo que hace un estudiante al explorar la página)."""
+    from electromagnetismo import escenarios as esc
+
+    vistos = set()
+    for i in range(3):
+        for parametro, rango in enumerate((esc.RANGO_Q_NC, esc.RANGO_POSICION_B,
+                                           esc.RANGO_POSICION_B)):
+            for valor in esc.barrido(rango)[::submuestreo]:
+                cargas = esc.cargas_por_defecto()
+                carga = list(cargas[i])
+                carga[parametro] = valor
+                cargas[i] = tuple(carga)
+                clave = esc.clave_B(esc.fuentes_B(cargas))
+                if clave not in vistos:
+                    vistos.add(clave)
+                    yield clave, esc.fuentes_B(cargas)
+
+
+def _escenarios_C(submuestreo, completo):
+    """Barrido de corriente y posición del conductor: uno a la vez desde el
+    valor inicial o, con `completo`, todas las combinaciones."""
+    from electromagnetismo import escenarios as esc
+
+    corrientes = esc.barrido(esc.RANGO_CORRIENTE)[::submuestreo]
+    posiciones = esc.barrido(esc.RANGO_POSICION_C)[::submuestreo]
+    I0, x0, y0 = esc.conductor_por_defecto()
+    if completo:
+        combinaciones = ((I, x, y) for I in corrientes for x in posiciones for y in posiciones)
+    else:
+        combinaciones = ([(I, x0, y0) for I in corrientes]
+                         + [(I0, x, y0) for x in posiciones]
+                         + [(I0, x0, y) for y in posiciones])
+    vistos = set()
+    for conductor in combinaciones:
+        clave = esc.clave_C([conductor])
+        if clave not in vistos:
+            vistos.add(clave)
+            yield clave, [conductor]
+
+
+def precalcular(almacen, paginas=("B", "C"), submuestreo=1, completo=False, progreso=print):
+    """Llena el almacén con los campos y figuras de los escenarios de las
+    páginas indicadas. Devuelve el número de escenarios calculados."""
+    from electromagnetismo import escenarios as esc
+
+    calculados = 0
+    for pagina in paginas:
+        if pagina == "B":
+            X, Y = esc.malla_B()
+            lista, campo, figura = _escenarios_B(submuestreo), esc.campo_B, esc.figura_B
+            lienzo = esc.lienzo_B()
+        elif pagina == "C":
+            X, Y = esc.malla_C()
+            lista, campo, figura = _escenarios_C(submuestreo, completo), esc.campo_C, esc.figura_C
+            lienzo = esc.lienzo_C()
+        else:
+            raise ValueError(f"Página desconocida: {pagina}")
+
+        # Una sola figura por página, de la que sólo cambian los datos
+        for n, (clave, fuentes) in enumerate(lista, 1):
+            valores = almacen.obtener_o_calcular(("campos", clave), lambda: campo(fuentes, X, Y))
+            almacen.obtener_o_calcular(("figuras", clave),
+                                       lambda: figura(fuentes, X, Y, *valores, lienzo=lienzo))
+            calculados += 1
+            if progreso is not None and n % 50 == 0:
+                progreso(f"Página {pagina}: {n} escenarios")
+        lienzo.cerrar()
+    return calculados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m electromagnetismo.almacen",
+        description="Administra el almacén en disco de campos y figuras.")
+    parser.add_argument("--directorio", default=DIRECTORIO)
+    parser.add_argument("--presupuesto-mb", type=float, default=PRESUPUESTO_MB)
+    sub = parser.add_subparsers(dest="orden", required=True)
+
+    pre = sub.add_parser("precalcular", help="barre los sliders y guarda los resultados")
+    pre.add_argument("--pagina", nargs="+", default=["B", "C"], choices=["B", "C"])
+    pre.add_argument("--submuestreo", type=int, default=1,
+                     help="usar sólo uno de cada N valores de cada slider")
+    pre.add_argument("--completo", action="store_true",
+                     help="página C: todas las combinaciones de corriente y posición")
+    sub.add_parser("estado", help="muestra el tamaño y número de entradas")
+    sub.add_parser("recolectar", help="aplica el presupuesto de tamaño")
+    sub.add_parser("limpiar", help="borra todas las entradas")
+    args = parser.parse_args(argv)
+
+    almacen = AlmacenDisco(args.directorio, args.presupuesto_mb)
+    if args.orden == "precalcular":
+        inicio = time.perf_counter()
+        n = precalcular(almacen, args.pagina, args.submuestreo, args.completo)
+        print(f"{n} escenarios listos en {time.perf_counter() - inicio:.1f} s")
+    elif args.orden == "recolectar":
+        print(f"{almacen.recolectar()} entradas borradas")
+    elif args.orden == "limpiar":
+        print(f"{almacen.limpiar()} entradas borradas")
+    for nombre, valor in almacen.estadisticas().items():
+        print(f"{nombre}: {valor}")
+
+
+if __name__ == "__main__":
+    main()
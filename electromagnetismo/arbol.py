@@ -0,0 +1,273 @@
+"""Evaluador jerárquico (Barnes–Hut) para nubes grandes de cargas puntuales.
+
+Las cargas se ordenan según su código de Morton y se agrupan en un árbol
+(quadtree en 2D, octree en 3D). Cada celda guarda su expansión multipolar
+alrededor de su centro geométrico hasta el orden pedido: monopolo (0),
+dipolo (1) o cuadrupolo (2). Al evaluar, una celda de lado s vista desde una
+distancia d se aproxima por su expansión si s / d < theta; en caso contrario
+se abre y, si es una hoja, se suma directamente carga por carga.
+
+El recorrido del árbol se hace por niveles para todos los puntos de un
+bloque a la vez, con arreglos de pares (punto, celda), sin bucles por punto.
+"""
+import numpy as np
+
+from electromagnetismo.electrostatica import R_MIN, campo_electrico_malla, k
+
+# Por debajo de este número de cargas la suma directa es más rápida
+# (ver benchmarks/arbol_vs_directo.py)
+N_DIRECTO = 5000
+
+# Puntos de evaluación que se recorren juntos por el árbol
+_PUNTOS_POR_BLOQUE = 2048
+
+
+class ArbolCargas:
+    """Árbol de Barnes–Hut construido una vez y evaluable en muchas mallas."""
+
+    def __init__(self, posiciones, cargas, orden=2, hoja=32):
+        posiciones = np.atleast_2d(np.asarray(posiciones, dtype=float))
+        cargas = np.atleast_1d(np.asarray(cargas, dtype=float))
+        if posiciones.shape[0] != cargas.shape[0] or posiciones.shape[1] not in (2, 3):
+            raise ValueError(
+                "posiciones debe tener forma (N, 2) o (N, 3) y cargas forma (N,)")
+        if orden not in (0, 1, 2):
+            raise ValueError("orden debe ser 0 (monopolo), 1 (dipolo) o 2 (cuadrupolo)")
+
+        self.dim = posiciones.shape[1]
+        self.orden = orden
+        self.hoja = max(1, int(hoja))
+        self._construir(posiciones, cargas)
+
+    # --- Construcción ---
+
+    def _construir(self, posiciones, cargas):
+        dim = self.dim
+        profundidad = 20 if dim == 3 else 30
+
+        minimo = posiciones.min(axis=0)
+        lado = float(np.max(posiciones.max(axis=0) - minimo))
+        lado = lado * (1 + 1e-9) if lado > 0 else 1.0
+        self.origen = minimo
+        self.lado = lado
+
+        # Coordenadas enteras en la resolución más fina y código de Morton
+        n_celdas = 1 << profundidad
+        enteros = np.minimum(((posiciones - minimo) / lado * n_celdas).astype(np.int64),
+                             n_celdas - 1)
+        clave = np.zeros(len(cargas), dtype=np.int64)
+        for bit in range(profundidad):
+            for d in range(dim):
+                clave |= ((enteros[:, d] >> bit) & 1) << (bit * dim + d)
+
+        orden_morton = np.argsort(clave, kind="stable")
+        self.posiciones = posiciones[orden_morton]
+        self.cargas = cargas[orden_morton]
+        clave = clave[orden_morton]
+        enteros = enteros[orden_morton]
+
+        # Momentos por carga; los de cada celda se obtienen con _sumar_rangos
+        q = self.cargas
+        qx = q[:, None] * self.posiciones
+        qxx = (qx[:, :, None] * self.posiciones[:, None, :]
+               if self.orden == 2 else None)
+
+        niveles = []
+        activos = np.arange(len(q))
+        for nivel in range(profundidad + 1):
+            if activos.size == 0:
+                break
+            clave_nivel = clave[activos] >> (dim * (profundidad - nivel))
+            corte = np.flatnonzero(np.diff(clave_nivel)) + 1
+            ini_rel = np.concatenate(([0], corte))
+            fin_rel = np.concatenate((corte, [activos.size]))
+            ini = activos[ini_rel]
+            fin = activos[fin_rel - 1] + 1
+
+            lado_nivel = lado / (1 << nivel)
+            celda = enteros[ini] >> (profundidad - nivel)
+            centro = minimo + (celda + 0.5) * lado_nivel
+
+            q_nodo = _sumar_rangos(q, ini, fin)
+            qx_nodo = _sumar_rangos(qx, ini, fin)
+            nodo = {
+                "clave": clave_nivel[ini_rel],
+                "centro": centro,
+                "lado": np.full(ini.size, lado_nivel),
+                "inicio": ini,
+                "fin": fin,
+                "Q": q_nodo,
+                "p": qx_nodo - q_nodo[:, None] * centro,
+            }
+            if self.orden == 2:
+                qxx_nodo = _sumar_rangos(qxx, ini, fin)
+                # Σ q d_i d_j con d = x - c
+                dd = (qxx_nodo
+                      - centro[:, :, None] * qx_nodo[:, None, :]
+                      - qx_nodo[:, :, None] * centro[:, None, :]
+                      + q_nodo[:, None, None] * centro[:, :, None] * centro[:, None, :])
+                traza = np.trace(dd, axis1=1, axis2=2)
+                nodo["Qij"] = 3 * dd - traza[:, None, None] * np.eye(dim)
+
+            # Sólo las celdas con más de `hoja` cargas se subdividen
+            nodo["interno"] = (fin - ini > self.hoja) & (nivel < profundidad)
+            niveles.append(nodo)
+            activos = activos[np.repeat(nodo["interno"], fin_rel - ini_rel)]
+
+        # Enlazar cada celda interna con sus hijas (contiguas en el nivel siguiente)
+        desplazamiento = np.cumsum([0] + [n["inicio"].size for n in niveles])
+        for nivel, nodo in enumerate(niveles):
+            nodo["hijo_inicio"] = np.zeros(nodo["inicio"].size, dtype=np.int64)
+            nodo["hijo_fin"] = np.zeros(nodo["inicio"].size, dtype=np.int64)
+            if nivel + 1 < len(niveles):
+                padres = niveles[nivel + 1]["clave"] >> dim
+                internos = nodo["interno"]
+                base = desplazamiento[nivel + 1]
+                nodo["hijo_inicio"][internos] = base + np.searchsorted(
+                    padres, nodo["clave"][internos], "left")
+                nodo["hijo_fin"][internos] = base + np.searchsorted(
+                    padres, nodo["clave"][internos], "right")
+
+        def unir(campo):
+            return np.concatenate([n[campo] for n in niveles])
+
+        self.centros = unir("centro")
+        self.lados = unir("lado")
+        self.inicios = unir("inicio")
+        self.finales = unir("fin")
+        self.interno = unir("interno")
+        self.hijo_inicio = unir("hijo_inicio")
+        self.hijo_fin = unir("hijo_fin")
+        self.Q = unir("Q")
+        self.p = unir("p")
+        self.Qij = unir("Qij") if self.orden == 2 else None
+
+    # --- Evaluación ---
+
+    def evaluar(self, X, Y, Z=None, potencial=False, theta=0.5):
+        """Campo (y potencial) sobre una malla, con la misma salida que
+        campo_electrico_malla. theta es el ángulo de apertura: valores
+        menores son más precisos y más costosos (theta = 0 equivale a la
+        suma directa)."""
+        X = np.asarray(X, dtype=float)
+        Y = np.asarray(Y, dtype=float)
+        forma = X.shape
+        columnas = [X.ravel(), Y.ravel()]
+        if self.dim == 3:
+            columnas.append(np.zeros(X.size) if Z is None
+                            else np.broadcast_to(np.asarray(Z, dtype=float), forma).ravel())
+        puntos = np.column_stack(columnas)
+
+        E = np.zeros((X.size, self.dim))
+        phi = np.zeros(X.size) if potencial else None
+        for a in range(0, X.size, _PUNTOS_POR_BLOQUE):
+            sl = slice(a, a + _PUNTOS_POR_BLOQUE)
+            E_bloque, phi_bloque = self._evaluar_bloque(puntos[sl], potencial, theta)
+            E[sl] = E_bloque
+            if potencial:
+                phi[sl] = phi_bloque
+
+        resultado = [E[:, d].reshape(forma) for d in range(self.dim)]
+        if potencial:
+            resultado.append(phi.reshape(forma))
+        return tuple(resultado)
+
+    def _evaluar_bloque(self, puntos, potencial, theta):
+        n_puntos = puntos.shape[0]
+        E = np.zeros((n_puntos, self.dim))
+        phi = np.zeros(n_puntos) if potencial else None
+
+        # Pares (punto, celda) pendientes, empezando por la raíz
+        t = np.arange(n_puntos)
+        n = np.zeros(n_puntos, dtype=np.int64)
+        theta2 = theta * theta
+        while t.size:
+            r = puntos[t] - self.centros[n]
+            R2 = np.einsum("ij,ij->i", r, r)
+            acepta = self.lados[n] ** 2 < theta2 * R2
+
+            if acepta.any():
+                ta, na, ra, R2a = t[acepta], n[acepta], r[acepta], R2[acepta]
+                E_m, phi_m = self._multipolo(na, ra, R2a, potencial)
+                for d in range(self.dim):
+                    E[:, d] += np.bincount(ta, weights=E_m[:, d], minlength=n_puntos)
+                if potencial:
+                    phi += np.bincount(ta, weights=phi_m, minlength=n_puntos)
+
+            resto = ~acepta
+            hojas = resto & ~self.interno[n]
+            if hojas.any():
+                self._directo(puntos, t[hojas], n[hojas], E, phi, n_puntos)
+
+            abrir = resto & self.interno[n]
+            t, n = _expandir(t[abrir], self.hijo_inicio[n[abrir]], self.hijo_fin[n[abrir]])
+        return E, phi
+
+    def _multipolo(self, nodos, r, R2, potencial):
+        R = np.sqrt(R2)
+        inv_R2 = 1.0 / R2
+        inv_R3 = inv_R2 / R
+
+        Q = self.Q[nodos]
+        E = (Q * inv_R3)[:, None] * r
+        phi = Q / R if potencial else None
+        if self.orden >= 1:
+            p = self.p[nodos]
+            p_r = np.einsum("ij,ij->i", p, r)
+            E += ((3 * p_r * inv_R2 * inv_R3)[:, None] * r
+                  - inv_R3[:, None] * p)
+            if potencial:
+                phi += p_r * inv_R3
+        if self.orden == 2:
+            Qr = np.einsum("ijk,ik->ij", self.Qij[nodos], r)
+            rQr = np.einsum("ij,ij->i", r, Qr)
+            inv_R5 = inv_R3 * inv_R2
+            E += ((2.5 * rQr * inv_R5 * inv_R2)[:, None] * r
+                  - inv_R5[:, None] * Qr)
+            if potencial:
+                phi += 0.5 * rQr * inv_R5
+        return k * E, (k * phi if potencial else None)
+
+    def _directo(self, puntos, t, n, E, phi, n_puntos):
+        t, j = _expandir(t, self.inicios[n], self.finales[n])
+        r = puntos[t] - self.posiciones[j]
+        R = np.sqrt(np.einsum("ij,ij->i", r, r))
+        cerca = R < R_MIN
+        R[cerca] = np.inf  # la carga no contribuye, como en la suma directa
+        kq = k * self.cargas[j]
+        factor = kq / (R * R * R)
+        for d in range(self.dim):
+            E[:, d] += np.bincount(t, weights=factor * r[:, d], minlength=n_puntos)
+        if phi is not None:
+            phi += np.bincount(t, weights=kq / R, minlength=n_puntos)
+
+
+def _sumar_rangos(valores, inicio, fin):
+    """Suma valores[inicio[i]:fin[i]] para cada i (rangos no vacíos y
+    ordenados, que pueden dejar huecos entre sí)."""
+    relleno = np.zeros((1,) + valores.shape[1:])
+    extendido = np.concatenate((valores, relleno))
+    indices = np.column_stack((inicio, fin)).ravel()
+    return np.add.reduceat(extendido, indices, axis=0)[::2]
+
+
+def _expandir(t, inicio, fin):
+    """Repite cada índice t tantas veces como elementos hay en [inicio, fin)
+    y devuelve, para cada repetición, el índice correspondiente del rango."""
+    cuentas = fin - inicio
+    total = int(cuentas.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    t_rep = np.repeat(t, cuentas)
+    desfase = np.repeat(inicio - (np.cumsum(cuentas) - cuentas), cuentas)
+    return t_rep, desfase + np.arange(total)
+
+
+def campo_arbol(posiciones, cargas, X, Y, Z=None, potencial=False,
+                theta=0.5, orden=2, hoja=32, n_directo=N_DIRECTO):
+    """Igual que campo_electrico_malla, pero con el árbol de Barnes–Hut
+    cuando hay más de n_directo cargas."""
+    if np.size(cargas) <= n_directo:
+        return campo_electrico_malla(posiciones, cargas, X, Y, Z=Z, potencial=potencial)
+    arbol = ArbolCargas(posiciones, cargas, orden=orden, hoja=hoja)
+    return arbol.evaluar(X, Y, Z=Z, potencial=potencial, theta=theta)
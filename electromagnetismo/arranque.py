@@ -0,0 +1,155 @@
+"""Calentamiento del servidor al arrancar.
+
+La primera visita a cada página paga la importación de matplotlib y
+pyplot, la carga de las fuentes y el cálculo de la configuración inicial de
+puntos, cargas y conductores. calentar() hace todo eso una vez, antes de
+atender la primera sesión: importa los módulos que comparten las páginas,
+inicializa el backend Agg y las fuentes dibujando una figura con texto, y
+deja en las cachés compartidas del proceso (y en el almacén en disco) las
+figuras y campos de los escenarios iniciales de las páginas A, B y C, con
+las mismas claves que usan las páginas.
+
+servidor.py lo llama al arrancar salvo que se defina EM_CALENTAR=0. Solo,
+`python -m electromagnetismo.arranque` muestra cuánto tarda cada etapa en
+un proceso nuevo.
+"""
+import importlib
+import os
+import time
+
+CALENTAR = os.environ.get("EM_CALENTAR", "1") not in ("", "0")
+
+# Módulos que importan las páginas, además de los del paquete que importa
+# escenarios
+MODULOS = ("numpy", "PIL.Image", "matplotlib.pyplot", "matplotlib.collections",
+           "electromagnetismo.escenarios", "electromagnetismo.adaptativo",
+           "electromagnetismo.arbol", "electromagnetismo.bobinas", "electromagnetismo.datos",
+           "electromagnetismo.incremental", "electromagnetismo.recursos")
+
+
+def _matplotlib():
+    """Backend Agg, lista de fuentes y caché de glifos de la fuente por
+    defecto."""
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib import font_manager
+
+    from electromagnetismo.figuras import Lienzo
+
+    # findfont carga la lista de fuentes (o la construye, la primera vez en
+    # la máquina); dibujar texto abre el archivo de la fuente
+    font_manager.findfont(font_manager.FontProperties())
+
+    def construir(fig):
+        ax = fig.subplots()
+        ax.set_title("Campo Eléctrico 0123456789 (m) φ")
+        ax.set_xlabel("x (m)")
+        return {"ax": ax}
+
+    lienzo = Lienzo(construir, figsize=(3, 3))
+    lienzo.png()
+    lienzo.cerrar()
+
+
+def _importar():
+    for nombre in MODULOS:
+        importlib.import_module(nombre)
+
+
+def _recursos():
+    from electromagnetismo.recursos import ANCHOS, miniatura
+
+    for nombre in ANCHOS:
+        miniatura(nombre)
+
+
+def _caches():
+    from electromagnetismo.almacen import almacen_compartido
+    from electromagnetismo.cache import obtener_cache
+
+    # La primera llamada a obtener_cache fija el respaldo: el mismo que
+    # piden las páginas
+    almacen = almacen_compartido()
+    return obtener_cache("campos", respaldo=almacen), obtener_cache("figuras", respaldo=almacen)
+
+
+def _pagina_A():
+    from electromagnetismo import escenarios as esc
+
+    _, cache_figuras = _caches()
+    A, B, C = esc.puntos_por_defecto()
+    cache_figuras.obtener_o_calcular(esc.clave_A("ubicacion", A, B, C),
+                                     lambda: esc.figura_A_ubicacion(A, B, C))
+    cache_figuras.obtener_o_calcular(esc.clave_A("distancias", A, B, C),
+                                     lambda: esc.figura_A_distancias(A, B, C))
+
+
+def _pagina_B():
+    from electromagnetismo import escenarios as esc
+
+    cache_campos, cache_figuras = _caches()
+    X, Y = esc.malla_B()
+    fuentes = esc.fuentes_B(esc.cargas_por_defecto())
+    clave = esc.clave_B(fuentes)
+    valores = cache_campos.obtener_o_calcular(clave, lambda: esc.campo_B(fuentes, X, Y))
+    cache_figuras.obtener_o_calcular(clave, lambda: esc.figura_B(fuentes, X, Y, *valores))
+
+
+def _pagina_C():
+    from electromagnetismo import escenarios as esc
+
+    cache_campos, cache_figuras = _caches()
+    X, Y = esc.malla_C()
+    conductores = [esc.conductor_por_defecto()]
+    clave = esc.clave_C(conductores)
+    valores = cache_campos.obtener_o_calcular(clave, lambda: esc.campo_C(conductores, X, Y))
+    cache_figuras.obtener_o_calcular(clave, lambda: esc.figura_C(conductores, X, Y, *valores))
+
+    # Las otras dos secciones: conductores paralelos y una espira circular
+    X, Y = esc.malla_superposicion()
+    hilos = esc.hilos_por_defecto()
+    clave = esc.clave_hilos(hilos)
+    H = cache_campos.obtener_o_calcular(clave, lambda: esc.campo_hilos(hilos, X, Y))
+    cache_figuras.obtener_o_calcular(clave, lambda: esc.figura_hilos(hilos, X, Y, *H))
+
+    X, Y = esc.malla_bobina(esc.RESOLUCION_BOBINA)
+    espiras = esc.bobina_por_defecto()
+    clave = esc.clave_bobina(espiras, esc.RESOLUCION_BOBINA, True)
+    *B, _ = cache_campos.obtener_o_calcular(clave, lambda: esc.campo_bobina(espiras, X, Y))
+    cache_figuras.obtener_o_calcular(
+        clave + ("Espira",), lambda: esc.figura_bobina("Espira", espiras, X, Y, *B))
+
+
+ETAPAS = {
+    "matplotlib": _matplotlib,
+    "importaciones": _importar,
+    "recursos": _recursos,
+    "pagina A": _pagina_A,
+    "pagina B": _pagina_B,
+    "pagina C": _pagina_C,
+}
+
+
+def calentar(etapas=None):
+    """Ejecuta las etapas (todas por defecto) en orden y devuelve la
+    duración de cada una en segundos."""
+    tiempos = {}
+    for nombre in etapas or ETAPAS:
+        inicio = time.perf_counter()
+        ETAPAS[nombre]()
+        tiempos[nombre] = time.perf_counter() - inicio
+    return tiempos
+
+
+def informe(tiempos):
+    """Una línea con el total y la duración de cada etapa."""
+    detalle = ", ".join(f"{nombre} {segundos * 1e3:.0f} ms" for nombre, segundos in tiempos.items())
+    return f"Calentamiento: {sum(tiempos.values()):.2f} s ({detalle})"
+
+
+def main():
+    print(informe(calentar()))
+
+
+if __name__ == "__main__":
+    main()
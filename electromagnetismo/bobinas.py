@@ -0,0 +1,168 @@
+"""Campo de espiras circulares, bobinas de Helmholtz y solenoides.
+
+El campo de una espira circular tiene forma cerrada en función de las
+integrales elípticas completas K(m) y E(m), así que no hace falta
+discretizarla en elementos dl. Una espira se describe con la tupla
+(I, radio, centro, eje); las bobinas son listas de espiras.
+"""
+import numpy as np
+
+from electromagnetismo.magnetostatica import MU0, R_MIN
+from electromagnetismo.teselas import aplanar, dimensionar, puntos_tesela, tipo_salida
+
+# Pares (espira, punto) por bloque de evaluación, como máximo
+_PARES_POR_BLOQUE = 16384
+
+
+def integrales_elipticas(m):
+    """K(m) y E(m) (parámetro m = k²) para un arreglo de m en [0, 1), con la
+    media aritmético-geométrica. Converge cuadráticamente: unas pocas
+    iteraciones bastan salvo muy cerca de m = 1."""
+    m = np.asarray(m, dtype=float)
+    a = np.ones_like(m)
+    b = np.sqrt(1 - m)
+    suma = 0.5 * m      # Σ 2^(n-1) c_n², con c_0² = m
+    d = np.empty_like(m)
+    potencia = 0.125    # 2^(n-1) / 4, porque d² = 4 c_n²
+    for _ in range(40):
+        np.subtract(a, b, out=d)
+        np.multiply(d, d, out=d)
+        if not (d > 4e-32).any():
+            break
+        potencia *= 2
+        d *= potencia
+        suma += d
+        np.multiply(a, b, out=d)  # a_(n+1) = (a + b)/2, b_(n+1) = √(a b)
+        a += b
+        a *= 0.5
+        np.sqrt(d, out=b)
+    K = np.pi / (2 * a)
+    suma -= 1
+    suma *= -K
+    return K, suma
+
+
+def _eje_unitario(eje):
+    ejes = {"x": (1.0, 0.0, 0.0), "y": (0.0, 1.0, 0.0), "z": (0.0, 0.0, 1.0)}
+    n = np.asarray(ejes.get(eje, eje) if isinstance(eje, str) else eje, dtype=float)
+    return n / np.linalg.norm(n)
+
+
+def _cilindricas(radio, rho, z, potencial):
+    """Br, Bz (y A_φ) por unidad de μ0 I / 2π de espiras de `radio` en z = 0,
+    en los puntos (ρ, z). Los argumentos se combinan por broadcasting."""
+    suma2 = (radio + rho)**2 + z**2
+    resta2 = (radio - rho)**2 + z**2
+    cerca = resta2 < R_MIN**2
+    resta2 = np.where(cerca, np.inf, resta2)
+    m = np.where(cerca, 0.0, 4 * radio * rho / suma2)
+    K, E = integrales_elipticas(m)
+
+    raiz = np.sqrt(suma2)
+    factor = np.where(cerca, 0.0, 1 / raiz)
+    Bz = factor * (K + (radio**2 - rho**2 - z**2) / resta2 * E)
+    # Sobre el eje m = 0, K = E y el corchete es exactamente cero
+    rho_seguro = np.where(rho > 0, rho, 1.0)
+    Br = factor * z / rho_seguro * (-K + (radio**2 + rho**2 + z**2) / resta2 * E)
+    if not potencial:
+        return Br, Bz, None
+    # A_φ = μ0 I / (π k) √(a/ρ) [(1 - m/2) K - E]; el corchete se anula como
+    # m² y para m pequeño se usa su serie para evitar la cancelación
+    corchete = np.where(
+        m < 1e-3, np.pi / 2 * m**2 * (1 / 16 + m * (3 / 64 + m * 75 / 2048)),
+        (1 - m / 2) * K - E)
+    A_phi = np.where(cerca, 0.0, raiz / rho_seguro * corchete)
+    return Br, Bz, A_phi
+
+
+def campo_espiras(espiras, X, Y, Z=None, potencial=False, memoria=None,
+                  dtype=np.float64):
+    """Campo B de varias espiras circulares (I, radio, centro, eje): espira
+    de `radio` con corriente I, centrada en `centro` y perpendicular a `eje`
+    (vector o 'x', 'y', 'z'), con la corriente en sentido antihorario visto
+    desde la punta del eje.
+
+    Devuelve (Bx, By, Bz) con la forma de X. Si potencial=True se agrega el
+    potencial vectorial (Ax, Ay, Az), que es azimutal alrededor de cada eje.
+    Los puntos a menos de R_MIN del alambre no reciben aporte. memoria y
+    dtype funcionan como en magnetostatica.campo_b_segmentos.
+
+    Las espiras coaxiales (solenoides, pares de Helmholtz) comparten las
+    coordenadas cilíndricas de los puntos y se evalúan juntas.
+    """
+    if not espiras:
+        raise ValueError("Se necesita al menos una espira")
+    forma, coordenadas = aplanar(X, Y, Z)
+    n_puntos = coordenadas[0].size
+
+    # Agrupar por eje: misma dirección y misma recta
+    grupos = {}
+    for I, radio, centro, eje in espiras:
+        n = _eje_unitario(eje)
+        centro = np.asarray(centro, dtype=float)
+        s = centro @ n
+        recta = tuple(np.round(np.concatenate([n, centro - s * n]), 12))
+        grupos.setdefault(recta, (n, centro - s * n, []))[2].append((I, radio, s))
+    grupos = [(n, origen, *(np.array(c, dtype=float)[:, None] for c in zip(*lista)))
+              for n, origen, lista in grupos.values()]
+
+    salidas = 6 if potencial else 3
+    resultado = np.empty((n_puntos, salidas), dtype=tipo_salida(dtype))
+    n_max = max(len(g[2]) for g in grupos)
+    tesela, bloque = dimensionar(
+        n_puntos, n_max, bytes_por_par=12 * 8, memoria=memoria,
+        tesela_max=max(1, _PARES_POR_BLOQUE // n_max), bytes_por_punto=(12 + salidas) * 8)
+    for a in range(0, n_puntos, tesela):
+        sl = slice(a, a + tesela)
+        P = puntos_tesela(coordenadas, sl, n_puntos)
+        acumulado = np.zeros((P.shape[0], salidas))
+        for n, origen, I, radios, s in grupos:
+            d = P - origen
+            z = d @ n
+            rho_vec = d - z[:, None] * n
+            rho = np.sqrt(np.einsum("ij,ij->i", rho_vec, rho_vec))
+            rho_hat = np.divide(rho_vec, rho[:, None], out=np.zeros_like(rho_vec),
+                                where=rho[:, None] > 0)
+
+            Br, Bz = np.zeros_like(rho), np.zeros_like(rho)
+            A_phi = np.zeros_like(rho) if potencial else None
+            for b in range(0, I.shape[0], bloque):
+                bl = slice(b, b + bloque)
+                br, bz, ap = _cilindricas(radios[bl], rho[None, :], z[None, :] - s[bl],
+                                          potencial)
+                Br += (I[bl] * br).sum(axis=0)
+                Bz += (I[bl] * bz).sum(axis=0)
+                if potencial:
+                    A_phi += (I[bl] * ap).sum(axis=0)
+
+            acumulado[:, :3] += Br[:, None] * rho_hat + Bz[:, None] * n
+            if potencial:
+                acumulado[:, 3:] += A_phi[:, None] * np.cross(n, rho_hat)
+        acumulado *= MU0 / (2 * np.pi)
+        resultado[sl] = acumulado
+
+    return tuple(resultado[:, i].reshape(forma) for i in range(salidas))
+
+
+def campo_espira(I, radio, X, Y, Z=None, centro=(0.0, 0.0, 0.0), eje="z",
+                 potencial=False, memoria=None, dtype=np.float64):
+    """Campo B de una sola espira circular; ver campo_espiras."""
+    return campo_espiras([(I, radio, centro, eje)], X, Y, Z, potencial=potencial,
+                         memoria=memoria, dtype=dtype)
+
+
+def helmholtz(I, radio, centro=(0.0, 0.0, 0.0), eje="z"):
+    """Par de Helmholtz: dos espiras iguales separadas una distancia igual
+    al radio, con la misma corriente."""
+    n = _eje_unitario(eje)
+    centro = np.asarray(centro, dtype=float)
+    return [(I, radio, tuple(centro + s * radio / 2 * n), tuple(n)) for s in (-1, 1)]
+
+
+def solenoide(I, radio, longitud, vueltas, centro=(0.0, 0.0, 0.0), eje="z"):
+    """Solenoide de `vueltas` espiras igualmente espaciadas a lo largo de
+    `longitud`, centrado en `centro`."""
+    n = _eje_unitario(eje)
+    centro = np.asarray(centro, dtype=float)
+    posiciones = np.linspace(-longitud / 2, longitud / 2, vueltas) if vueltas > 1 else [0.0]
+    return [(I, radio, tuple(centro + s * n), tuple(n)) for s in posiciones]
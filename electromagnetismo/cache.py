@@ -0,0 +1,159 @@
+"""Caché LRU de resultados compartida por todas las sesiones del servidor.
+
+Streamlit ejecuta cada sesión en un hilo del mismo proceso, así que una
+caché a nivel de módulo es visible para todos los estudiantes conectados.
+Las entradas se identifican con la tupla de parámetros cuantizada y se
+desalojan por orden de uso cuando se supera el límite de memoria.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Límite de memoria por defecto de cada caché, configurable por entorno
+MEMORIA_MB = float(os.environ.get("EM_CACHE_MB", "256"))
+
+_caches = {}
+_candado_registro = threading.Lock()
+
+
+def cuantizar(valores, cifras=10):
+    """Convierte una estructura de parámetros en una clave hashable,
+    redondeando los números reales a `cifras` cifras significativas para
+    que valores iguales salvo ruido de punto flotante compartan entrada."""
+    if isinstance(valores, (list, tuple)):
+        return tuple(cuantizar(v, cifras) for v in valores)
+    if isinstance(valores, np.ndarray):
+        return (valores.shape, cuantizar(valores.ravel().tolist(), cifras))
+    if isinstance(valores, (float, np.floating)):
+        valor = float(f"{float(valores):.{cifras}g}")
+        return 0.0 if valor == 0 else valor  # -0.0 y 0.0 son la misma clave
+    if isinstance(valores, np.integer):
+        return int(valores)
+    return valores
+
+
+def _tamano(valor):
+    """Tamaño aproximado en bytes de un valor guardado en la caché."""
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, (list, tuple)):
+        return sum(_tamano(v) for v in valor) + sys.getsizeof(valor)
+    return sys.getsizeof(valor)
+
+
+def _congelar(valor):
+    """Marca los arreglos como de sólo lectura: el mismo objeto se entrega a
+    varias sesiones y ninguna debe poder modificarlo."""
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, (list, tuple)):
+        for v in valor:
+            _congelar(v)
+    return valor
+
+
+class CacheLRU:
+    """Diccionario con límite de memoria, desalojo LRU y contadores.
+
+    Si se da un `respaldo` (por ejemplo un AlmacenDisco), los fallos se
+    buscan primero en él y los valores calculados también se guardan allí,
+    bajo la clave (espacio, clave) para que varias cachés lo compartan.
+    """
+
+    def __init__(self, memoria_max=MEMORIA_MB * 2**20, respaldo=None, espacio=None):
+        self.memoria_max = int(memoria_max)
+        self.respaldo = respaldo
+        self.espacio = espacio
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self.memoria = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        with self._candado:
+            return clave in self._entradas
+
+    def obtener(self, clave, defecto=None):
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave][0]
+            self.fallos += 1
+            return defecto
+
+    def guardar(self, clave, valor):
+        tamano = _tamano(valor)
+        if tamano > self.memoria_max:
+            return valor
+        _congelar(valor)
+        with self._candado:
+            if clave in self._entradas:
+                self.memoria -= self._entradas.pop(clave)[1]
+            self._entradas[clave] = (valor, tamano)
+            self.memoria += tamano
+            while self.memoria > self.memoria_max:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self.memoria -= liberado
+                self.desalojos += 1
+        return valor
+
+    def obtener_o_calcular(self, clave, calcular):
+        """Devuelve el valor guardado o lo calcula con calcular() y lo guarda.
+        Dos sesiones con la misma clave pueden calcular a la vez; el
+        resultado es el mismo, así que no se bloquea durante el cálculo."""
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave][0]
+            self.fallos += 1
+        if self.respaldo is not None:
+            valor = self.respaldo.obtener_o_calcular((self.espacio, clave), calcular)
+        else:
+            valor = calcular()
+        return self.guardar(clave, valor)
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.memoria = 0
+
+    def estadisticas(self):
+        total = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._entradas),
+            "memoria_mb": self.memoria / 2**20,
+            "memoria_max_mb": self.memoria_max / 2**20,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "tasa_aciertos": self.aciertos / total if total else 0.0,
+        }
+
+
+def obtener_cache(nombre, memoria_max=None, respaldo=None):
+    """Caché compartida del proceso con el nombre dado. Se crea la primera
+    vez que se pide, con el límite de memoria y el respaldo indicados."""
+    with _candado_registro:
+        if nombre not in _caches:
+            if memoria_max is None:
+                memoria_max = MEMORIA_MB * 2**20
+            _caches[nombre] = CacheLRU(memoria_max, respaldo=respaldo, espacio=nombre)
+        return _caches[nombre]
+
+
+def estadisticas():
+    """Estadísticas de todas las cachés registradas, por nombre."""
+    with _candado_registro:
+        return {nombre: cache.estadisticas() for nombre, cache in _caches.items()}
@@ -0,0 +1,59 @@
+"""Lectura de distribuciones de carga desde archivos CSV o NPZ."""
+import io
+import os
+import zipfile
+
+import numpy as np
+
+
+def cargar_cargas(archivo, nombre=None):
+    """Lee una distribución de cargas puntuales y devuelve (posiciones, cargas).
+
+    archivo puede ser una ruta o un objeto tipo archivo (por ejemplo, el que
+    entrega st.file_uploader); el formato se deduce de la extensión de
+    `nombre` o del propio archivo.
+
+    - CSV: columnas x, y, q o x, y, z, q (con o sin encabezado).
+    - NPZ: arreglos `posiciones` (N, 2|3) y `cargas` (N,), o bien x, y,
+      (z,) q por separado.
+    """
+    if nombre is None:
+        nombre = archivo if isinstance(archivo, (str, os.PathLike)) \
+            else getattr(archivo, "name", "")
+    extension = os.path.splitext(str(nombre))[1].lower()
+
+    if extension == ".npz":
+        try:
+            with np.load(archivo) as datos:
+                if "posiciones" in datos and "cargas" in datos:
+                    posiciones = datos["posiciones"]
+                    cargas = datos["cargas"]
+                elif all(c in datos for c in ("x", "y", "q")):
+                    columnas = [datos[c] for c in ("x", "y", "z") if c in datos]
+                    posiciones = np.column_stack(columnas)
+                    cargas = datos["q"]
+                else:
+                    raise ValueError("El NPZ debe contener los arreglos posiciones y cargas, "
+                                     "o bien x, y, (z,) q")
+        except (zipfile.BadZipFile, OSError, EOFError) as error:
+            raise ValueError(f"El NPZ no se pudo abrir: {error}") from error
+    elif extension in (".csv", ".txt"):
+        if not isinstance(archivo, (str, os.PathLike)):
+            contenido = archivo.read()
+            if isinstance(contenido, bytes):
+                contenido = contenido.decode("utf-8")
+            archivo = io.StringIO(contenido)
+        tabla = np.atleast_2d(np.genfromtxt(archivo, delimiter=",", dtype=float))
+        tabla = tabla[~np.isnan(tabla).all(axis=1)]  # descarta el encabezado
+        if tabla.ndim != 2 or tabla.shape[1] not in (3, 4):
+            raise ValueError("El CSV debe tener columnas x, y, q o x, y, z, q")
+        posiciones, cargas = tabla[:, :-1], tabla[:, -1]
+    else:
+        raise ValueError(f"Formato no soportado: '{extension}' (use .csv o .npz)")
+
+    posiciones = np.asarray(posiciones, dtype=float)
+    cargas = np.asarray(cargas, dtype=float).ravel()
+    if posiciones.ndim != 2 or posiciones.shape[1] not in (2, 3) \
+            or posiciones.shape[0] != cargas.shape[0]:
+        raise ValueError("Se esperaban posiciones (N, 2|3) y N cargas")
+    return posiciones, cargas
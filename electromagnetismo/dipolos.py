@@ -0,0 +1,305 @@
+"""Aproximación de dipolos discretos (DDA) con acoplamiento completo.
+
+El blanco es un conjunto de N dipolos sobre una red cúbica de paso d (las
+celdas marcadas de una máscara de ocupación nx × ny × nz). Cada dipolo
+responde al campo local, el incidente más el que radian todos los demás:
+
+    P_j = α_j (E_inc,j + Σ_(k≠j) G(r_j - r_k) P_k)
+
+donde P = p / 4πε0 (m³·V/m) y G es el tensor de Green del dipolo oscilante,
+
+    G(r) = e^(ikr) / r³ [(k²r² - 1 + ikr) I + (3 - 3ikr - k²r²) r̂r̂]
+
+A diferencia del cuaderno, que suma sólo un término aproximado y en un
+bucle, aquí se resuelve el sistema (α⁻¹ - G) P = E_inc de 3N incógnitas
+con BiCGSTAB o GMRES. G sólo depende de la diferencia de índices en la
+red, así que es de Toeplitz de tres niveles: basta guardar la FFT de sus
+seis componentes sobre una red de 2nx × 2ny × 2nz y cada producto es una
+convolución con FFT. Nunca se forma la matriz de 3N × 3N: la memoria es
+O(N), unos 2 kB por celda de la red en complex128 y la mitad en complex64,
+y se pueden resolver 10⁵ a 10⁶ dipolos en un solo procesador.
+
+Las secciones eficaces de extinción, absorción y dispersión siguen a Draine
+y Flatau (1994); mie() da las de una esfera para comparar.
+"""
+import numpy as np
+
+# Coeficientes de la polarizabilidad LDR (Draine y Goodman, 1993)
+_LDR = (-1.891531, 0.1648469, -1.7700004)
+
+# Componentes del tensor de Green que se guardan (es simétrico)
+_PARES = ((0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2))
+
+
+def esfera(n):
+    """Máscara de ocupación (n, n, n) de una esfera de n celdas de diámetro."""
+    c = np.arange(n) - (n - 1) / 2
+    return c[:, None, None]**2 + c[None, :, None]**2 + c[None, None, :]**2 <= (n / 2)**2
+
+
+def cubo(n):
+    return np.ones((n, n, n), dtype=bool)
+
+
+def polarizabilidad(epsilon_r, d, k, direccion=(0, 0, 1), polarizacion=(1, 0, 0),
+                    prescripcion="LDR"):
+    """Polarizabilidad α (m³) de una celda de lado d: Clausius–Mossotti con
+    la corrección radiativa ("CMRR") o la relación de dispersión de la red
+    ("LDR"), que depende de la dirección y la polarización incidentes."""
+    epsilon_r = np.asarray(epsilon_r, dtype=complex)
+    cm = 3 * d**3 / (4 * np.pi) * (epsilon_r - 1) / (epsilon_r + 2)
+    if prescripcion == "CMRR":
+        return cm / (1 - 2j / 3 * k**3 * cm)
+    if prescripcion != "LDR":
+        raise ValueError(f"prescripción desconocida: {prescripcion!r}")
+    b1, b2, b3 = _LDR
+    S = float(np.sum((np.asarray(direccion, float) * np.asarray(polarizacion, float))**2))
+    kd = k * d
+    return cm / (1 + cm / d**3 * ((b1 + epsilon_r * (b2 + b3 * S)) * kd**2 - 2j / 3 * kd**3))
+
+
+def bicgstab(A, b, tolerancia=1e-5, max_iter=1000):
+    """Resuelve A x = b (A @ x) con BiCGSTAB hasta ‖r‖ ≤ tolerancia ‖b‖.
+    Devuelve (x, productos)."""
+    x = np.zeros_like(b)
+    r = b.copy()
+    sombra = r.conj()
+    p = r.copy()
+    rho = sombra @ r
+    limite = tolerancia * np.linalg.norm(b)
+    for iteracion in range(1, max_iter + 1):
+        v = A @ p
+        alfa = rho / (sombra @ v)
+        r -= alfa * v                       # s
+        x += alfa * p
+        if np.linalg.norm(r) <= limite:
+            return x, 2 * iteracion - 1
+        t = A @ r
+        omega = (t.conj() @ r) / (t.conj() @ t)
+        if not np.isfinite(omega) or omega == 0:
+            raise RuntimeError("BiCGSTAB se interrumpió (ω no es finito o es nulo)")
+        x += omega * r
+        r -= omega * t
+        if np.linalg.norm(r) <= limite:
+            return x, 2 * iteracion
+        rho, rho_anterior = sombra @ r, rho
+        p -= omega * v
+        p *= (rho / rho_anterior) * (alfa / omega)
+        p += r
+    raise RuntimeError(f"BiCGSTAB no convergió en {max_iter} iteraciones")
+
+
+def gmres(A, b, tolerancia=1e-5, max_iter=1000, reinicio=30):
+    """Resuelve A x = b (A @ x) con GMRES(reinicio) hasta ‖r‖ ≤ tolerancia
+    ‖b‖. Guarda reinicio + 1 vectores. Devuelve (x, productos)."""
+    x = np.zeros_like(b)
+    limite = tolerancia * np.linalg.norm(b)
+    productos = 0
+    while productos < max_iter:
+        r = b - A @ x if productos else b.copy()
+        productos += bool(productos)
+        beta = np.linalg.norm(r)
+        if beta <= limite:
+            return x, productos
+        base = [r / beta]
+        H = np.zeros((reinicio + 1, reinicio), dtype=b.dtype)
+        for j in range(reinicio):
+            w = A @ base[j]
+            productos += 1
+            for i, v in enumerate(base):          # Gram–Schmidt modificado
+                H[i, j] = v.conj() @ w
+                w -= H[i, j] * v
+            H[j + 1, j] = np.linalg.norm(w)
+            e1 = np.zeros(j + 2, dtype=b.dtype)
+            e1[0] = beta
+            y = np.linalg.lstsq(H[:j + 2, :j + 1], e1, rcond=None)[0]
+            residuo = np.linalg.norm(H[:j + 2, :j + 1] @ y - e1)
+            if residuo <= limite or H[j + 1, j] == 0 or productos >= max_iter:
+                break
+            base.append(w / H[j + 1, j])
+        x += np.stack(base[:y.size], axis=1) @ y
+        if residuo <= limite:
+            return x, productos
+    raise RuntimeError(f"GMRES no convergió en {max_iter} productos")
+
+
+class InteraccionFFT:
+    """Producto G P del tensor de Green sobre la red, como convolución con
+    FFT. P tiene forma (3, n_dipolos) en el orden de las celdas ocupadas."""
+
+    def __init__(self, ocupacion, d, k, dtype=np.complex128):
+        self.ocupacion = np.asarray(ocupacion, dtype=bool)
+        self.forma = self.ocupacion.shape
+        self.dtype = np.dtype(dtype)
+        self._tamano = tuple(2 * n for n in self.forma)
+        self._espectro = self._green(d, k)
+
+    def _green(self, d, k):
+        # Desplazamientos en el orden de la FFT: 0 .. n-1, -n, -(n-1) .. -1;
+        # el desplazamiento -n no aparece entre celdas de la red y vale 0
+        desplazamientos = []
+        for eje, n in enumerate(self.forma):
+            m = np.fft.fftfreq(2 * n, 1 / (2 * n))
+            forma = [1, 1, 1]
+            forma[eje] = 2 * n
+            desplazamientos.append((m * d).reshape(forma).astype(np.finfo(self.dtype).dtype))
+        x, y, z = desplazamientos
+        r2 = x**2 + y**2 + z**2
+        r2.flat[0] = 1.0                           # la celda consigo misma
+        r = np.sqrt(r2)
+        fase = np.exp(1j * k * r) / (r * r2)
+        kr = k * r
+        A = (fase * (kr**2 - 1 + 1j * kr)).astype(self.dtype)
+        B = (fase * (3 - 3j * kr - kr**2) / r2).astype(self.dtype)
+        del r2, r, fase, kr
+        A.flat[0] = B.flat[0] = 0
+        for eje, n in enumerate(self.forma):
+            # Planos del desplazamiento -n
+            indice = [slice(None)] * 3
+            indice[eje] = n
+            A[tuple(indice)] = 0
+            B[tuple(indice)] = 0
+        espectro = {}
+        for a, b in _PARES:
+            componente = B * desplazamientos[a] * desplazamientos[b]
+            if a == b:
+                componente = componente + A
+            espectro[a, b] = np.fft.fftn(componente)
+            del componente
+        return espectro
+
+    def _directa(self, malla):
+        """FFT de 2n por eje, eje por eje: sólo se transforman las líneas
+        que no son todo ceros del relleno."""
+        for eje in (2, 1, 0):
+            malla = np.fft.fft(malla, n=self._tamano[eje], axis=eje)
+        return malla
+
+    def _inversa(self, espectro):
+        """FFT inversa recortando cada eje a n en cuanto se transforma."""
+        for eje in (0, 1, 2):
+            recorte = [slice(None)] * 3
+            recorte[eje] = slice(self.forma[eje])
+            espectro = np.fft.ifft(espectro, axis=eje)[tuple(recorte)]
+        return espectro
+
+    def __matmul__(self, P):
+        transformadas = []
+        for componente in P:
+            malla = np.zeros(self.forma, dtype=self.dtype)
+            malla[self.ocupacion] = componente
+            transformadas.append(self._directa(malla))
+        resultado = np.empty_like(P)
+        for a in range(3):
+            suma = self._espectro[min(a, 0), max(a, 0)] * transformadas[0]
+            for b in (1, 2):
+                suma += self._espectro[min(a, b), max(a, b)] * transformadas[b]
+            resultado[a] = self._inversa(suma)[self.ocupacion]
+        return resultado
+
+
+class _Sistema:
+    """(α⁻¹ - G) como operador sobre vectores planos de 3N componentes."""
+
+    def __init__(self, inverso, interaccion):
+        self.inverso = inverso
+        self.interaccion = interaccion
+
+    def __matmul__(self, x):
+        P = x.reshape(3, -1)
+        return (self.inverso * P - self.interaccion @ P).ravel()
+
+
+class DDA:
+    """Blanco de dipolos sobre una red de paso d (m), iluminado por una onda
+    plana E0 e^(ik n̂·r) de longitud de onda `longitud_onda` (m), dirección
+    n̂ y polarización ê. epsilon_r es un escalar o un arreglo con la forma
+    de la ocupación (blancos no homogéneos)."""
+
+    def __init__(self, ocupacion, d, longitud_onda, epsilon_r, direccion=(0, 0, 1),
+                 polarizacion=(1, 0, 0), E0=1.0, prescripcion="LDR", dtype=np.complex128):
+        self.ocupacion = np.asarray(ocupacion, dtype=bool)
+        self.d = d
+        self.k = 2 * np.pi / longitud_onda
+        self.direccion = np.asarray(direccion, dtype=float) / np.linalg.norm(direccion)
+        self.polarizacion = np.asarray(polarizacion, dtype=float) / np.linalg.norm(polarizacion)
+        if abs(self.direccion @ self.polarizacion) > 1e-9:
+            raise ValueError("la polarización debe ser perpendicular a la dirección")
+        self.E0 = E0
+        self.dtype = np.dtype(dtype)
+        indices = np.argwhere(self.ocupacion)
+        self.posiciones = (indices - (np.array(self.ocupacion.shape) - 1) / 2) * d
+        epsilon_r = np.broadcast_to(np.asarray(epsilon_r), self.ocupacion.shape)[self.ocupacion]
+        self.alfa = polarizabilidad(epsilon_r, d, self.k, self.direccion, self.polarizacion,
+                                    prescripcion)
+        # El sistema se resuelve en unidades de la red (d = 1): en metros α⁻¹
+        # y G son de orden d⁻³ y sus productos desbordan en complex64
+        self.interaccion = InteraccionFFT(self.ocupacion, 1.0, self.k * d, dtype)
+        self.P = None
+        self.productos = 0
+
+    @property
+    def n(self):
+        return len(self.posiciones)
+
+    @property
+    def radio_efectivo(self):
+        """Radio de la esfera del mismo volumen (N d³)."""
+        return (3 * self.n / (4 * np.pi))**(1 / 3) * self.d
+
+    def incidente(self):
+        """Campo incidente (3, N) en cada dipolo."""
+        fase = np.exp(1j * self.k * (self.posiciones @ self.direccion))
+        return (self.E0 * self.polarizacion[:, None] * fase[None, :]).astype(self.dtype)
+
+    def resolver(self, metodo="bicgstab", tolerancia=1e-5, max_iter=1000):
+        """Polarizaciones P (3, N) de los dipolos."""
+        resolvedores = {"bicgstab": bicgstab, "gmres": gmres}
+        if metodo not in resolvedores:
+            raise ValueError(f"método desconocido: {metodo!r}")
+        sistema = _Sistema((self.d**3 / self.alfa).astype(self.dtype), self.interaccion)
+        x, self.productos = resolvedores[metodo](sistema, self.incidente().ravel(),
+                                                 tolerancia, max_iter)
+        self.P = x.reshape(3, -1) * self.d**3
+        return self.P
+
+    def secciones(self):
+        """Secciones eficaces (m²) de extinción, absorción y dispersión, y
+        sus eficiencias Q = C / πa_ef²."""
+        if self.P is None:
+            self.resolver()
+        factor = 4 * np.pi * self.k / abs(self.E0)**2
+        P = self.P.astype(complex)
+        extincion = factor * np.sum(np.imag(np.conj(self.incidente()) * P))
+        modulo = np.sum(np.abs(P)**2, axis=0)
+        absorcion = factor * np.sum(-np.imag(1 / self.alfa) * modulo - 2 / 3 * self.k**3 * modulo)
+        area = np.pi * self.radio_efectivo**2
+        resultado = {"extincion": extincion, "absorcion": absorcion,
+                     "dispersion": extincion - absorcion}
+        resultado.update({f"Q_{nombre}": valor / area for nombre, valor in list(resultado.items())})
+        return resultado
+
+
+def mie(m, x):
+    """Eficiencias (Q_ext, Q_sca) de una esfera de índice relativo m y
+    parámetro de tamaño x = ka (Bohren y Huffman, BHMIE)."""
+    n_max = int(round(x + 4 * x**(1 / 3) + 2))
+    mx = m * x
+    n_log = int(round(max(n_max, abs(mx)))) + 16
+    D = np.zeros(n_log + 1, dtype=complex)
+    for n in range(n_log, 0, -1):                  # derivada logarítmica, hacia abajo
+        D[n - 1] = n / mx - 1 / (D[n] + n / mx)
+    psi0, psi1 = np.cos(x), np.sin(x)
+    chi0, chi1 = -np.sin(x), np.cos(x)
+    xi1 = psi1 - 1j * chi1
+    q_ext = q_sca = 0.0
+    for n in range(1, n_max + 1):
+        psi = (2 * n - 1) / x * psi1 - psi0
+        chi = (2 * n - 1) / x * chi1 - chi0
+        xi = psi - 1j * chi
+        a = ((D[n] / m + n / x) * psi - psi1) / ((D[n] / m + n / x) * xi - xi1)
+        b = ((m * D[n] + n / x) * psi - psi1) / ((m * D[n] + n / x) * xi - xi1)
+        q_sca += (2 * n + 1) * (abs(a)**2 + abs(b)**2)
+        q_ext += (2 * n + 1) * (a + b).real
+        psi0, psi1, chi0, chi1, xi1 = psi1, psi, chi1, chi, xi
+    return 2 * q_ext / x**2, 2 * q_sca / x**2
@@ -0,0 +1,135 @@
+import math
+
+import numpy as np
+
+from electromagnetismo.teselas import dimensionar, tipo_salida
+
+# --- Constante de Coulomb ---
+k = 8.987e9  # N·m²/C²
+
+# Distancia mínima por debajo de la cual se ignora la contribución de una carga
+R_MIN = 1e-6
+
+# Puntos por tesela como máximo; las cargas por bloque salen del presupuesto
+# de memoria (ver electromagnetismo.teselas)
+_PUNTOS_POR_TESELA = 4096
+
+
+def calcular_distancia(p1, p2):
+    """Distancia euclidiana entre dos puntos del plano."""
+    return math.sqrt((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)
+
+
+def campo_electrico_punto(q, r_carga, r_eval):
+    """Campo eléctrico de una carga puntual q en un solo punto de evaluación."""
+    r_vec = r_eval - r_carga
+    r_mag = np.linalg.norm(r_vec)
+    if r_mag < R_MIN:
+        return np.array([0, 0])
+    r_unit = r_vec / r_mag
+    return k * q * r_unit / r_mag**2
+
+
+def campo_electrico_malla(posiciones, cargas, X, Y, Z=None, potencial=False,
+                          memoria=None, dtype=np.float64):
+    """Campo eléctrico de N cargas puntuales sobre toda una malla.
+
+    posiciones: arreglo (N, 2) o (N, 3) con la ubicación de las cargas (m).
+    cargas: arreglo (N,) con el valor de cada carga (C).
+    X, Y (y Z opcional): coordenadas de los puntos de evaluación, con
+    cualquier forma (por ejemplo, la salida de np.meshgrid). Si las cargas
+    son 3D y no se da Z, se evalúa en el plano z = 0.
+
+    Devuelve (Ex, Ey) para cargas 2D y (Ex, Ey, Ez) para cargas 3D, con la
+    misma forma que X. Si potencial=True se agrega el potencial φ al final.
+    Igual que campo_electrico_punto, se anula la contribución de una carga
+    a distancia menor que R_MIN.
+
+    memoria: bytes que pueden ocupar los temporales (por defecto
+    EM_BLOQUE_MB); la malla y las cargas se recorren por teselas y bloques
+    para no superarlo. dtype: tipo de los arreglos de salida. Con float32
+    cada tesela se suma en float64 y se redondea una sola vez al final, así
+    que el error respecto al resultado en float64 es |ΔE| ≤ 2⁻²⁴ |E|
+    (≈ 6e-8 relativo) más el error de la suma en float64, N · 2⁻⁵³ Σ|E_i|.
+    """
+    posiciones = np.atleast_2d(np.asarray(posiciones, dtype=float))
+    cargas = np.atleast_1d(np.asarray(cargas, dtype=float))
+    if posiciones.shape[0] != cargas.shape[0] or posiciones.shape[1] not in (2, 3):
+        raise ValueError(
+            "posiciones debe tener forma (N, 2) o (N, 3) y cargas forma (N,)")
+    dim = posiciones.shape[1]
+    dtype = tipo_salida(dtype)
+
+    X = np.asarray(X)
+    forma = X.shape
+    puntos = [X.ravel(), np.asarray(Y).ravel()]
+    if dim == 3:
+        # Un Z escalar (o ausente) no se expande al tamaño de la malla
+        puntos.append(0.0 if Z is None else
+                      np.asarray(Z).ravel() if np.ndim(Z) else float(Z))
+
+    salidas = dim + 1 if potencial else dim
+    resultado = [np.empty(X.size, dtype=dtype) for _ in range(salidas)]
+    kq_total = (k * cargas)[:, None]
+
+    # Se recorre la malla por teselas y las cargas por bloques para que los
+    # temporales (bloque × tesela) quepan en el presupuesto de memoria
+    tesela, bloque = dimensionar(
+        X.size, cargas.shape[0], bytes_por_par=(dim + 3) * 8 + 1, memoria=memoria,
+        tesela_max=_PUNTOS_POR_TESELA, bytes_por_punto=(dim + salidas) * 8)
+    for a in range(0, X.size, tesela):
+        sl = slice(a, a + tesela)
+        n = len(range(*sl.indices(X.size)))
+        coordenadas = [np.asarray(p[sl], dtype=float) if np.ndim(p) else np.full(n, p)
+                       for p in puntos]
+        acumulado = np.zeros((salidas, n))
+        E, phi = acumulado[:dim], acumulado[dim] if potencial else None
+        for b in range(0, cargas.shape[0], bloque):
+            pos = posiciones[b:b + bloque]
+            kq = kq_total[b:b + bloque]
+
+            r_vec = [p[None, :] - pos[:, d, None] for d, p in enumerate(coordenadas)]
+            r2 = r_vec[0] * r_vec[0]
+            for componente in r_vec[1:]:
+                r2 += componente * componente
+            cerca = r2 < R_MIN * R_MIN
+            if cerca.any():
+                r2[cerca] = np.inf  # 1/inf = 0 → la carga no contribuye
+
+            # r, 1/r y 1/r³ una sola vez por par: k q / r da el potencial y
+            # dividiendo otra vez por r² se obtiene el factor del campo
+            kq_r = np.sqrt(r2)
+            np.divide(kq, kq_r, out=kq_r)  # k q / r
+            if potencial:
+                phi += kq_r.sum(axis=0)
+            kq_r /= r2  # k q / r³
+            for d in range(dim):
+                r_vec[d] *= kq_r
+                E[d] += r_vec[d].sum(axis=0)
+
+        for salida, valores in zip(resultado, acumulado):
+            salida[sl] = valores
+
+    return tuple(componente.reshape(forma) for componente in resultado)
+
+
+def energia_electrostatica(posiciones, cargas):
+    """Energía electrostática U = ½ Σ q_i φ_i de un conjunto de cargas
+    puntuales, donde φ_i es el potencial de las demás cargas en la posición
+    de la i-ésima. Como en el resto del módulo, se ignoran los pares a
+    distancia menor que R_MIN (incluida la autointeracción)."""
+    posiciones = np.atleast_2d(np.asarray(posiciones, dtype=float))
+    cargas = np.atleast_1d(np.asarray(cargas, dtype=float))
+    coordenadas = [posiciones[:, d] for d in range(posiciones.shape[1])]
+    if len(coordenadas) == 2:
+        coordenadas.append(None)
+    *_, phi = campo_electrico_malla(posiciones, cargas, *coordenadas, potencial=True)
+    return 0.5 * float(cargas @ phi)
+
+
+def campo_potencial_energia(posiciones, cargas, X, Y, Z=None):
+    """Campo, potencial y energía en una sola pasada por los pares
+    (carga, punto). Devuelve (Ex, Ey, φ, U) para cargas 2D y
+    (Ex, Ey, Ez, φ, U) para cargas 3D; U es la energía de la configuración."""
+    return (*campo_electrico_malla(posiciones, cargas, X, Y, Z, potencial=True),
+            energia_electrostatica(posiciones, cargas))
@@ -0,0 +1,816 @@
+"""Escenarios interactivos de las páginas A, B, C y E: malla, rangos de los
+sliders, claves de caché y figuras. Están aquí (y no en las páginas) para
+que la herramienta de precálculo y el calentamiento del servidor produzcan
+exactamente las mismas entradas que ve el estudiante.
+
+matplotlib se importa dentro de las funciones que dibujan: los procesos
+que sólo necesitan mallas, claves o campos no pagan su importación."""
+import atexit
+import functools
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from electromagnetismo.adaptativo import MuestreoAdaptativo
+from electromagnetismo.bobinas import campo_espiras
+from electromagnetismo.cache import cuantizar
+from electromagnetismo.electrostatica import calcular_distancia, campo_electrico_malla
+from electromagnetismo.fdtd import FDTD1D, perfil_bloque, pulso_gaussiano, senoidal
+from electromagnetismo.figuras import Lienzo, decimar, figura_a_png
+from electromagnetismo.instantaneas import (
+    EscritorInstantaneas, LectorInstantaneas, exportar_video)
+from electromagnetismo.lineas import semillas_cargas, trazar_lineas
+from electromagnetismo.magnetostatica import (
+    MU0, campo_b_hilos, campo_b_polilineas, campo_h_conductor, espira_poligonal)
+from electromagnetismo.paralelo import evaluar_en_teselas
+from electromagnetismo.perfil import tramo
+
+# --- Página A: distancias entre tres puntos ---
+RANGO_COORDENADA_A = (-10.0, 10.0, 0.1)
+
+
+def puntos_por_defecto():
+    """Puntos A, B y C con los sliders en su valor inicial."""
+    return [(2.0, 1.5), (-3.0, 1.5), (-2.0, -3.0)]
+
+
+def clave_A(grafico, A, B, C):
+    """Clave de la figura `grafico` ("ubicacion" o "distancias")."""
+    return (f"A-{grafico}", cuantizar((A, B, C)))
+
+
+def limites_A(A, B, C):
+    """Límites dinámicos para los gráficos, para que siempre se vean bien."""
+    all_x = [A[0], B[0], C[0], 0]
+    all_y = [A[1], B[1], C[1], 0]
+    return min(all_x) - 1, max(all_x) + 1, min(all_y) - 1, max(all_y) + 1
+
+
+def _construir_plano(fig, titulo):
+    ax = fig.subplots()
+    ax.grid(True, alpha=0.3)
+    ax.axhline(y=0, color='k', linewidth=0.8)
+    ax.axvline(x=0, color='k', linewidth=0.8)
+    puntos, = ax.plot([], [], 'ro', markersize=6)
+    rotulos = [ax.annotate('', xy=(0, 0), xytext=(0, 0), fontsize=9, color='red')
+               for _ in range(3)]
+    ax.set_xlabel('Eje X')
+    ax.set_ylabel('Eje Y')
+    ax.set_title(titulo)
+    return {"ax": ax, "puntos": puntos, "rotulos": rotulos}
+
+
+def _actualizar_plano(artistas, A, B, C):
+    ax = artistas["ax"]
+    x_min, x_max, y_min, y_max = limites_A(A, B, C)
+    if ax.get_xlim() != (x_min, x_max) or ax.get_ylim() != (y_min, y_max):
+        ax.set_xlim(x_min, x_max)
+        ax.set_ylim(y_min, y_max)
+        # Otros límites cambian el ancho de las marcas de los ejes
+        artistas["reencuadrar"] = True
+
+    # Plotear y anotar puntos
+    artistas["puntos"].set_data([A[0], B[0], C[0]], [A[1], B[1], C[1]])
+    for rotulo, point, name in zip(artistas["rotulos"], (A, B, C), 'ABC'):
+        rotulo.set_text(f'{name}=({point[0]:.2f}, {point[1]:.2f})')
+        rotulo.xy = point
+        rotulo.set_position((point[0] + 0.1, point[1] + 0.1))
+
+
+def _construir_ubicacion(fig):
+    artistas = _construir_plano(fig, 'Ubicación en el Plano Cartesiano')
+    # Proyecciones de los puntos sobre los ejes, como una sola línea cortada con NaN
+    artistas["proyecciones"], = artistas["ax"].plot([], [], 'k--', alpha=0.5, linewidth=0.8)
+    return artistas
+
+
+def _actualizar_ubicacion(artistas, A, B, C):
+    _actualizar_plano(artistas, A, B, C)
+    x, y = [], []
+    for point in (A, B, C):
+        x += [point[0], point[0], np.nan, 0, point[0], np.nan]
+        y += [0, point[1], np.nan, point[1], point[1], np.nan]
+    artistas["proyecciones"].set_data(x, y)
+
+
+def lienzo_A_ubicacion():
+    """Lienzo de la ubicación de los puntos de la página A."""
+    return Lienzo(_construir_ubicacion, figsize=(6, 5))
+
+
+def figura_A_ubicacion(A, B, C, lienzo=None):
+    """Puntos y sus proyecciones sobre los ejes, como PNG."""
+    if lienzo is not None:
+        return lienzo.png(_actualizar_ubicacion, A, B, C)
+    lienzo = lienzo_A_ubicacion()
+    try:
+        return lienzo.png(_actualizar_ubicacion, A, B, C)
+    finally:
+        lienzo.cerrar()
+
+
+def _construir_distancias(fig):
+    artistas = _construir_plano(fig, 'Distancias entre Puntos')
+    artistas["segmentos"] = [artistas["ax"].plot([], [], estilo, linewidth=2)[0]
+                             for estilo in ('b-', 'g-', 'm-')]
+    return artistas
+
+
+def _actualizar_distancias(artistas, A, B, C):
+    _actualizar_plano(artistas, A, B, C)
+    # Dibujar las líneas de distancia
+    for linea, (P, Q, nombre) in zip(artistas["segmentos"],
+                                     [(A, B, 'AB'), (A, C, 'AC'), (B, C, 'BC')]):
+        linea.set_data([P[0], Q[0]], [P[1], Q[1]])
+        linea.set_label(f'{nombre} = {calcular_distancia(P, Q):.2f}')
+    artistas["ax"].legend()
+
+
+def lienzo_A_distancias():
+    """Lienzo de los segmentos entre los puntos de la página A."""
+    return Lienzo(_construir_distancias, figsize=(6, 5))
+
+
+def figura_A_distancias(A, B, C, lienzo=None):
+    """Segmentos AB, AC y BC con su longitud en la leyenda, como PNG."""
+    if lienzo is not None:
+        return lienzo.png(_actualizar_distancias, A, B, C)
+    lienzo = lienzo_A_distancias()
+    try:
+        return lienzo.png(_actualizar_distancias, A, B, C)
+    finally:
+        lienzo.cerrar()
+
+
+# --- Página B: tres cargas puntuales ---
+# Rangos (mínimo, máximo, paso) de los sliders de cada carga
+RANGO_Q_NC = (-5.0, 5.0, 0.1)
+RANGO_POSICION_B = (-6.0, 6.0, 0.1)
+N_MALLA_B = 40
+LIMITE_B = 6
+LINEAS_B = 120
+
+
+def cargas_por_defecto():
+    """(q en nC, x, y) de las tres cargas con los sliders en su valor inicial."""
+    return [(1.0, float(i*2 - 2), float(i - 1)) for i in range(3)]
+
+
+def malla_B():
+    x = np.linspace(-LIMITE_B, LIMITE_B, N_MALLA_B)
+    y = np.linspace(-LIMITE_B, LIMITE_B, N_MALLA_B)
+    return np.meshgrid(x, y)
+
+
+def fuentes_B(cargas_nc):
+    """Convierte (q en nC, x, y) a fuentes (q en C, x, y)."""
+    return [(q*1e-9, x, y) for q, x, y in cargas_nc]
+
+
+def clave_B(fuentes):
+    return ("B", cuantizar(fuentes), (N_MALLA_B, N_MALLA_B, -LIMITE_B, LIMITE_B))
+
+
+def campo_B(fuentes, X, Y):
+    """(Ex, Ey, φ) de las cargas, calculados en una sola pasada."""
+    posiciones = np.array([f[1:] for f in fuentes])
+    return campo_electrico_malla(posiciones, [f[0] for f in fuentes], X, Y, potencial=True)
+
+
+def niveles_equipotenciales(phi, n=15):
+    """Niveles simétricos para las curvas equipotenciales. El potencial
+    diverge junto a las cargas, así que el rango se toma del percentil 95
+    de |φ| en la malla."""
+    limite = np.nanpercentile(np.abs(phi), 95)
+    if not np.isfinite(limite) or limite == 0:
+        return None
+    return np.linspace(-limite, limite, n)
+
+
+def _marcar_cargas(ax, artistas, fuentes):
+    """Posición, color y rótulo de cada carga (azul si es positiva)."""
+    artistas["cargas"].set_offsets([(x, y) for _, x, y in fuentes])
+    artistas["cargas"].set_facecolor(['blue' if q > 0 else 'red' for q, _, _ in fuentes])
+    for texto in artistas["rotulos"]:
+        texto.remove()
+    artistas["rotulos"] = [ax.text(x + 0.2, y + 0.2, f'{q*1e9:.1f} nC', fontsize=10,
+                                   clip_on=True) for q, x, y in fuentes]
+
+
+def _construir_B(fig, titulo):
+    ax = fig.subplots()
+    ax.set_title(titulo)
+    ax.set_xlabel('x (m)')
+    ax.set_ylabel('y (m)')
+    ax.set_aspect('equal')
+    ax.set_xlim(-LIMITE_B, LIMITE_B)
+    ax.set_ylim(-LIMITE_B, LIMITE_B)
+    ax.grid(True, linestyle=':', alpha=0.6)
+    cargas = ax.scatter([], [], s=150, zorder=5, edgecolors='white')
+    return {"ax": ax, "cargas": cargas, "rotulos": []}
+
+
+def lienzo_B():
+    """Lienzo del quiver de la página B, para reutilizarlo en cada imagen."""
+    return Lienzo(lambda fig: _construir_B(fig, 'Campo Eléctrico de Cargas Puntuales'),
+                  figsize=(8, 8))
+
+
+def _actualizar_B(artistas, fuentes, X, Y, Ex, Ey, phi):
+    ax = artistas["ax"]
+    if artistas.get("curvas") is not None:
+        artistas["curvas"].remove()
+        artistas["curvas"] = None
+    if phi is not None:
+        niveles = niveles_equipotenciales(phi)
+        if niveles is not None:
+            artistas["curvas"] = ax.contour(X, Y, phi, levels=niveles, cmap='coolwarm',
+                                            linewidths=1, alpha=0.8)
+            ax.clabel(artistas["curvas"], fontsize=7, fmt='%.0f V')
+
+    # Las flechas se dibujan sobre una submalla de a lo sumo FLECHAS_POR_LADO
+    # por lado; sólo cambian sus datos entre imágenes
+    Xd, Yd, Exd, Eyd = decimar(X, Y, Ex, Ey)
+    magnitud = np.sqrt(Exd**2 + Eyd**2)
+    quiver = artistas.get("quiver")
+    if quiver is None or quiver.N != Xd.size:
+        if quiver is not None:
+            quiver.remove()
+        quiver = ax.quiver(Xd, Yd, Exd / magnitud, Eyd / magnitud, magnitud,
+                           cmap='viridis', scale=40)
+        if "barra" not in artistas:
+            artistas["barra"] = ax.figure.colorbar(
+                quiver, ax=ax, label='Magnitud del Campo Eléctrico (N/C)')
+        else:
+            artistas["barra"].update_normal(quiver)
+        artistas["quiver"] = quiver
+    else:
+        quiver.set_offsets(np.column_stack([Xd.ravel(), Yd.ravel()]))
+        quiver.set_UVC(Exd / magnitud, Eyd / magnitud, magnitud)
+    finitos = magnitud[np.isfinite(magnitud)]
+    if finitos.size:
+        quiver.set_clim(finitos.min(), finitos.max())
+
+    _marcar_cargas(ax, artistas, fuentes)
+
+
+def figura_B(fuentes, X, Y, Ex, Ey, phi=None, lienzo=None):
+    """Quiver normalizado del campo de las cargas, con las equipotenciales
+    si se da el potencial phi, como PNG. Con un `lienzo` (de lienzo_B) se
+    actualiza esa figura en lugar de crear una nueva."""
+    if lienzo is not None:
+        return lienzo.png(_actualizar_B, fuentes, X, Y, Ex, Ey, phi)
+    lienzo = lienzo_B()
+    try:
+        return lienzo.png(_actualizar_B, fuentes, X, Y, Ex, Ey, phi)
+    finally:
+        lienzo.cerrar()
+
+
+def exportar_B(fuentes, n=1000, dtype=np.float32, dpi=300, trabajadores=None):
+    """Mapa del potencial con equipotenciales y dirección del campo sobre una
+    malla n × n, como PNG de alta resolución. La malla se reparte por
+    teselas entre `trabajadores` hilos y el kernel las recorre por bloques,
+    así que la memoria extra es la de los arreglos de salida (la mitad con
+    float32)."""
+    x = np.linspace(-LIMITE_B, LIMITE_B, n, dtype=dtype)
+    X, Y = np.meshgrid(x, x)
+    posiciones = np.array([f[1:] for f in fuentes])
+    kernel = functools.partial(campo_electrico_malla, posiciones, [f[0] for f in fuentes],
+                               potencial=True, dtype=dtype)
+    Ex, Ey, phi = evaluar_en_teselas(kernel, X, Y, trabajadores=trabajadores)
+
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(10, 10))
+    niveles = niveles_equipotenciales(phi, n=21)
+    limite = niveles[-1] if niveles is not None else None
+    imagen = ax.imshow(phi, extent=(-LIMITE_B, LIMITE_B, -LIMITE_B, LIMITE_B),
+                       origin='lower', cmap='coolwarm', vmin=-limite if limite else None,
+                       vmax=limite)
+    plt.colorbar(imagen, ax=ax, label='Potencial (V)', shrink=0.8)
+    if niveles is not None:
+        ax.contour(X, Y, phi, levels=niveles, colors='k', linewidths=0.5)
+    # Flechas sobre una submalla fija para que la figura no dependa de n
+    Xd, Yd, Exd, Eyd = decimar(X, Y, Ex, Ey)
+    magnitud = np.hypot(Exd, Eyd)
+    ax.quiver(Xd, Yd, Exd / magnitud, Eyd / magnitud, color='k', alpha=0.6, scale=50)
+    for q, x0, y0 in fuentes:
+        ax.scatter(x0, y0, color='blue' if q > 0 else 'red', s=150, zorder=5,
+                   edgecolors='white')
+    ax.set_title(f'Potencial y Campo Eléctrico ({n}×{n} puntos)')
+    ax.set_xlabel('x (m)')
+    ax.set_ylabel('y (m)')
+    return figura_a_png(fig, dpi=dpi)
+
+
+def lineas_B(fuentes):
+    """Líneas de campo de las cargas, LINEAS_B en total, repartidas según |q|."""
+    posiciones = np.array([f[1:] for f in fuentes])
+    cargas = np.array([f[0] for f in fuentes])
+    semillas, sentido = semillas_cargas(posiciones, cargas, total=LINEAS_B, radio=0.1)
+    return trazar_lineas(
+        lambda x, y: campo_electrico_malla(posiciones, cargas, x, y), semillas,
+        paso=0.05, pasos_max=800, limites=(-LIMITE_B, LIMITE_B, -LIMITE_B, LIMITE_B),
+        sumideros=posiciones, sentido=sentido)
+
+
+def _segmentos(lineas):
+    """Líneas (N, n, 2) rellenas con NaN como lista de polilíneas."""
+    return [linea[np.isfinite(linea[:, 0])] for linea in lineas]
+
+
+def _construir_B_lineas(fig):
+    from matplotlib.collections import LineCollection
+    artistas = _construir_B(fig, 'Líneas de Campo Eléctrico de Cargas Puntuales')
+    artistas["lineas"] = artistas["ax"].add_collection(
+        LineCollection([], color='tab:blue', linewidth=0.8), autolim=False)
+    return artistas
+
+
+def lienzo_B_lineas():
+    """Lienzo de las líneas de campo de la página B."""
+    return Lienzo(_construir_B_lineas, figsize=(8, 8))
+
+
+def _actualizar_B_lineas(artistas, fuentes, lineas):
+    artistas["lineas"].set_segments(_segmentos(lineas))
+    _marcar_cargas(artistas["ax"], artistas, fuentes)
+
+
+def figura_B_lineas(fuentes, lineas, lienzo=None):
+    """Líneas de campo de las cargas, como PNG."""
+    if lienzo is not None:
+        return lienzo.png(_actualizar_B_lineas, fuentes, lineas)
+    lienzo = lienzo_B_lineas()
+    try:
+        return lienzo.png(_actualizar_B_lineas, fuentes, lineas)
+    finally:
+        lienzo.cerrar()
+
+
+# --- Página C: conductor infinito ---
+RANGO_CORRIENTE = (-10.0, 10.0, 1.0)
+RANGO_POSICION_C = (-5.0, 5.0, 0.1)
+PLOTLIM = [-5, 5, -5, 5]
+
+
+def conductor_por_defecto():
+    """(I, x0, y0) con los sliders en su valor inicial."""
+    return (5.0, 0.0, 0.0)
+
+
+def malla_C():
+    dx = (PLOTLIM[1] - PLOTLIM[0]) / 20
+    dy = (PLOTLIM[3] - PLOTLIM[2]) / 20
+    xrange = np.arange(PLOTLIM[0], PLOTLIM[1] + dx, dx)
+    yrange = np.arange(PLOTLIM[2], PLOTLIM[3] + dy, dy)
+    return np.meshgrid(xrange, yrange)
+
+
+def clave_C(conductores):
+    return ("C", cuantizar(conductores), (*PLOTLIM, 20))
+
+
+def campo_C(conductores, X, Y):
+    U, V = np.zeros(X.shape), np.zeros(X.shape)
+    for conductor in conductores:
+        Hx, Hy = campo_h_conductor(*conductor, X, Y)
+        U += Hx
+        V += Hy
+    return U, V
+
+
+def _construir_C(fig):
+    ax = fig.subplots()
+    ax.set_aspect("equal")
+    ax.set_xlim(PLOTLIM[0], PLOTLIM[1])
+    ax.set_ylim(PLOTLIM[2], PLOTLIM[3])
+    ax.set_xlabel("X location (m)")
+    ax.set_ylabel("Y location (m)")
+    ax.grid(True)
+    # Posición de los conductores
+    conductores, = ax.plot([], [], "ro", markersize=10, label="Conductor")
+    ax.legend()
+    return {"ax": ax, "conductores": conductores}
+
+
+def _titular_C(artistas, conductores, titulo):
+    I, x0, y0 = conductores[0]
+    texto = f"{titulo} para I = {I:.1f} A, Conductor en ({x0:.1f}, {y0:.1f})"
+    # El título sobresale de los ejes: si crece hay que recalcular el recorte
+    if len(texto) > len(artistas["ax"].get_title()):
+        artistas["reencuadrar"] = True
+    artistas["ax"].set_title(texto)
+    artistas["conductores"].set_data([c[1] for c in conductores],
+                                     [c[2] for c in conductores])
+
+
+def lienzo_C():
+    """Lienzo del quiver de la página C, para reutilizarlo en cada imagen."""
+    return Lienzo(_construir_C, figsize=(6, 6))
+
+
+def _actualizar_C(artistas, conductores, X, Y, U, V):
+    Xd, Yd, Ud, Vd = decimar(X, Y, U, V)
+    quiver = artistas.get("quiver")
+    if quiver is None or quiver.N != Xd.size:
+        if quiver is not None:
+            quiver.remove()
+        artistas["quiver"] = artistas["ax"].quiver(Xd, Yd, Ud, Vd, color="blue")
+    else:
+        quiver.set_offsets(np.column_stack([Xd.ravel(), Yd.ravel()]))
+        quiver.set_UVC(Ud, Vd)
+        # La escala automática de las flechas se calcula en el primer
+        # dibujo; se borra para que se ajuste a la nueva corriente
+        quiver.scale = None
+    _titular_C(artistas, conductores, "Campo Magnético")
+
+
+def figura_C(conductores, X, Y, U, V, lienzo=None):
+    """Quiver del campo H y posición de los conductores, como PNG."""
+    if lienzo is not None:
+        return lienzo.png(_actualizar_C, conductores, X, Y, U, V)
+    lienzo = lienzo_C()
+    try:
+        return lienzo.png(_actualizar_C, conductores, X, Y, U, V)
+    finally:
+        lienzo.cerrar()
+
+
+def lineas_C(conductores, por_amperio=2.0):
+    """Líneas de campo H de los conductores. Las semillas salen de cada
+    conductor hacia +x con radios en progresión geométrica (el campo decae
+    como 1/r) y su número es proporcional a |I|."""
+    conductores = np.array(conductores, dtype=float)
+    semillas = []
+    for I, x0, y0 in conductores:
+        n = max(1, int(round(abs(I) * por_amperio))) if I != 0 else 0
+        radios = 0.3 * 1.3**np.arange(n)
+        semillas.append(np.column_stack([x0 + radios, np.full(n, y0)]))
+    semillas = np.concatenate(semillas)
+    return trazar_lineas(
+        lambda x, y: campo_C(conductores, x, y), semillas, paso=0.05, pasos_max=1500,
+        limites=(PLOTLIM[0] - 1, PLOTLIM[1] + 1, PLOTLIM[2] - 1, PLOTLIM[3] + 1),
+        sumideros=conductores[:, 1:], cerrar=True)
+
+
+def _construir_C_lineas(fig):
+    from matplotlib.collections import LineCollection
+    artistas = _construir_C(fig)
+    artistas["lineas"] = artistas["ax"].add_collection(
+        LineCollection([], color="blue", linewidth=1), autolim=False)
+    return artistas
+
+
+def lienzo_C_lineas():
+    """Lienzo de las líneas de campo de la página C."""
+    return Lienzo(_construir_C_lineas, figsize=(6, 6))
+
+
+def _actualizar_C_lineas(artistas, conductores, lineas):
+    artistas["lineas"].set_segments(_segmentos(lineas))
+    _titular_C(artistas, conductores, "Líneas de Campo")
+
+
+def figura_C_lineas(conductores, lineas, lienzo=None):
+    """Líneas de campo H de los conductores, como PNG."""
+    if lienzo is not None:
+        return lienzo.png(_actualizar_C_lineas, conductores, lineas)
+    lienzo = lienzo_C_lineas()
+    try:
+        return lienzo.png(_actualizar_C_lineas, conductores, lineas)
+    finally:
+        lienzo.cerrar()
+
+
+# --- Página C: superposición de conductores y espiras ---
+N_MALLA_SUPERPOSICION = 60
+
+
+def malla_superposicion():
+    x = np.linspace(PLOTLIM[0], PLOTLIM[1], N_MALLA_SUPERPOSICION)
+    y = np.linspace(PLOTLIM[2], PLOTLIM[3], N_MALLA_SUPERPOSICION)
+    return np.meshgrid(x, y)
+
+
+def hilos_por_defecto():
+    """(I, x, y) de los conductores paralelos de la tabla inicial."""
+    return [(5.0, -2.0, 0.0), (-5.0, 2.0, 0.0)]
+
+
+def clave_hilos(hilos):
+    return ("C-hilos", cuantizar(hilos))
+
+
+def campo_hilos(hilos, X, Y):
+    """(Hx, Hy) de conductores infinitos paralelos al eje z."""
+    if not hilos:
+        return np.zeros(X.shape), np.zeros(X.shape)
+    I_h, x_h, y_h = np.array(hilos, dtype=float).T
+    Bx, By, _ = campo_b_hilos(I_h, np.column_stack([x_h, y_h, np.zeros(len(I_h))]),
+                              [(0.0, 0.0, 1.0)] * len(I_h), X, Y)
+    return Bx / MU0, By / MU0
+
+
+def clave_espira(radio, lados, I):
+    return ("C-espira", cuantizar((radio, lados, I)))
+
+
+def campo_espira(radio, lados, I, X, Y):
+    """(Hx, Hy) en el plano z = 0 de una espira poligonal en el plano x = 0."""
+    vertices = espira_poligonal(radio, lados, normal="x")
+    Bx, By, _ = campo_b_polilineas([vertices], [I], X, Y, cerradas=True)
+    return Bx / MU0, By / MU0
+
+
+def _figura_superposicion(X, Y, Hx, Hy, dibujar_fuentes):
+    import matplotlib.pyplot as plt
+    magnitud = np.hypot(Hx, Hy)
+    with tramo("figura"):
+        fig, ax = plt.subplots(figsize=(6, 6))
+        if magnitud.max() > 0:
+            lineas = ax.streamplot(X, Y, Hx, Hy, color=np.log10(magnitud + 1e-12),
+                                   cmap="viridis", density=1.4, linewidth=1)
+            plt.colorbar(lineas.lines, ax=ax, label="log₁₀ |H| (A/m)")
+        dibujar_fuentes(ax)
+        ax.set_aspect("equal")
+        ax.set_xlim(PLOTLIM[0], PLOTLIM[1])
+        ax.set_ylim(PLOTLIM[2], PLOTLIM[3])
+        ax.set_xlabel("X location (m)")
+        ax.set_ylabel("Y location (m)")
+        ax.grid(True)
+    return figura_a_png(fig)
+
+
+def figura_hilos(hilos, X, Y, Hx, Hy):
+    """Líneas de campo y |H| de los conductores paralelos, como PNG."""
+    def dibujar_fuentes(ax):
+        for I_h, x_h, y_h in hilos:
+            ax.plot(x_h, y_h, "o", color="red" if I_h > 0 else "blue", markersize=10)
+        ax.set_title(f"Campo H de {len(hilos)} conductores paralelos")
+    return _figura_superposicion(X, Y, Hx, Hy, dibujar_fuentes)
+
+
+def figura_espira(radio, lados, I, X, Y, Hx, Hy):
+    """Líneas de campo y |H| de la espira poligonal, como PNG."""
+    def dibujar_fuentes(ax):
+        ax.plot([0, 0], [radio, -radio], "o", color="red", markersize=10)
+        ax.set_title(f"Campo H de una espira de {lados} lados, I = {I:.1f} A")
+    return _figura_superposicion(X, Y, Hx, Hy, dibujar_fuentes)
+
+
+# --- Página C: espiras circulares, Helmholtz y solenoides ---
+RESOLUCION_BOBINA = 200
+RADIO_BOBINA = 1.5
+
+
+def bobina_por_defecto():
+    """Espiras de la bobina con los controles en su valor inicial (una
+    espira en el plano x = 0)."""
+    return [(conductor_por_defecto()[0], RADIO_BOBINA, (0.0, 0.0, 0.0), "x")]
+
+
+def malla_bobina(resolucion):
+    x = np.linspace(PLOTLIM[0], PLOTLIM[1], resolucion)
+    y = np.linspace(PLOTLIM[2], PLOTLIM[3], resolucion)
+    return np.meshgrid(x, y)
+
+
+def clave_bobina(espiras, resolucion, adaptativo):
+    return ("C-bobina-Az", cuantizar([(I, a, c) for I, a, c, _ in espiras]), resolucion,
+            adaptativo)
+
+
+def campo_bobina(espiras, X, Y, adaptativo=True):
+    """(Bx, By, Az, evaluaciones) de las espiras en el plano z = 0, con el
+    número de evaluaciones del campo que se hicieron."""
+    def campo_plano(x, y):
+        Bx, By, _, _, _, Az = campo_espiras(espiras, x, y, potencial=True)
+        return Bx, By, Az
+
+    if adaptativo:
+        # Quadtree con la retícula fina más cercana a la resolución pedida;
+        # en los bordes entre hojas de distinto tamaño la interpolación
+        # puede dar saltos del orden de la tolerancia. B (T) y A_z (T·m) se
+        # comparan cada uno con su propia escala
+        muestreo = MuestreoAdaptativo(
+            campo_plano, PLOTLIM, nivel_min=4,
+            nivel_max=int(np.ceil(np.log2(X.shape[1]))), tolerancia=0.01,
+            grupos=((0, 1), (2,)))
+        return (*muestreo.remuestrear(X, Y), np.asarray(muestreo.evaluaciones))
+    # Con mallas grandes las teselas se reparten entre los núcleos del servidor
+    Bx, By, _, _, _, Az = evaluar_en_teselas(
+        functools.partial(campo_espiras, espiras, potencial=True), X, Y)
+    return Bx, By, Az, np.asarray(X.size)
+
+
+def figura_bobina(tipo, espiras, X, Y, Bx, By, Az):
+    """|H| y líneas de campo (curvas de nivel de y·A_z) de la bobina, como PNG."""
+    import matplotlib.pyplot as plt
+    with tramo("figura"):
+        fig, ax = plt.subplots(figsize=(7, 6))
+        magnitud = np.hypot(Bx, By) / MU0
+        fondo = ax.pcolormesh(X, Y, np.log10(magnitud + 1e-12), cmap="viridis",
+                              shading="auto")
+        plt.colorbar(fondo, ax=ax, label="log₁₀ |H| (A/m)")
+        # En el plano z = 0 con eje x, ρ A_φ = y A_z: sus curvas de nivel son
+        # las líneas de campo
+        ax.contour(X, Y, Y * Az, levels=30, colors="white", linewidths=0.7)
+        for I, a, centro, _ in espiras:
+            ax.plot(centro[0], a, "o", color="red" if I > 0 else "blue", markersize=5)
+            ax.plot(centro[0], -a, "o", color="blue" if I > 0 else "red", markersize=5)
+        ax.set_aspect("equal")
+        ax.set_xlim(PLOTLIM[0], PLOTLIM[1])
+        ax.set_ylim(PLOTLIM[2], PLOTLIM[3])
+        ax.set_xlabel("X location (m)")
+        ax.set_ylabel("Y location (m)")
+        ax.set_title(f"{tipo}: líneas de campo y |H|")
+    return figura_a_png(fig)
+
+
+# --- Página E: onda en 1D con FDTD ---
+KE_E = 400
+KS_E = 100
+INICIO_BLOQUE_E = 250
+PASOS_E = 1000
+OPCIONES_PASOS_E = (1000, 5000, 20000)
+CADA_E = 5
+RANGO_EPSILON_E = (1.0, 10.0, 0.5)
+RANGO_SIGMA_E = (0.0, 0.05, 0.005)
+FUENTES_E = ("Pulso gaussiano", "Senoidal de 700 MHz")
+# Filas del mapa espacio-tiempo, como máximo
+FILAS_MAPA_E = 400
+
+
+def medio_E(epsilon_r, sigma):
+    """Perfiles de εr y σ: vacío y, desde INICIO_BLOQUE_E, el material.
+    Con arreglos de valores se obtiene un perfil por corrida."""
+    return (perfil_bloque(KE_E, INICIO_BLOQUE_E, valor=epsilon_r, fondo=1.0),
+            perfil_bloque(KE_E, INICIO_BLOQUE_E, valor=sigma))
+
+
+def clave_E(epsilon_r, sigma, fuente=FUENTES_E[0], pasos=PASOS_E, cada=CADA_E):
+    return ("E-fdtd", cuantizar((epsilon_r, sigma)), fuente, pasos, cada)
+
+
+def simular_E(directorio, epsilon_r, sigma, fuente=FUENTES_E[0], pasos=PASOS_E, cada=CADA_E):
+    """Simula la onda y escribe Ex y Hy cada `cada` pasos en `directorio`,
+    a medida que avanza."""
+    epsilon, conductividad = medio_E(epsilon_r, sigma)
+    simulacion = FDTD1D(KE_E, epsilon, conductividad, ks=KS_E)
+    if fuente == FUENTES_E[1]:
+        simulacion.fuente = senoidal(700e6, simulacion.dt)
+    else:
+        simulacion.fuente = pulso_gaussiano()
+    with EscritorInstantaneas(directorio, cada=cada,
+                              metadatos={"epsilon_r": epsilon_r, "sigma": sigma}) as escritor:
+        simulacion.avanzar(pasos, campos=("ex", "hy"), escritor=escritor)
+
+
+# Sin almacén, las simulaciones se escriben bajo un único directorio temporal
+# del proceso, que se borra al salir; sólo se conservan las MAX_CORRIDAS_E
+# usadas más recientemente
+MAX_CORRIDAS_E = 16
+_raiz_E = None
+_directorios_E = OrderedDict()
+_candado_E = threading.Lock()
+
+
+def _directorio_temporal_E():
+    global _raiz_E
+    with _candado_E:
+        if _raiz_E is None:
+            _raiz_E = tempfile.mkdtemp(prefix="em-fdtd-")
+            atexit.register(shutil.rmtree, _raiz_E, ignore_errors=True)
+        return tempfile.mkdtemp(dir=_raiz_E)
+
+
+def lector_E(epsilon_r, sigma, fuente=FUENTES_E[0], pasos=PASOS_E, almacen=None):
+    """Lector de las instantáneas de la simulación, que se calcula una vez y
+    queda en el almacén en disco (o en un directorio temporal del proceso
+    si no hay almacén)."""
+    clave = clave_E(epsilon_r, sigma, fuente, pasos)
+
+    def llenar(directorio):
+        simular_E(directorio, epsilon_r, sigma, fuente, pasos)
+
+    if almacen is not None:
+        return LectorInstantaneas(almacen.directorio_entrada(clave, llenar))
+    with _candado_E:
+        directorio = _directorios_E.get(clave)
+        if directorio is not None:
+            _directorios_E.move_to_end(clave)
+            return LectorInstantaneas(directorio)
+
+    directorio = _directorio_temporal_E()
+    try:
+        llenar(directorio)
+    except BaseException:
+        shutil.rmtree(directorio, ignore_errors=True)
+        raise
+    with _candado_E:
+        _directorios_E[clave] = directorio
+        while len(_directorios_E) > MAX_CORRIDAS_E:
+            # Los lectores que aún la tengan abierta conservan sus memmaps
+            _, viejo = _directorios_E.popitem(last=False)
+            shutil.rmtree(viejo, ignore_errors=True)
+    return LectorInstantaneas(directorio)
+
+
+def reflexion_E(valores_epsilon, sigma, pasos=PASOS_E):
+    """Coeficiente de reflexión medido para cada εr de `valores_epsilon`,
+    con todas las corridas en una sola simulación: el pico del pulso
+    reflejado en una sonda entre la fuente y el material, sobre el pico
+    del incidente."""
+    epsilon, conductividad = medio_E(np.asarray(valores_epsilon, dtype=float), sigma)
+    simulacion = FDTD1D(KE_E, epsilon, conductividad, ks=KS_E)
+    sonda = (KS_E + INICIO_BLOQUE_E) // 2
+    # El pulso tarda dos pasos por celda: el reflejado pasa por la sonda
+    # después de ir y volver desde ella hasta el material
+    separacion = KS_E + 2 * (sonda - KS_E) + 2 * (INICIO_BLOQUE_E - sonda)
+    registro = np.empty((pasos, simulacion.n_corridas))
+    for i in range(pasos):
+        simulacion.paso()
+        registro[i] = simulacion.ex[:, sonda]
+    incidente = np.abs(registro[:separacion]).max(axis=0)
+    reflejado = registro[separacion:]
+    pico = np.abs(reflejado).argmax(axis=0)
+    return reflejado[pico, np.arange(simulacion.n_corridas)] / incidente
+
+
+def _construir_onda_E(ax, lector):
+    epsilon_r, sigma = lector.metadatos["epsilon_r"], lector.metadatos["sigma"]
+    ax.axvspan(INICIO_BLOQUE_E, KE_E - 1, color="gray", alpha=0.25,
+               label=f"εr = {epsilon_r:g}, σ = {sigma:g} S/m")
+    k = np.arange(KE_E)
+    linea_ex, = ax.plot(k, np.zeros(KE_E), "b-", label="Ex")
+    linea_hy, = ax.plot(k, np.zeros(KE_E), "r-", label="Hy")
+    ax.set_xlim(0, KE_E - 1)
+    # En el material |Hy| = √εr |Ex|: el límite es fijo para toda la corrida
+    limite = max(1.2, 1.1 * max(lector.maximo("ex"), lector.maximo("hy")))
+    ax.set_ylim(-limite, limite)
+    ax.set_xlabel("Posición espacial (k)")
+    ax.set_ylabel("Amplitud")
+    ax.legend(loc="upper right")
+    ax.grid(True)
+    return {"ax": ax, "ex": linea_ex, "hy": linea_hy}
+
+
+def _actualizar_onda_E(artistas, lector, indice):
+    artistas["ex"].set_ydata(lector.cuadro(indice, "ex")[0])
+    artistas["hy"].set_ydata(lector.cuadro(indice, "hy")[0])
+    artistas["ax"].set_title(f"Paso t = {lector.tiempos[indice]}")
+
+
+def figura_E(lector, indice):
+    """Ex y Hy en la instantánea `indice` y mapa espacio-tiempo de Ex, como
+    PNG. Sólo se leen del disco esa instantánea y las filas del mapa."""
+    import matplotlib.pyplot as plt
+    with tramo("figura"):
+        fig, (ax_onda, ax_mapa) = plt.subplots(1, 2, figsize=(12, 4.5))
+        _actualizar_onda_E(_construir_onda_E(ax_onda, lector), lector, indice)
+
+        tiempos, Ex = lector.muestreo("ex", FILAS_MAPA_E)
+        mapa = ax_mapa.imshow(Ex[:, 0], aspect="auto", origin="lower", cmap="RdBu_r",
+                              vmin=-1, vmax=1,
+                              extent=(0, KE_E - 1, tiempos[0], tiempos[-1]))
+        ax_mapa.axvline(INICIO_BLOQUE_E, color="k", linewidth=0.8)
+        ax_mapa.axhline(lector.tiempos[indice], color="k", linestyle=":", linewidth=0.8)
+        plt.colorbar(mapa, ax=ax_mapa, label="Ex")
+        ax_mapa.set_xlabel("Posición espacial (k)")
+        ax_mapa.set_ylabel("Paso de tiempo")
+        ax_mapa.set_title("Ex en el espacio y el tiempo")
+    return figura_a_png(fig)
+
+
+def video_E(lector, ruta, fps=25):
+    """Video de Ex y Hy en todas las instantáneas guardadas, dibujado cuadro
+    a cuadro desde el disco."""
+    return exportar_video(lector, ruta, lambda fig: _construir_onda_E(fig.subplots(), lector),
+                          _actualizar_onda_E, fps=fps, figsize=(8, 4))
+
+
+def figura_reflexion_E(valores_epsilon, R, sigma):
+    """Coeficiente de reflexión medido y el de un dieléctrico sin pérdidas."""
+    import matplotlib.pyplot as plt
+    with tramo("figura"):
+        fig, ax = plt.subplots(figsize=(7, 4))
+        teorico = (1 - np.sqrt(valores_epsilon)) / (1 + np.sqrt(valores_epsilon))
+        ax.plot(valores_epsilon, teorico, "k--", label="(1 - √εr)/(1 + √εr)")
+        ax.plot(valores_epsilon, R, "o", color="#00BFFF", label=f"FDTD, σ = {sigma:g} S/m")
+        ax.set_xlabel("εr del material")
+        ax.set_ylabel("Coeficiente de reflexión")
+        ax.set_title("Reflexión en la interfaz vacío–material")
+        ax.legend()
+        ax.grid(True)
+    return figura_a_png(fig)
+
+
+def barrido(rango):
+    """Valores de un slider de `rango` = (mínimo, máximo, paso)."""
+    minimo, maximo, paso = rango
+    n = int(round((maximo - minimo) / paso))
+    return [round(minimo + i * paso, 10) for i in range(n + 1)]
@@ -0,0 +1,79 @@
+"""Rasterización de figuras de matplotlib, que se importa la primera vez
+que se dibuja algo."""
+import io
+
+import numpy as np
+
+from electromagnetismo.perfil import tramo
+
+# Resolución de las figuras que se muestran en la página: una figura de 8
+# pulgadas ocupa 800 px, lo que mide la columna de Streamlit en modo ancho
+DPI_PANTALLA = 100
+
+# Flechas por lado de un quiver, sea cual sea la malla de cálculo
+FLECHAS_POR_LADO = 40
+
+# Compresión zlib de los PNG de pantalla: el nivel 1 tarda bastante menos
+# que el predeterminado y el archivo es casi del mismo tamaño
+COMPRESION_PNG = 1
+
+
+def figura_a_png(fig, dpi=200):
+    """Rasteriza una figura a PNG (con los mismos ajustes que st.pyplot) y
+    la cierra para liberar su memoria."""
+    import matplotlib.pyplot as plt
+    buffer = io.BytesIO()
+    with tramo("rasterizar"):
+        fig.savefig(buffer, format="png", bbox_inches="tight", dpi=dpi)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def decimar(*arreglos, flechas=FLECHAS_POR_LADO):
+    """Submuestrea arreglos 2D con el mismo paso en ambos ejes para que
+    queden como mucho `flechas` puntos por lado."""
+    paso = max(1, -(-max(np.shape(arreglos[0])) // flechas))
+    return tuple(np.asarray(a)[::paso, ::paso] for a in arreglos)
+
+
+class Lienzo:
+    """Figura de matplotlib que se construye una vez y después sólo cambia
+    los datos de sus artistas (set_UVC, set_offsets, set_data, ...).
+
+    construir(fig) agrega los ejes y los artistas fijos y devuelve un
+    diccionario con ellos; png(actualizar, ...) llama a
+    actualizar(artistas, ...) y rasteriza. La figura no pasa por pyplot,
+    así que no queda en su registro global: se libera con el lienzo o con
+    cerrar(). El recorte (bbox "tight") se calcula en el primer dibujo y se
+    reutiliza, lo que ahorra un dibujo completo por imagen; si una
+    actualización agranda lo que sobresale de los ejes (un título más largo,
+    otros límites) debe poner artistas["reencuadrar"] = True.
+    """
+
+    def __init__(self, construir, figsize, dpi=DPI_PANTALLA):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        self.figura = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figura)
+        self.dpi = dpi
+        self.artistas = construir(self.figura)
+        self._recorte = None
+
+    def png(self, actualizar=None, *args, **kwargs):
+        if self.artistas is None:
+            raise RuntimeError("El lienzo ya se cerró")
+        if actualizar is not None:
+            with tramo("figura"):
+                actualizar(self.artistas, *args, **kwargs)
+        buffer = io.BytesIO()
+        with tramo("rasterizar"):
+            if self._recorte is None or self.artistas.pop("reencuadrar", False):
+                self._recorte = self.figura.get_tightbbox().padded(0.1)
+            self.figura.savefig(buffer, format="png", dpi=self.dpi, bbox_inches=self._recorte,
+                                pil_kwargs={"compress_level": COMPRESION_PNG})
+        return buffer.getvalue()
+
+    def cerrar(self):
+        """Libera los artistas de la figura; el lienzo ya no se puede usar."""
+        self.figura.clear()
+        self.artistas = None
@@ -0,0 +1,105 @@
+"""Superposición incremental: sólo se recalcula la fuente que cambió.
+
+El campo total de varias fuentes (cargas, conductores) es la suma de sus
+contribuciones. Si entre una ejecución y la siguiente sólo cambia una
+fuente, basta restar su contribución anterior y sumar la nueva.
+"""
+import numpy as np
+
+
+class SuperposicionIncremental:
+    """Guarda la contribución de cada fuente y el total acumulado.
+
+    kernel(fuente) debe devolver una tupla de arreglos (por ejemplo Ex, Ey)
+    con la contribución de una sola fuente; `fuente` es una tupla de
+    parámetros hashable, que también la identifica: las fuentes se emparejan
+    por valor y no por posición, así que agregar, quitar o editar una fila
+    de una tabla cuesta una sola evaluación aunque las demás cambien de
+    lugar. `clave` identifica la malla sobre la que trabaja el kernel: si la
+    malla cambia hay que crear otra instancia.
+    """
+
+    def __init__(self, kernel, clave=None, resincronizar_cada=500):
+        self.kernel = kernel
+        self.clave = clave
+        self.resincronizar_cada = resincronizar_cada
+        self._fuentes = []
+        self._contribuciones = []
+        self._total = None
+        self._actualizaciones = 0
+        self.ultimas_recalculadas = 0
+
+    def actualizar(self, fuentes):
+        """Devuelve el campo total para la lista de fuentes dada."""
+        fuentes = [tuple(f) for f in fuentes]
+        self._actualizaciones += 1
+        if self._total is None or self._actualizaciones >= self.resincronizar_cada:
+            # Recalcular todo de vez en cuando evita que el error de redondeo
+            # de las restas sucesivas se acumule
+            return self._recalcular(fuentes)
+
+        # Contribuciones anteriores por fuente (puede haber fuentes repetidas)
+        anteriores = {}
+        for fuente, contribucion in zip(self._fuentes, self._contribuciones):
+            anteriores.setdefault(fuente, []).append(contribucion)
+        contribuciones = [anteriores[f].pop() if anteriores.get(f) else None for f in fuentes]
+
+        # Fuentes que desaparecieron o cambiaron
+        resumar = False
+        for sobrantes in anteriores.values():
+            for contribucion in sobrantes:
+                resumar |= self._restar(contribucion)
+
+        recalculadas = 0
+        for i, fuente in enumerate(fuentes):
+            if contribuciones[i] is None:
+                contribuciones[i] = self._evaluar(fuente)
+                self._sumar(contribuciones[i])
+                recalculadas += 1
+        self._fuentes = fuentes
+        self._contribuciones = contribuciones
+
+        if resumar or not fuentes:
+            # Sin fuentes el total debe ser exactamente cero, no el residuo
+            # de las restas
+            self._resumar()
+        self.ultimas_recalculadas = recalculadas
+        return tuple(c.copy() for c in self._total)
+
+    def _evaluar(self, fuente):
+        return tuple(np.asarray(c, dtype=float) for c in self.kernel(fuente))
+
+    def _sumar(self, contribucion):
+        for total, parte in zip(self._total, contribucion):
+            total += parte
+
+    def _restar(self, contribucion):
+        """Resta una contribución del total. Devuelve True si tenía valores
+        no finitos (NaN en la posición de un conductor, por ejemplo), que no
+        se pueden deshacer restando y obligan a volver a sumar."""
+        finita = True
+        for total, parte in zip(self._total, contribucion):
+            total -= parte
+            finita &= bool(np.isfinite(parte).all())
+        return not finita
+
+    def _resumar(self):
+        """Reconstruye el total sumando las contribuciones guardadas, sin
+        volver a evaluar el kernel. Sin fuentes, el total es cero."""
+        if not self._contribuciones:
+            self._total = [np.zeros_like(t) for t in self._total]
+            return
+        self._total = [c.copy() for c in self._contribuciones[0]]
+        for contribucion in self._contribuciones[1:]:
+            self._sumar(contribucion)
+
+    def _recalcular(self, fuentes):
+        if not fuentes and self._total is None:
+            # Sin un total anterior no se conoce la forma de la malla
+            raise ValueError("Se necesita al menos una fuente")
+        self._fuentes = list(fuentes)
+        self._contribuciones = [self._evaluar(f) for f in fuentes]
+        self._resumar()
+        self._actualizaciones = 0
+        self.ultimas_recalculadas = len(fuentes)
+        return tuple(c.copy() for c in self._total)
@@ -0,0 +1,200 @@
+"""Instantáneas de simulaciones en el tiempo, escritas en disco mientras
+corren.
+
+En el cuaderno, ani.to_html5_video() dibuja y guarda todos los cuadros en
+memoria antes de mostrar nada. Aquí el solver entrega cada `cada` pasos sus
+campos a un EscritorInstantaneas, que los submuestrea en el espacio y los
+agrega al final de un archivo binario por campo: la memoria no crece con la
+duración de la simulación. Un LectorInstantaneas abre esos archivos con
+memory-map, de modo que una página puede recorrer una corrida larga leyendo
+sólo los cuadros que muestra (incluso mientras la simulación sigue
+escribiendo), y exportar_video() dibuja el video cuadro a cuadro desde el
+disco.
+
+Formato de un directorio de instantáneas:
+    meta.json       campos, formas, dtype, cada, submuestreo, n y máximos
+    tiempos.bin     paso de cada instantánea (int64)
+    <campo>.bin     cuadros (n, *forma) del campo, en orden C
+"""
+import json
+import math
+import os
+
+import numpy as np
+
+# Cuadros de un GIF, como máximo: sin ffmpeg, matplotlib los guarda en memoria
+MAX_CUADROS_GIF = 200
+
+
+def _submuestreo(submuestreo, ndim):
+    """Tupla de slices con el paso de cada eje (un entero se usa en todos)."""
+    pasos = (submuestreo,) * ndim if np.ndim(submuestreo) == 0 else tuple(submuestreo)
+    if len(pasos) != ndim:
+        raise ValueError(f"submuestreo necesita {ndim} pasos, no {len(pasos)}")
+    return tuple(slice(None, None, int(p)) for p in pasos)
+
+
+class EscritorInstantaneas:
+    """Agrega instantáneas a un directorio. cada es el número de pasos entre
+    instantáneas que usan los solvers (avanzar(..., escritor=...)) y
+    submuestreo el paso espacial, uno para todos los ejes o uno por eje.
+    metadatos se guardan tal cual en meta.json (deben ser serializables)."""
+
+    def __init__(self, directorio, cada=1, submuestreo=1, dtype=np.float32, metadatos=None):
+        self.directorio = directorio
+        self.cada = cada
+        self.submuestreo = submuestreo
+        self.dtype = np.dtype(dtype)
+        self.metadatos = metadatos or {}
+        self.n = 0
+        self._formas = {}
+        self._maximos = {}
+        self._archivos = {}
+        os.makedirs(directorio, exist_ok=True)
+        self._tiempos = open(os.path.join(directorio, "tiempos.bin"), "wb")
+
+    def agregar(self, t, campos):
+        """Agrega la instantánea del paso t; campos es {nombre: arreglo}."""
+        if not self._archivos:
+            for nombre, valor in campos.items():
+                cortes = _submuestreo(self.submuestreo, np.ndim(valor))
+                self._formas[nombre] = (cortes, np.shape(np.asarray(valor)[cortes]))
+                self._maximos[nombre] = 0.0
+                self._archivos[nombre] = open(os.path.join(self.directorio, f"{nombre}.bin"), "wb")
+            self._escribir_meta(completo=False)
+        for nombre, archivo in self._archivos.items():
+            cuadro = np.ascontiguousarray(campos[nombre][self._formas[nombre][0]],
+                                          dtype=self.dtype)
+            self._maximos[nombre] = max(self._maximos[nombre], float(np.abs(cuadro).max()))
+            cuadro.tofile(archivo)
+        np.array([t], dtype=np.int64).tofile(self._tiempos)
+        self.n += 1
+
+    def _escribir_meta(self, completo):
+        meta = {"campos": {nombre: list(forma) for nombre, (_, forma) in self._formas.items()},
+                "dtype": self.dtype.str, "cada": self.cada,
+                "submuestreo": np.ravel(self.submuestreo).tolist(), "n": self.n,
+                "maximos": self._maximos, "completo": completo,
+                "metadatos": self.metadatos}
+        temporal = os.path.join(self.directorio, ".meta.json")
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(meta, archivo)
+        os.replace(temporal, os.path.join(self.directorio, "meta.json"))
+
+    def vaciar(self):
+        """Pasa al disco lo escrito, para que un lector lo vea."""
+        for archivo in (*self._archivos.values(), self._tiempos):
+            archivo.flush()
+
+    def cerrar(self, completo=True):
+        for archivo in (*self._archivos.values(), self._tiempos):
+            archivo.close()
+        self._escribir_meta(completo=completo)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *excepcion):
+        # Si la simulación se interrumpió, la corrida queda marcada incompleta
+        self.cerrar(completo=tipo is None)
+
+
+class LectorInstantaneas:
+    """Acceso perezoso a un directorio de instantáneas: campo(nombre) es un
+    memory-map (n, *forma) y cuadro(i, nombre) lee sólo esa instantánea.
+    Si la simulación sigue escribiendo, refrescar() vuelve a abrir los
+    archivos con los cuadros completos que haya."""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        self.refrescar()
+
+    def refrescar(self):
+        with open(os.path.join(self.directorio, "meta.json"), encoding="utf-8") as archivo:
+            self.meta = json.load(archivo)
+        self.dtype = np.dtype(self.meta["dtype"])
+        formas = {nombre: tuple(forma) for nombre, forma in self.meta["campos"].items()}
+        # Cuadros completos en todos los archivos (el último puede estar a medias)
+        ruta_tiempos = os.path.join(self.directorio, "tiempos.bin")
+        n = os.path.getsize(ruta_tiempos) // 8
+        for nombre, forma in formas.items():
+            bytes_cuadro = self.dtype.itemsize * math.prod(forma)
+            n = min(n, os.path.getsize(self._ruta(nombre)) // bytes_cuadro)
+        self.n = int(n)
+        self.tiempos = np.fromfile(ruta_tiempos, dtype=np.int64, count=self.n)
+        self._campos = {nombre: np.memmap(self._ruta(nombre), dtype=self.dtype, mode="r",
+                                          shape=(self.n,) + forma) if self.n else
+                        np.empty((0,) + forma, dtype=self.dtype)
+                        for nombre, forma in formas.items()}
+
+    def _ruta(self, nombre):
+        return os.path.join(self.directorio, f"{nombre}.bin")
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def nombres(self):
+        return list(self._campos)
+
+    @property
+    def completo(self):
+        return self.meta["completo"]
+
+    @property
+    def metadatos(self):
+        return self.meta["metadatos"]
+
+    def maximo(self, nombre):
+        """Máximo de |campo| en toda la corrida (al cerrar el escritor)."""
+        return self.meta["maximos"][nombre]
+
+    def campo(self, nombre):
+        return self._campos[nombre]
+
+    def cuadro(self, i, nombre=None):
+        """Instantánea i de un campo (o {nombre: arreglo} de todos)."""
+        if nombre is not None:
+            return np.asarray(self._campos[nombre][i])
+        return {n: np.asarray(c[i]) for n, c in self._campos.items()}
+
+    def muestreo(self, nombre, cuadros):
+        """Como mucho `cuadros` instantáneas equiespaciadas del campo y sus
+        pasos, leyendo sólo esas del disco."""
+        paso = max(1, -(-self.n // cuadros))
+        return self.tiempos[::paso], np.asarray(self._campos[nombre][::paso])
+
+
+def formato_video():
+    """"mp4" si matplotlib encuentra ffmpeg, "gif" si no."""
+    from matplotlib import animation
+    return "mp4" if animation.writers.is_available("ffmpeg") else "gif"
+
+
+def exportar_video(lector, ruta, construir, actualizar, fps=25, figsize=(8, 4.5), dpi=100,
+                   cuadros=None):
+    """Dibuja las instantáneas de `lector` en un video, una a una.
+
+    construir(fig) agrega los artistas y devuelve un diccionario con ellos
+    (como en figuras.Lienzo); actualizar(artistas, lector, i) los pone en la
+    instantánea i. El formato sale de la extensión de `ruta`: .mp4 pasa cada
+    cuadro a ffmpeg en cuanto se dibuja; .gif (sin ffmpeg) usa como mucho
+    MAX_CUADROS_GIF instantáneas equiespaciadas. `cuadros` limita también el
+    número de instantáneas del video."""
+    from matplotlib import animation
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    gif = ruta.endswith(".gif")
+    limite = min(filter(None, (cuadros, MAX_CUADROS_GIF if gif else None)), default=None)
+    paso = max(1, -(-len(lector) // limite)) if limite else 1
+    escritor = animation.PillowWriter(fps=fps) if gif else animation.FFMpegWriter(fps=fps)
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    artistas = construir(fig)
+    with escritor.saving(fig, ruta, dpi):
+        for i in range(0, len(lector), paso):
+            actualizar(artistas, lector, i)
+            escritor.grab_frame()
+    return ruta
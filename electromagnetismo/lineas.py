@@ -0,0 +1,161 @@
+"""Trazado de líneas de campo en el plano.
+
+Todas las líneas se integran a la vez: en cada paso se evalúa el campo en
+los puntos de las líneas que siguen activas, con una sola llamada a la
+función de campo. Las líneas se integran sobre la dirección del campo
+normalizada, así que el paso es una longitud de arco.
+"""
+import numpy as np
+
+# Coeficientes de Dormand–Prince 5(4)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+)
+_DP_B5 = (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84)
+# Diferencia entre la solución de orden 5 y la de orden 4 (incluye k7)
+_DP_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def _direccion(campo, puntos, sentido):
+    """Dirección unitaria del campo (por `sentido`) en cada punto; NaN
+    donde el campo es nulo o no está definido."""
+    Fx, Fy = campo(puntos[:, 0], puntos[:, 1])
+    F = np.column_stack([np.ravel(Fx), np.ravel(Fy)])
+    norma = np.hypot(F[:, 0], F[:, 1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        F *= (sentido / norma)[:, None]
+    return F
+
+
+def trazar_lineas(campo, semillas, paso=0.05, pasos_max=1000, limites=None,
+                  sumideros=None, radio_sumidero=None, sentido=1.0, metodo="rk4",
+                  tolerancia=1e-5, cerrar=False):
+    """Integra las líneas de campo que parten de `semillas` (N, 2).
+
+    campo(x, y) recibe arreglos 1D de coordenadas y devuelve (Fx, Fy).
+    sentido: +1 sigue el campo, -1 va en contra (escalar o uno por línea).
+    metodo: "rk4" (paso fijo `paso`) o "rk45" (Dormand–Prince, paso
+    adaptativo con error local menor que `tolerancia` y como máximo `paso`).
+
+    Una línea se detiene al salir de `limites` (x_min, x_max, y_min, y_max),
+    al llegar a menos de `radio_sumidero` de un punto de `sumideros` (M, 2)
+    (cargas o conductores; por defecto radio_sumidero = paso), donde el
+    campo se anula, tras `pasos_max` pasos o, si cerrar=True, al volver a su
+    semilla (líneas cerradas, como las de un conductor).
+
+    Devuelve un arreglo (N, n, 2) con los puntos de cada línea, relleno con
+    NaN después de su último punto; así se puede dibujar con ax.plot.
+    """
+    semillas = np.atleast_2d(np.asarray(semillas, dtype=float))
+    n = semillas.shape[0]
+    sentido = np.broadcast_to(np.asarray(sentido, dtype=float), (n,))
+    if sumideros is not None:
+        sumideros = np.atleast_2d(np.asarray(sumideros, dtype=float))
+        if radio_sumidero is None:
+            radio_sumidero = paso
+    if metodo not in ("rk4", "rk45"):
+        raise ValueError(f"Método desconocido: '{metodo}' (use 'rk4' o 'rk45')")
+    if n == 0:
+        return np.empty((0, 1, 2))
+
+    trayectorias = np.full((n, pasos_max + 1, 2), np.nan)
+    trayectorias[:, 0] = semillas
+    cuenta = np.zeros(n, dtype=int)
+    longitud = np.zeros(n)
+    activos = np.arange(n)
+    puntos = semillas.copy()
+    h = np.full(n, paso)
+    k1 = _direccion(campo, semillas, sentido) if metodo == "rk45" else None
+
+    # Con paso adaptativo se permiten pasos rechazados además de los aceptados
+    for _ in range(pasos_max if metodo == "rk4" else 4 * pasos_max):
+        if activos.size == 0:
+            break
+        p = puntos[activos]
+        s = sentido[activos]
+        if metodo == "rk4":
+            a1 = _direccion(campo, p, s)
+            a2 = _direccion(campo, p + 0.5 * paso * a1, s)
+            a3 = _direccion(campo, p + 0.5 * paso * a2, s)
+            a4 = _direccion(campo, p + paso * a3, s)
+            nuevo = p + paso / 6 * (a1 + 2 * a2 + 2 * a3 + a4)
+            aceptado = np.ones(activos.size, dtype=bool)
+            avance = np.full(activos.size, paso)
+        else:
+            hh = h[activos][:, None]
+            k = [k1[activos]]
+            for fila in _DP_A[1:]:
+                etapa = p + hh * sum(a * ki for a, ki in zip(fila, k))
+                k.append(_direccion(campo, etapa, s))
+            nuevo = p + hh * sum(b * ki for b, ki in zip(_DP_B5, k))
+            k.append(_direccion(campo, nuevo, s))  # k7 = k1 del paso siguiente
+            error = np.hypot(*(hh * sum(e * ki for e, ki in zip(_DP_E, k))).T)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                factor = np.clip(0.9 * (tolerancia / error)**0.2, 0.2, 5.0)
+            factor[np.isnan(factor)] = 0.2
+            aceptado = ~(error > tolerancia) | (hh[:, 0] <= 1e-3 * paso)
+            avance = hh[:, 0]
+            h[activos] = np.clip(hh[:, 0] * factor, 1e-3 * paso, paso)
+            k1[activos[aceptado]] = k[-1][aceptado]
+
+        # Sólo avanzan las líneas con paso aceptado; las demás lo repiten
+        indices = activos[aceptado]
+        nuevo = nuevo[aceptado]
+        cuenta[indices] += 1
+        longitud[indices] += avance[aceptado]
+        puntos[indices] = nuevo
+        trayectorias[indices, cuenta[indices]] = nuevo
+
+        detener = ~np.isfinite(nuevo).all(axis=1) | (cuenta[indices] >= pasos_max)
+        if limites is not None:
+            x_min, x_max, y_min, y_max = limites
+            detener |= (nuevo[:, 0] < x_min) | (nuevo[:, 0] > x_max) \
+                | (nuevo[:, 1] < y_min) | (nuevo[:, 1] > y_max)
+        if sumideros is not None:
+            distancia = np.hypot(nuevo[:, None, 0] - sumideros[None, :, 0],
+                                 nuevo[:, None, 1] - sumideros[None, :, 1])
+            cercano = distancia.argmin(axis=1)
+            llego = distancia[np.arange(len(nuevo)), cercano] < radio_sumidero
+            # La línea termina justo en la carga o el conductor
+            trayectorias[indices[llego], cuenta[indices[llego]]] = sumideros[cercano[llego]]
+            detener |= llego
+        if cerrar:
+            cerca_semilla = np.hypot(*(nuevo - semillas[indices]).T) < paso
+            cerro = cerca_semilla & (longitud[indices] > 4 * paso)
+            trayectorias[indices[cerro], cuenta[indices[cerro]]] = semillas[indices[cerro]]
+            detener |= cerro
+
+        detenidas = np.zeros(activos.size, dtype=bool)
+        detenidas[np.flatnonzero(aceptado)[detener]] = True
+        activos = activos[~detenidas]
+
+    return trayectorias[:, :cuenta.max() + 1].copy()
+
+
+def semillas_cargas(posiciones, cargas, total=100, radio=0.1):
+    """Semillas repartidas en círculos de `radio` alrededor de cada carga,
+    con un número de líneas proporcional a |q| (al menos una por carga no
+    nula) y `total` líneas en conjunto.
+
+    Devuelve (semillas, sentido): las líneas salen de las cargas positivas
+    siguiendo el campo y de las negativas en contra del campo.
+    """
+    posiciones = np.atleast_2d(np.asarray(posiciones, dtype=float))[:, :2]
+    cargas = np.atleast_1d(np.asarray(cargas, dtype=float))
+    magnitud = np.abs(cargas)
+    if magnitud.sum() == 0:
+        return np.empty((0, 2)), np.empty(0)
+    por_carga = np.where(magnitud > 0,
+                         np.maximum(1, np.round(total * magnitud / magnitud.sum())), 0)
+
+    semillas, sentido = [], []
+    for centro, q, m in zip(posiciones, cargas, por_carga.astype(int)):
+        angulos = 2 * np.pi * (np.arange(m) + 0.5) / max(m, 1)
+        semillas.append(centro + radio * np.column_stack([np.cos(angulos), np.sin(angulos)]))
+        sentido.append(np.full(m, np.sign(q)))
+    return np.concatenate(semillas), np.concatenate(sentido)
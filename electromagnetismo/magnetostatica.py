@@ -0,0 +1,198 @@
+import numpy as np
+
+from electromagnetismo.teselas import aplanar, dimensionar, puntos_tesela, tipo_salida
+
+# --- Permeabilidad del vacío ---
+MU0 = 4 * np.pi * 1e-7  # T·m/A
+
+# Distancia mínima a un conductor por debajo de la cual se anula su aporte
+R_MIN = 1e-6
+
+# Tamaño de los bloques de evaluación: segmentos por bloque y pares
+# (segmento, punto) por tesela, como máximo (los temporales deben caber en
+# caché); el presupuesto de memoria puede reducirlos
+_SEGMENTOS_POR_BLOQUE = 256
+_PARES_POR_TESELA = 32768
+# Puntos que comparten un mismo origen local en campo_b_segmentos
+_PUNTOS_POR_REGION = 8192
+
+
+def campo_h_conductor(I, x0, y0, X, Y):
+    """Campo H de un conductor infinito con corriente I en la dirección +z,
+    ubicado en (x0, y0). Devuelve las componentes (Hx, Hy) sobre la malla;
+    en el punto del conductor el campo queda indefinido (NaN)."""
+    # --- Distancia radial al centro del conductor ---
+    R = np.sqrt((X - x0)**2 + (Y - y0)**2)
+    R[R == 0] = np.nan  # evitar división por cero
+
+    # Vectores unitarios en dirección phi (-Δy, Δx)
+    phiX = -(Y - y0) / R
+    phiY = (X - x0) / R
+
+    H = I / (2 * np.pi * R)
+    return H * phiX, H * phiY
+
+
+def campo_b_hilos(corrientes, puntos, direcciones, X, Y, Z=None, memoria=None,
+                  dtype=np.float64):
+    """Campo B de N hilos rectos infinitos.
+
+    corrientes: (N,) en A. puntos: (N, 3) un punto de cada hilo.
+    direcciones: (N, 3) dirección de la corriente (no hace falta que sea
+    unitaria). Devuelve (Bx, By, Bz) con la forma de X; el aporte de un
+    hilo se anula a distancia menor que R_MIN. memoria y dtype funcionan
+    como en campo_b_segmentos.
+    """
+    corrientes = np.atleast_1d(np.asarray(corrientes, dtype=float))
+    puntos = np.atleast_2d(np.asarray(puntos, dtype=float))
+    u = np.atleast_2d(np.asarray(direcciones, dtype=float))
+    u = u / np.linalg.norm(u, axis=1, keepdims=True)
+    coef_total = MU0 * corrientes / (2 * np.pi)
+    forma, coordenadas = aplanar(X, Y, Z)
+    n_puntos = coordenadas[0].size
+    B = np.empty((n_puntos, 3), dtype=tipo_salida(dtype))
+
+    tesela, bloque = dimensionar(n_puntos, corrientes.shape[0], bytes_por_par=11 * 8,
+                                 memoria=memoria, bytes_por_punto=6 * 8)
+    for a in range(0, n_puntos, tesela):
+        sl = slice(a, a + tesela)
+        P = puntos_tesela(coordenadas, sl, n_puntos)
+        acumulado = np.zeros_like(P)
+        for b in range(0, corrientes.shape[0], bloque):
+            d = u[b:b + bloque]
+            # ρ: componente de (P - p0) perpendicular a cada hilo
+            rho = P[None, :, :] - puntos[b:b + bloque, None, :]
+            rho -= np.einsum("bnk,bk->bn", rho, d)[:, :, None] * d[:, None, :]
+            rho2 = np.einsum("bnk,bnk->bn", rho, rho)
+            rho2[rho2 < R_MIN**2] = np.inf
+            np.divide(coef_total[b:b + bloque, None], rho2, out=rho2)
+            acumulado += np.einsum("bn,bnk->nk", rho2, np.cross(d[:, None, :], rho))
+        B[sl] = acumulado
+    return tuple(B[:, i].reshape(forma) for i in range(3))
+
+
+def campo_b_segmentos(corrientes, inicios, finales, X, Y, Z=None, memoria=None,
+                      dtype=np.float64):
+    """Campo B (ley de Biot–Savart) de N segmentos rectos finitos.
+
+    corrientes: (N,) en A, circulando de inicios[i] a finales[i] (N, 3).
+    Cada segmento aporta la expresión cerrada
+
+        B = μ0 I / 4π · (|r1| + |r2|) (r1 × r2) / (|r1| |r2| (|r1| |r2| + r1·r2))
+
+    con r1 = P - inicio y r2 = P - final. Los puntos sobre la recta del
+    segmento (dentro de R_MIN) no reciben su aporte. Devuelve (Bx, By, Bz)
+    con la forma de X.
+
+    memoria: bytes que pueden ocupar los temporales (por defecto
+    EM_BLOQUE_MB). dtype: tipo de la salida; con float32 cada tesela se
+    acumula en float64 y se redondea una vez, con error ≤ 2⁻²⁴ |B|.
+    """
+    corrientes = np.atleast_1d(np.asarray(corrientes, dtype=float))
+    if corrientes.size == 0 and np.size(inicios) == 0 and np.size(finales) == 0:
+        # Sin segmentos (por ejemplo, al quitar el último conductor) B = 0
+        forma, _ = aplanar(X, Y, Z)
+        return tuple(np.zeros(forma, dtype=tipo_salida(dtype)) for _ in range(3))
+    inicios = np.atleast_2d(np.asarray(inicios, dtype=float))
+    finales = np.atleast_2d(np.asarray(finales, dtype=float))
+    if inicios.shape != finales.shape or inicios.shape[1] != 3 \
+            or corrientes.shape[0] != inicios.shape[0]:
+        raise ValueError(
+            "inicios y finales deben tener forma (N, 3) y corrientes forma (N,)")
+    forma, coordenadas = aplanar(X, Y, Z)
+    n_puntos = coordenadas[0].size
+    B = np.empty((n_puntos, 3), dtype=tipo_salida(dtype))
+
+    # Todo lo que depende de P se escribe como producto de matrices:
+    # |r1|² = |P|² - 2 P·A + |A|², r1·r2 = |P|² - P·(A + C) + A·C y
+    # r1 × r2 = P × (A - C) + A × C. Esas expansiones cancelan términos del
+    # orden de |P|², así que P, A y C se miden desde el centroide de cada
+    # región de puntos: lejos del origen el error no crece con |P|
+    tesela, bloque = dimensionar(
+        n_puntos, corrientes.shape[0], bytes_por_par=5 * 8 + 1, memoria=memoria,
+        tesela_max=_PARES_POR_TESELA // min(corrientes.shape[0], _SEGMENTOS_POR_BLOQUE),
+        bloque_max=_SEGMENTOS_POR_BLOQUE,
+        bytes_por_punto=17 * 8)
+    region = max(1, _PUNTOS_POR_REGION // tesela) * tesela
+
+    for r in range(0, n_puntos, region):
+        puntos = puntos_tesela(coordenadas, slice(r, r + region), n_puntos)
+        origen = puntos.mean(axis=0)
+        puntos -= origen
+        bloques = []
+        for b in range(0, corrientes.shape[0], bloque):
+            A = inicios[b:b + bloque] - origen
+            C = finales[b:b + bloque] - origen
+            bloques.append((
+                np.vstack([-2 * A.T, np.einsum("ij,ij->i", A, A)]),
+                np.vstack([-2 * C.T, np.einsum("ij,ij->i", C, C)]),
+                np.vstack([-(A + C).T, np.einsum("ij,ij->i", A, C)]),
+                np.column_stack([A - C, np.cross(A, C)]) * corrientes[b:b + bloque, None]))
+
+        for a in range(0, puntos.shape[0], tesela):
+            P = puntos[a:a + tesela]
+            P1 = np.column_stack([P, np.ones(P.shape[0])])
+            P2 = np.einsum("ij,ij->i", P, P)[:, None]
+            F = np.zeros((P.shape[0], 6))
+            for MA, MC, MD, W in bloques:
+                n1 = P1 @ MA
+                n1 += P2
+                np.maximum(n1, 0, out=n1)  # el redondeo junto a un extremo da -ε
+                np.sqrt(n1, out=n1)
+                n2 = P1 @ MC
+                n2 += P2
+                np.maximum(n2, 0, out=n2)
+                np.sqrt(n2, out=n2)
+                producto = P1 @ MD
+                producto += P2
+
+                f = n1 + n2
+                n1 *= n2
+                producto += n1  # |r1||r2| + r1·r2, nulo sobre la recta del segmento
+                n1 *= producto
+                # Sobre la recta de un segmento el cociente es 0/0 y se anula
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    np.divide(f, n1, out=f)
+                f[producto < 2 * R_MIN**2] = 0
+                F += f @ W
+
+            # B = μ0/4π (P × Σ f I (A - C) + Σ f I A × C), con P, A y C
+            # medidos desde el mismo origen
+            Bt = np.cross(P, F[:, :3])
+            Bt += F[:, 3:]
+            Bt *= MU0 / (4 * np.pi)
+            B[r + a:r + a + P.shape[0]] = Bt
+    return tuple(B[:, i].reshape(forma) for i in range(3))
+
+
+def segmentos_polilinea(vertices, cerrada=False):
+    """Divide una polilínea (M, 3) en segmentos consecutivos. Si cerrada,
+    se agrega el segmento que vuelve del último vértice al primero."""
+    vertices = np.atleast_2d(np.asarray(vertices, dtype=float))
+    finales = np.roll(vertices, -1, axis=0) if cerrada else vertices[1:]
+    return vertices[:len(finales)], finales
+
+
+def campo_b_polilineas(polilineas, corrientes, X, Y, Z=None, cerradas=False,
+                       memoria=None, dtype=np.float64):
+    """Campo B de varias polilíneas, cada una con su corriente. Es la suma
+    de los segmentos de todas, evaluada en una sola llamada."""
+    inicios, finales, I = [np.empty((0, 3))], [np.empty((0, 3))], [np.empty(0)]
+    for vertices, corriente in zip(polilineas, corrientes):
+        a, c = segmentos_polilinea(vertices, cerradas)
+        inicios.append(a)
+        finales.append(c)
+        I.append(np.full(len(a), float(corriente)))
+    return campo_b_segmentos(np.concatenate(I), np.concatenate(inicios),
+                             np.concatenate(finales), X, Y, Z, memoria=memoria, dtype=dtype)
+
+
+def espira_poligonal(radio, lados, centro=(0.0, 0.0, 0.0), normal="x"):
+    """Vértices de un polígono regular de `lados` lados inscrito en una
+    circunferencia de `radio`, perpendicular al eje `normal` ('x', 'y' o 'z').
+    Recorrido antihorario visto desde el lado positivo del eje."""
+    angulos = np.linspace(0, 2 * np.pi, lados, endpoint=False)
+    u, v = radio * np.cos(angulos), radio * np.sin(angulos)
+    cero = np.zeros(lados)
+    ejes = {"x": (cero, u, v), "y": (v, cero, u), "z": (u, v, cero)}
+    return np.column_stack(ejes[normal]) + np.asarray(centro, dtype=float)
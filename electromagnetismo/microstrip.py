@@ -0,0 +1,118 @@
+"""Línea microstrip por desarrollo en serie (método de Galerkin).
+
+Una tira de ancho W a potencial V0 está sobre un sustrato de espesor h y
+permitividad relativa er, dentro de una caja de ancho d con paredes a
+tierra. El potencial es una serie de cosenos en x con los términos impares
+n = 1, 3, 5, ...:
+
+    φ = Σ A_n sinh(nπy/d) cos(nπx/d)          en el dieléctrico (y ≤ h)
+    φ = Σ C_n exp(-nπ(y - h)/d) cos(nπx/d)    en el aire (y > h)
+
+Es la clase MicrostripGalerkin del Workshop 2 con la misma interfaz, pero
+cada serie se evalúa con numpy para todos los términos a la vez, en vez de
+con bucles de Python, y los puntos se recorren por teselas para que los
+temporales (puntos × términos) no superen EM_BLOQUE_MB. Además,
+sinh(nπy/d)/sinh(nπh/d) se calcula con exponenciales decrecientes: con
+nπh/d grande el cuaderno desborda y da NaN.
+"""
+import numpy as np
+
+from electromagnetismo.teselas import presupuesto
+
+EPSILON_0 = 8.854e-12  # F/m
+
+
+class MicrostripGalerkin:
+    """Potencial y densidad de carga de la microstrip. x, y pueden ser
+    números o arreglos (se combinan con las reglas de numpy)."""
+
+    def __init__(self, W=40, h=16, d=0.03, er=4.3, V0=10, N=51):
+        self.W = W
+        self.h = h
+        self.d = d
+        self.er = er
+        self.V0 = V0
+        self.N = N if N % 2 == 1 else N + 1
+        self.e0 = EPSILON_0
+
+    def _terminos(self, n_terms=None):
+        """Índices impares n y números de onda nπ/d de los términos."""
+        n = np.arange(1, (n_terms or self.N) + 1, 2, dtype=float)
+        return n, n * np.pi / self.d
+
+    def calculate_Cn(self, n):
+        n_pi = np.asarray(n, dtype=float) * np.pi
+        return (4 * self.V0 / n_pi) * np.sin(n_pi * self.W / (2 * self.d))
+
+    def calculate_An(self, n):
+        n_pi = np.asarray(n, dtype=float) * np.pi
+        with np.errstate(over="ignore"):
+            # Con sinh desbordado el coeficiente es 0, como en el cuaderno
+            return self.calculate_Cn(n) / np.sinh(n_pi * self.h / self.d)
+
+    def _serie(self, x, y, perfil_y, n_terms, memoria=None):
+        """Σ C_n perfil_y(kn, y) cos(kn x) en los puntos (x, y), por teselas."""
+        n, kn = self._terminos(n_terms)
+        Cn = self.calculate_Cn(n)
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        forma, x, y = x.shape, x.ravel(), y.ravel()
+        resultado = np.empty(x.size)
+        # Unos cuatro temporales de (tesela, términos) en float64
+        tesela = max(1, presupuesto(memoria) // (kn.size * 4 * 8))
+        for a in range(0, x.size, tesela):
+            sl = slice(a, a + tesela)
+            resultado[sl] = (Cn * perfil_y(kn, y[sl, None])
+                             * np.cos(kn * x[sl, None])).sum(axis=-1)
+        return resultado.reshape(forma)
+
+    def _perfil_dielectrico(self, kn, y):
+        # A_n sinh(kn y) = C_n sinh(kn y) / sinh(kn h), sin desbordes para 0 <= y <= h
+        ky = kn * y
+        return np.exp(ky - kn * self.h) * np.expm1(-2 * ky) / np.expm1(-2 * kn * self.h)
+
+    def _perfil_aire(self, kn, y):
+        return np.exp(-kn * (y - self.h))
+
+    def potential_dielectric(self, x, y, n_terms=None):
+        return self._serie(x, y, self._perfil_dielectrico, n_terms)
+
+    def potential_air(self, x, y, n_terms=None):
+        return self._serie(x, y, self._perfil_aire, n_terms)
+
+    def potential(self, x, y, n_terms=None):
+        """Potencial en cualquier punto, eligiendo la serie de cada región."""
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        phi = np.empty(x.shape)
+        dielectrico = y <= self.h
+        phi[dielectrico] = self.potential_dielectric(x[dielectrico], y[dielectrico], n_terms)
+        phi[~dielectrico] = self.potential_air(x[~dielectrico], y[~dielectrico], n_terms)
+        return phi
+
+    def calculate_center_line(self, num_points=200, n_terms=None):
+        y_values = np.linspace(0, self.h + 20, num_points)
+        return y_values, self.potential(0.0, y_values, n_terms)
+
+    def calculate_charge_density(self, num_points=100):
+        """Densidad superficial de carga sobre la tira (nC/m²)."""
+        x_values = np.linspace(-self.W / 2, self.W / 2, num_points)
+        n, kn = self._terminos()
+        Cn = self.calculate_Cn(n)
+        cosenos = np.cos(kn * x_values[:, None])
+        # A_n kn cosh(kn h) = C_n kn / tanh(kn h)
+        derivada_dielectrico = (Cn * kn / np.tanh(kn * self.h) * cosenos).sum(axis=-1)
+        derivada_aire = (-Cn * kn * cosenos).sum(axis=-1)
+        rho = self.e0 * (self.er * derivada_dielectrico - derivada_aire)
+        return x_values, rho * 1e9
+
+    def calculate_convergence(self):
+        n_values = np.array([n for n in [9, 27, 51, 81, 100, 150] if n <= self.N])
+        phi_values = np.array([self.potential_dielectric(self.d / 4, self.h / 2, n)
+                               for n in n_values])
+        return n_values, phi_values
+
+    def calculate_field_2d(self, x_points=150, y_points=150):
+        x_range = self.d * 1.5
+        x_values = np.linspace(-x_range / 2, x_range / 2, x_points)
+        y_values = np.linspace(0, self.h + 15, y_points)
+        X, Y = np.meshgrid(x_values, y_values)
+        return X, Y, self.potential(X, Y)
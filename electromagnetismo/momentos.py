@@ -0,0 +1,340 @@
+"""Método de Momentos (MoM) para conductores a un potencial conocido.
+
+Es el ejemplo de la varilla del cuaderno BookExercise generalizado: el
+conductor se divide en N elementos con densidad de carga constante
+(funciones pulso) y se impone el potencial V0 en el centro de cada uno
+(colocación), lo que da el sistema Z q = V. Cada elemento Z[m, n] es la
+integral exacta del núcleo sobre el elemento n vista desde el centro de m,
+también la del término propio, de modo que no hay que aproximar la
+autointeracción como en el cuaderno (2/Δx).
+
+Geometrías:
+    Varilla   hilo recto de radio a (núcleo reducido 1/√(u² + a²))
+    Cinta     tira de ancho W a una altura h sobre un plano de tierra, en
+              2D (capacidad por unidad de longitud)
+    Placa     placa rectangular (o cualquier forma dada por una máscara
+              sobre una malla regular)
+
+Con elementos del mismo tamaño el núcleo sólo depende de la distancia entre
+índices y Z es simétrica de Toeplitz (de bloques de Toeplitz en la placa):
+basta guardar su primera columna, el producto Z q se hace con FFT en
+O(N log N) y el sistema se resuelve con gradiente conjugado
+precondicionado por la matriz circulante de T. Chan, sin formar nunca Z.
+Así se llega a N = 10⁵ elementos o más. Con elementos desiguales (nodos
+dados a mano) se llena la matriz densa por bloques de filas y se resuelve
+con np.linalg.solve, lo que limita N a unos pocos miles.
+"""
+import numpy as np
+
+from electromagnetismo.teselas import presupuesto
+
+EPSILON_0 = 8.854e-12  # F/m
+
+# Segmento más corto de una varilla, en radios: más cortos, el núcleo
+# reducido es casi constante en varios segmentos y el sistema está mal
+# planteado (el gradiente conjugado deja de converger)
+SEGMENTO_MINIMO = 0.5
+
+# Iteraciones por defecto del gradiente conjugado
+MAX_ITERACIONES = 1000
+
+
+def _integral_recta(u1, u2, radio):
+    """∫ du / √(u² + a²) entre u1 y u2."""
+    return np.arcsinh(u2 / radio) - np.arcsinh(u1 / radio)
+
+
+def _primitiva_log(u):
+    """Primitiva de ln|u| (u ln|u| - u), continua en u = 0."""
+    absoluto = np.abs(u)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(absoluto > 0, u * np.log(np.where(absoluto > 0, absoluto, 1)) - u, 0.0)
+
+
+def _primitiva_log_imagen(u, b):
+    """Primitiva de ln √(u² + b²)."""
+    return 0.5 * u * np.log(u**2 + b**2) - u + b * np.arctan(u / b)
+
+
+def _primitiva_rectangulo(x, y):
+    """Primitiva de 1/√(x² + y²) en x e y: x asinh(y/|x|) + y asinh(x/|y|),
+    con cada término nulo sobre su eje."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fx = np.where(x != 0, x * np.arcsinh(y / np.abs(np.where(x != 0, x, 1))), 0.0)
+        fy = np.where(y != 0, y * np.arcsinh(x / np.abs(np.where(y != 0, y, 1))), 0.0)
+    return fx + fy
+
+
+def _integral_rectangulo(x1, x2, y1, y2):
+    """∫∫ dA / r sobre el rectángulo [x1, x2] × [y1, y2], visto desde el origen."""
+    return (_primitiva_rectangulo(x2, y2) - _primitiva_rectangulo(x1, y2)
+            - _primitiva_rectangulo(x2, y1) + _primitiva_rectangulo(x1, y1))
+
+
+def _circulante(columna):
+    """Primera columna de Toeplitz (simétrica en cada eje) embebida en una
+    circulante de 2n por eje: t0 .. t(n-1), 0, t(n-1) .. t1."""
+    for eje, n in enumerate(columna.shape):
+        reflejo = np.flip(np.take(columna, np.arange(1, n), axis=eje), axis=eje)
+        cero = np.zeros_like(np.take(columna, [0], axis=eje))
+        columna = np.concatenate([columna, cero, reflejo], axis=eje)
+    return columna
+
+
+def _chan(columna):
+    """Circulante óptima de T. Chan, c_k = ((n - k) t_k + k t_(n-k)) / n en
+    cada eje: es la circulante más cercana a Z en norma de Frobenius."""
+    for eje, n in enumerate(columna.shape):
+        k = np.arange(n).reshape([-1 if e == eje else 1 for e in range(columna.ndim)])
+        reflejo = np.roll(np.flip(columna, axis=eje), 1, axis=eje)
+        columna = ((n - k) * columna + k * reflejo) / n
+    return columna
+
+
+class OperadorToeplitz:
+    """Producto por una matriz simétrica de Toeplitz de nivel 1 o 2 dada por
+    su primera columna (forma de la malla), con FFT de tamaño 2n por eje.
+    Con una máscara la matriz es la submatriz de los elementos activos, y
+    los vectores tienen un valor por elemento activo."""
+
+    def __init__(self, columna, mascara=None):
+        columna = np.asarray(columna, dtype=float)
+        self.forma = columna.shape
+        self.mascara = None if mascara is None else np.asarray(mascara, dtype=bool)
+        self._tamano = tuple(2 * n for n in self.forma)
+        self._simbolo = np.fft.rfftn(_circulante(columna))
+        autovalores = np.fft.rfftn(_chan(columna)).real
+        # Para Z definida positiva la circulante de Chan también lo es
+        self._inverso = 1 / autovalores if np.all(autovalores > 0) else None
+
+    @property
+    def n(self):
+        return int(self.mascara.sum() if self.mascara is not None else np.prod(self.forma))
+
+    def _malla(self, vector):
+        if self.mascara is None:
+            return vector.reshape(self.forma)
+        malla = np.zeros(self.forma)
+        malla[self.mascara] = vector
+        return malla
+
+    def _vector(self, malla):
+        return malla[self.mascara] if self.mascara is not None else malla.ravel()
+
+    def __matmul__(self, vector):
+        producto = np.fft.irfftn(np.fft.rfftn(self._malla(vector), s=self._tamano)
+                                 * self._simbolo, s=self._tamano)
+        return self._vector(producto[tuple(slice(n) for n in self.forma)])
+
+    def precondicionar(self, residuo):
+        """Aplica la inversa de la circulante de Chan (o nada si no es
+        definida positiva)."""
+        if self._inverso is None:
+            return residuo
+        return self._vector(np.fft.irfftn(np.fft.rfftn(self._malla(residuo)) * self._inverso,
+                                          s=self.forma))
+
+
+def gradiente_conjugado(Z, b, precondicionar=None, tolerancia=1e-8, max_iter=MAX_ITERACIONES):
+    """Resuelve Z x = b (Z simétrica definida positiva, con Z @ x) hasta que
+    ‖r‖ ≤ tolerancia ‖b‖. Devuelve (x, iteraciones)."""
+    b = np.asarray(b, dtype=float)
+    precondicionar = precondicionar or (lambda r: r)
+    x = np.zeros_like(b)
+    r = b.copy()
+    z = precondicionar(r)
+    p = z.copy()
+    rz = r @ z
+    limite = tolerancia * np.linalg.norm(b)
+    for iteracion in range(1, max_iter + 1):
+        zp = Z @ p
+        alfa = rz / (p @ zp)
+        x += alfa * p
+        r -= alfa * zp
+        if np.linalg.norm(r) <= limite:
+            return x, iteracion
+        z = precondicionar(r)
+        rz, rz_anterior = r @ z, rz
+        p *= rz / rz_anterior
+        p += z
+    raise RuntimeError(f"el gradiente conjugado no convergió en {max_iter} iteraciones")
+
+
+def _nodos(nodos, longitud, n):
+    """Nodos dados o n + 1 nodos equiespaciados en [-longitud/2, longitud/2]."""
+    if nodos is None:
+        return np.linspace(-longitud / 2, longitud / 2, n + 1)
+    nodos = np.asarray(nodos, dtype=float)
+    if nodos.ndim != 1 or nodos.size < 2 or np.any(np.diff(nodos) <= 0):
+        raise ValueError("los nodos deben ser una sucesión creciente")
+    return nodos
+
+
+class _Conductor:
+    """Conductor dividido en elementos sobre los nodos de cada eje (un
+    producto tensorial en la placa). Las subclases definen factor y
+    _nucleo(*intervalos), la integral del núcleo sobre los intervalos
+    (u1, u2) de cada eje, con u = centro observado - fuente."""
+
+    factor = 1.0
+
+    def __init__(self, nodos, V0, mascara=None):
+        self.nodos = nodos
+        self.V0 = V0
+        self.centros = [(n[1:] + n[:-1]) / 2 for n in nodos]
+        self.anchos = [np.diff(n) for n in nodos]
+        self.forma = tuple(c.size for c in self.centros)
+        self.mascara = None if mascara is None else np.asarray(mascara, dtype=bool)
+        if self.mascara is not None and self.mascara.shape != self.forma:
+            raise ValueError(f"la máscara debe tener forma {self.forma}")
+        self.densidad = None
+        self.metodo = None
+        self.iteraciones = 0
+
+    @property
+    def uniforme(self):
+        return all(np.allclose(a, a[0], rtol=1e-9, atol=0) for a in self.anchos)
+
+    @property
+    def n(self):
+        return int(self.mascara.sum() if self.mascara is not None else np.prod(self.forma))
+
+    def _activos(self, valores):
+        """Aplana un arreglo con la forma de la malla a los elementos activos."""
+        return valores[self.mascara] if self.mascara is not None else valores.ravel()
+
+    def medidas(self):
+        """Longitud o área de cada elemento activo."""
+        return self._activos(np.prod(np.meshgrid(*self.anchos, indexing="ij"), axis=0))
+
+    def operador(self):
+        """Z como OperadorToeplitz (sólo con elementos iguales)."""
+        if not self.uniforme:
+            raise ValueError("Z sólo es de Toeplitz con elementos del mismo tamaño")
+        intervalos = []
+        for centros, anchos in zip(self.centros, self.anchos):
+            u = centros - centros[0]
+            intervalos += [u - anchos[0] / 2, u + anchos[0] / 2]
+        mallas = np.meshgrid(*intervalos[0::2], indexing="ij")
+        mallas_fin = np.meshgrid(*intervalos[1::2], indexing="ij")
+        argumentos = [v for par in zip(mallas, mallas_fin) for v in par]
+        return OperadorToeplitz(self.factor * self._nucleo(*argumentos), self.mascara)
+
+    def matriz(self, memoria=None):
+        """Z densa (n × n), llenada por bloques de filas vectorizados."""
+        centros = [self._activos(c) for c in np.meshgrid(*self.centros, indexing="ij")]
+        izquierdos = [self._activos(c) for c in np.meshgrid(*[n[:-1] for n in self.nodos],
+                                                           indexing="ij")]
+        derechos = [self._activos(c) for c in np.meshgrid(*[n[1:] for n in self.nodos],
+                                                         indexing="ij")]
+        n = self.n
+        Z = np.empty((n, n))
+        # Unos diez temporales de (filas, n) por eje en float64
+        filas = max(1, presupuesto(memoria) // (n * 8 * 10 * len(centros)))
+        for inicio in range(0, n, filas):
+            sl = slice(inicio, inicio + filas)
+            argumentos = []
+            for c, izq, der in zip(centros, izquierdos, derechos):
+                argumentos += [c[sl, None] - der[None, :], c[sl, None] - izq[None, :]]
+            Z[sl] = self.factor * self._nucleo(*argumentos)
+        return Z
+
+    def resolver(self, metodo=None, tolerancia=1e-8, max_iter=MAX_ITERACIONES):
+        """Densidad de carga de cada elemento activo. metodo "toeplitz"
+        (FFT y gradiente conjugado) o "denso"; por defecto, toeplitz si los
+        elementos son iguales."""
+        metodo = metodo or ("toeplitz" if self.uniforme else "denso")
+        V = np.full(self.n, float(self.V0))
+        if metodo == "toeplitz":
+            Z = self.operador()
+            self.densidad, self.iteraciones = gradiente_conjugado(
+                Z, V, Z.precondicionar, tolerancia, max_iter)
+        elif metodo == "denso":
+            self.densidad = np.linalg.solve(self.matriz(), V)
+            self.iteraciones = 0
+        else:
+            raise ValueError(f"método desconocido: {metodo!r}")
+        self.metodo = metodo
+        return self.densidad
+
+    def carga(self):
+        if self.densidad is None:
+            self.resolver()
+        return float(self.densidad @ self.medidas())
+
+    def capacitancia(self):
+        """Q / V0."""
+        return self.carga() / self.V0
+
+
+class Varilla(_Conductor):
+    """Varilla de longitud L y radio a (m) a potencial V0, en N segmentos
+    (o sobre los nodos dados). La densidad es la carga por unidad de
+    longitud (C/m). El núcleo reducido supone la carga en el eje y el
+    potencial en la superficie; es un buen modelo mientras los segmentos
+    no sean mucho más cortos que el radio, así que se rechazan segmentos
+    de menos de SEGMENTO_MINIMO radios (para N grande, use un radio menor:
+    con L = 1 m y N = 10⁵, a ≤ 10 µm)."""
+
+    factor = 1 / (4 * np.pi * EPSILON_0)
+
+    def __init__(self, L=1.0, a=1e-3, N=20, V0=1.0, nodos=None):
+        self.L = L
+        self.a = a
+        super().__init__([_nodos(nodos, L, N)], V0)
+        corto = self.anchos[0].min()
+        if corto < SEGMENTO_MINIMO * a * (1 - 1e-9):
+            raise ValueError(f"segmentos de {corto:.3g} m con radio {a:.3g} m: el núcleo reducido "
+                             f"necesita segmentos de al menos {SEGMENTO_MINIMO} radios")
+
+    def _nucleo(self, u1, u2):
+        return _integral_recta(u1, u2, self.a)
+
+
+class Cinta(_Conductor):
+    """Cinta de ancho W a una altura h sobre un plano de tierra, en el aire
+    y muy larga (2D), a potencial V0, en N tiras (o sobre los nodos dados).
+    La densidad es superficial (C/m²) y la capacitancia, por unidad de
+    longitud (F/m). La tierra se modela con la cinta imagen en -h."""
+
+    factor = 1 / (2 * np.pi * EPSILON_0)
+
+    def __init__(self, W=1e-3, h=1e-3, N=100, V0=1.0, nodos=None):
+        self.W = W
+        self.h = h
+        super().__init__([_nodos(nodos, W, N)], V0)
+
+    def _nucleo(self, u1, u2):
+        # ln(√(u² + 4h²) / |u|): cinta menos su imagen
+        b = 2 * self.h
+        return (_primitiva_log_imagen(u2, b) - _primitiva_log_imagen(u1, b)
+                - _primitiva_log(u2) + _primitiva_log(u1))
+
+
+class Placa(_Conductor):
+    """Placa delgada de lados a × b (m) a potencial V0, en nx × ny celdas (o
+    sobre los nodos dados en cada eje). Con una máscara (nx, ny) sólo las
+    celdas marcadas son conductor: cualquier forma dibujada sobre una malla
+    regular conserva la estructura de Toeplitz. La densidad es superficial
+    (C/m²) y el orden de los elementos es el de la malla (ij)."""
+
+    factor = 1 / (4 * np.pi * EPSILON_0)
+
+    def __init__(self, a=1.0, b=1.0, nx=20, ny=20, V0=1.0, nodos_x=None, nodos_y=None,
+                 mascara=None):
+        self.a = a
+        self.b = b
+        super().__init__([_nodos(nodos_x, a, nx), _nodos(nodos_y, b, ny)], V0, mascara)
+
+    def _nucleo(self, x1, x2, y1, y2):
+        return _integral_rectangulo(x1, x2, y1, y2)
+
+    def densidad_malla(self):
+        """Densidad con la forma (nx, ny) de la malla (NaN fuera de la máscara)."""
+        if self.densidad is None:
+            self.resolver()
+        if self.mascara is None:
+            return self.densidad.reshape(self.forma)
+        malla = np.full(self.forma, np.nan)
+        malla[self.mascara] = self.densidad
+        return malla
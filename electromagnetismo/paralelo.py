@@ -0,0 +1,95 @@
+"""Evaluación de la malla por teselas en un grupo de hilos o de procesos.
+
+La malla se divide siempre en las mismas teselas (su tamaño no depende del
+número de trabajadores) y cada tesela se evalúa con el mismo kernel, así
+que el resultado es idéntico bit a bit con 1 o con N trabajadores.
+
+Los kernels de NumPy liberan el GIL durante las operaciones sobre arreglos,
+por lo que los hilos suelen bastar; para kernels con mucho Python puro está
+la opción de procesos, que exige un kernel serializable con pickle (una
+función de módulo o un functools.partial, no una lambda).
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from electromagnetismo.teselas import aplanar
+
+# Número de trabajadores por defecto, configurable por entorno
+TRABAJADORES = int(os.environ.get("EM_TRABAJADORES", str(os.cpu_count() or 1)))
+
+# Puntos de la malla por tesela: fijo para que el resultado no dependa del
+# número de trabajadores
+PUNTOS_POR_TESELA = 65536
+
+_ejecutores = {}
+_candado = threading.Lock()
+
+
+def ejecutor(tipo="hilos", trabajadores=None):
+    """Grupo de trabajadores compartido del proceso ("hilos" o "procesos").
+    Se crea la primera vez que se pide con ese tipo y tamaño."""
+    trabajadores = TRABAJADORES if trabajadores is None else int(trabajadores)
+    if tipo not in ("hilos", "procesos"):
+        raise ValueError(f"Ejecutor desconocido: '{tipo}' (use 'hilos' o 'procesos')")
+    with _candado:
+        if (tipo, trabajadores) not in _ejecutores:
+            if tipo == "hilos":
+                grupo = ThreadPoolExecutor(max_workers=trabajadores,
+                                           thread_name_prefix="teselas")
+            else:
+                # Se importan aquí: multiprocessing alarga la importación del
+                # módulo y los procesos rara vez se usan
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # spawn: no se copia el estado del servidor (hilos, sockets)
+                grupo = ProcessPoolExecutor(
+                    max_workers=trabajadores, mp_context=multiprocessing.get_context("spawn"))
+            _ejecutores[(tipo, trabajadores)] = grupo
+        return _ejecutores[(tipo, trabajadores)]
+
+
+def cerrar_ejecutores():
+    """Detiene los grupos de trabajadores creados hasta ahora."""
+    with _candado:
+        for grupo in _ejecutores.values():
+            grupo.shutdown(wait=True)
+        _ejecutores.clear()
+
+
+def _evaluar_tesela(kernel, coordenadas):
+    return tuple(np.asarray(c) for c in kernel(*coordenadas))
+
+
+def evaluar_en_teselas(kernel, X, Y, Z=None, trabajadores=None, tipo="hilos",
+                       puntos_por_tesela=PUNTOS_POR_TESELA):
+    """Evalúa kernel(x, y) (o kernel(x, y, z) si se da Z) por teselas de la
+    malla y devuelve la tupla de resultados con la forma de X.
+
+    kernel recibe vectores 1D con las coordenadas de una tesela y devuelve
+    una tupla de arreglos del mismo largo (por ejemplo Ex, Ey, φ). Con
+    trabajadores=1 se evalúa en el hilo actual, con las mismas teselas.
+    """
+    forma, coordenadas = aplanar(X, Y, Z)
+    if Z is None:
+        coordenadas = coordenadas[:2]
+    n = coordenadas[0].size
+    trabajadores = TRABAJADORES if trabajadores is None else int(trabajadores)
+
+    teselas = [slice(a, a + puntos_por_tesela) for a in range(0, max(n, 1), puntos_por_tesela)]
+    argumentos = [[c[sl] if np.ndim(c) else np.full(len(range(*sl.indices(n))), c)
+                   for c in coordenadas] for sl in teselas]
+    if trabajadores <= 1 or len(teselas) == 1:
+        partes = [_evaluar_tesela(kernel, a) for a in argumentos]
+    else:
+        grupo = ejecutor(tipo, trabajadores)
+        partes = list(grupo.map(_evaluar_tesela, [kernel] * len(argumentos), argumentos))
+
+    resultado = [np.empty(n, dtype=c.dtype) for c in partes[0]]
+    for sl, parte in zip(teselas, partes):
+        for salida, valores in zip(resultado, parte):
+            salida[sl] = np.ravel(valores)
+    return tuple(r.reshape(forma) for r in resultado)
@@ -0,0 +1,170 @@
+"""Instrumentación de las ejecuciones de las páginas.
+
+Las páginas marcan sus etapas (malla, campo, figura, rasterizar, widgets,
+emitir) con `with tramo("campo"):`; cada duración se acumula en un
+histograma por (página, etapa) con cubetas fijas, como los histogramas de
+Prometheus, y una ventana de las últimas muestras para los percentiles.
+Todo es de proceso, así que agrega todas las sesiones del servidor.
+
+La instrumentación está apagada salvo que se defina EM_PERFIL=1, que la
+enciende en todo el proceso, o que una sesión la pida (?perfil=1): las
+páginas pasan entonces activo=True a fijar_pagina() y pagina(), y sólo se
+miden las ejecuciones de esa sesión. Apagada, tramo() devuelve un contexto
+nulo compartido y no mide nada. Con EM_PERFIL_ARCHIVO se vuelca el resumen periódicamente:
+en formato de texto de Prometheus si el archivo termina en .prom (para el
+textfile collector de node_exporter) o como líneas JSON en otro caso.
+"""
+import bisect
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+ACTIVO = os.environ.get("EM_PERFIL", "") not in ("", "0")
+ARCHIVO = os.environ.get("EM_PERFIL_ARCHIVO")
+
+# Límites superiores (s) de las cubetas de los histogramas
+CUBETAS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+           5.0, 10.0)
+
+# Muestras recientes por histograma para los percentiles
+VENTANA = 500
+
+# Segundos entre volcados a EM_PERFIL_ARCHIVO
+INTERVALO_VOLCADO = 10.0
+
+_NULO = contextlib.nullcontext()
+_pagina = contextvars.ContextVar("pagina", default="-")
+_sesion = contextvars.ContextVar("perfil_sesion", default=False)
+_histogramas = {}
+_candado = threading.Lock()
+_ultimo_volcado = 0.0
+
+
+class Histograma:
+    """Cubetas acumuladas desde el arranque y ventana de muestras recientes."""
+
+    def __init__(self):
+        self.cubetas = [0] * (len(CUBETAS) + 1)
+        self.suma = 0.0
+        self.recientes = deque(maxlen=VENTANA)
+
+    @property
+    def cuenta(self):
+        return sum(self.cubetas)
+
+    def registrar(self, segundos):
+        self.cubetas[bisect.bisect_left(CUBETAS, segundos)] += 1
+        self.suma += segundos
+        self.recientes.append(segundos)
+
+    def resumen(self):
+        recientes = np.fromiter(self.recientes, dtype=float)
+        p50, p95, p99 = np.percentile(recientes, [50, 95, 99]) * 1e3
+        return {"cuenta": self.cuenta, "suma_s": self.suma, "p50_ms": p50, "p95_ms": p95,
+                "p99_ms": p99, "max_ms": recientes.max() * 1e3}
+
+
+def fijar_pagina(nombre, activo=False):
+    """Página a la que se atribuyen los tramos del hilo actual (cada
+    ejecución de Streamlit corre en su propio hilo) y si la sesión que la
+    ejecuta pidió el perfil."""
+    _pagina.set(nombre)
+    _sesion.set(activo)
+
+
+@contextlib.contextmanager
+def pagina(nombre, activo=False):
+    """Como fijar_pagina, para un bloque o como decorador de un fragmento
+    (que se vuelve a ejecutar sin pasar por el inicio de la página)."""
+    token, token_sesion = _pagina.set(nombre), _sesion.set(activo)
+    try:
+        yield
+    finally:
+        _pagina.reset(token)
+        _sesion.reset(token_sesion)
+
+
+class _Tramo:
+    __slots__ = ("clave", "inicio")
+
+    def __init__(self, etapa):
+        self.clave = (_pagina.get(), etapa)
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *excepcion):
+        registrar(self.clave, time.perf_counter() - self.inicio)
+
+
+def tramo(etapa):
+    """Contexto que mide la duración de una etapa de la página actual."""
+    return _Tramo(etapa) if ACTIVO or _sesion.get() else _NULO
+
+
+def registrar(clave, segundos):
+    global _ultimo_volcado
+    with _candado:
+        histograma = _histogramas.get(clave)
+        if histograma is None:
+            histograma = _histogramas[clave] = Histograma()
+        histograma.registrar(segundos)
+        volcar = ARCHIVO and time.monotonic() - _ultimo_volcado > INTERVALO_VOLCADO
+        if volcar:
+            _ultimo_volcado = time.monotonic()
+    if volcar:
+        escribir(ARCHIVO)
+
+
+def resumen():
+    """Lista de diccionarios con página, etapa y estadísticas, ordenada."""
+    with _candado:
+        return [{"pagina": p, "etapa": e, **h.resumen()}
+                for (p, e), h in sorted(_histogramas.items())]
+
+
+def reiniciar():
+    with _candado:
+        _histogramas.clear()
+
+
+def exportar_jsonl():
+    """Una línea JSON por (página, etapa) con la marca de tiempo actual."""
+    marca = time.time()
+    return "".join(json.dumps({"tiempo": marca, **fila}, ensure_ascii=False) + "\n"
+                   for fila in resumen())
+
+
+def exportar_prometheus():
+    """Histogramas en el formato de texto de Prometheus."""
+    lineas = ["# HELP em_tramo_segundos Duración de las etapas de las páginas.",
+              "# TYPE em_tramo_segundos histogram"]
+    with _candado:
+        copia = [(clave, list(h.cubetas), h.suma) for clave, h in sorted(_histogramas.items())]
+    for (pagina_, etapa), cubetas, suma in copia:
+        etiquetas = f'pagina="{pagina_}",etapa="{etapa}"'
+        for limite, acumulado in zip((*CUBETAS, "+Inf"), itertools.accumulate(cubetas)):
+            lineas.append(f'em_tramo_segundos_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+        lineas.append(f"em_tramo_segundos_sum{{{etiquetas}}} {suma}")
+        lineas.append(f"em_tramo_segundos_count{{{etiquetas}}} {sum(cubetas)}")
+    return "\n".join(lineas) + "\n"
+
+
+def escribir(ruta):
+    """Vuelca el resumen a `ruta`: reemplaza el archivo .prom de una vez
+    (para que nunca se lea a medias) o agrega líneas JSON."""
+    if ruta.endswith(".prom"):
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            archivo.write(exportar_prometheus())
+        os.replace(temporal, ruta)
+    else:
+        with open(ruta, "a", encoding="utf-8") as archivo:
+            archivo.write(exportar_jsonl())
@@ -0,0 +1,112 @@
+"""Imágenes servidas por la propia aplicación.
+
+Las imágenes de Imagenes/ pesan de 0.5 a 1.8 MB y se muestran a 150-600 px
+de ancho. miniatura() las reduce una sola vez al ancho de pantalla (el
+doble, para pantallas de alta densidad) en WebP, o PNG si Pillow no trae
+WebP, y las guarda en static/img/ con un resumen del original en el nombre:
+si la imagen cambia, cambia el archivo. miniatura() devuelve la URL
+/app/static/img/... de ese archivo, que st.image pasa tal cual al navegador
+(sin volver a codificarla en JPEG como haría con una ruta local), y
+servidor.py agrega a esas respuestas encabezados de caché de larga
+duración.
+
+Las páginas no cargan fuentes externas ni piden una que la aplicación no
+sirva: usan la sans-serif del sistema, así que se ven igual con o sin
+internet.
+
+Uso:
+    python -m electromagnetismo.recursos            # genera las miniaturas
+"""
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+
+from PIL import Image, features
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGENES = os.path.join(RAIZ, "Imagenes")
+# Streamlit sirve static/ junto al script principal en /app/static
+# (server.enableStaticServing en .streamlit/config.toml)
+ESTATICO = os.path.join(RAIZ, "static")
+URL_ESTATICO = "/app/static"
+
+# Ancho en pantalla (px CSS) de cada imagen, tal como la muestran las páginas
+ANCHO_ENCABEZADO = 150
+ANCHO_LOGO = 300
+ANCHO_ILUSTRACION = 600
+ANCHOS = {
+    "Propela_logo.png": ANCHO_LOGO,
+    "Carga_Electrica.png": ANCHO_ENCABEZADO,
+    "Campo.png": ANCHO_ENCABEZADO,
+    "Distribucción.png": ANCHO_ENCABEZADO,
+    "Background (2).png": ANCHO_ILUSTRACION,
+    "Planos.png": ANCHO_ILUSTRACION,
+}
+
+# Píxeles de la miniatura por px CSS
+DENSIDAD = 2
+
+FORMATO = "WEBP" if features.check("webp") else "PNG"
+CALIDAD_WEBP = 85
+
+_candado = threading.Lock()
+_rutas = {}
+
+
+def miniatura(nombre, ancho=None):
+    """URL de la miniatura de Imagenes/<nombre> para mostrarla a `ancho`
+    px CSS (por defecto, el de ANCHOS); se genera la primera vez."""
+    ruta = archivo_miniatura(nombre, ancho)
+    return f"{URL_ESTATICO}/{os.path.relpath(ruta, ESTATICO).replace(os.sep, '/')}"
+
+
+def archivo_miniatura(nombre, ancho=None):
+    """Ruta en disco de la miniatura; ver miniatura()."""
+    ancho = ancho or ANCHOS[nombre]
+    original = os.path.join(IMAGENES, nombre)
+    # La ruta se recuerda mientras el original no cambie, para no volver a
+    # leerlo y resumirlo en cada ejecución de la página
+    clave = (nombre, ancho, os.stat(original).st_mtime_ns)
+    ruta = _rutas.get(clave)
+    if ruta is not None:
+        return ruta
+    with _candado:
+        with open(original, "rb") as archivo:
+            resumen = hashlib.sha256(archivo.read()).hexdigest()[:10]
+        # Nombre sólo con caracteres que no haya que escapar en la URL
+        base = unicodedata.normalize("NFKD", os.path.splitext(nombre)[0])
+        base = re.sub(r"[^A-Za-z0-9_-]+", "_", base.encode("ascii", "ignore").decode()).strip("_")
+        ruta = os.path.join(ESTATICO, "img", f"{base}-{ancho}w.{resumen}.{FORMATO.lower()}")
+        if not os.path.exists(ruta):
+            _reducir(original, ruta, ancho * DENSIDAD)
+        _rutas[clave] = ruta
+    return ruta
+
+
+def _reducir(original, ruta, pixeles):
+    with Image.open(original) as imagen:
+        if imagen.width > pixeles:
+            alto = round(imagen.height * pixeles / imagen.width)
+            imagen = imagen.resize((pixeles, alto), Image.LANCZOS)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        # Se escribe a un temporal y se renombra: otra sesión nunca lee el
+        # archivo a medias
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        if FORMATO == "WEBP":
+            imagen.save(temporal, "WEBP", quality=CALIDAD_WEBP, method=6)
+        else:
+            imagen.save(temporal, "PNG", optimize=True)
+        os.replace(temporal, ruta)
+
+
+def main():
+    for nombre in ANCHOS:
+        ruta = archivo_miniatura(nombre)
+        print(f"{nombre}: {os.path.getsize(os.path.join(IMAGENES, nombre)) / 1024:.0f} kB -> "
+              f"{os.path.relpath(ruta, RAIZ)} {os.path.getsize(ruta) / 1024:.0f} kB")
+
+
+if __name__ == "__main__":
+    main()
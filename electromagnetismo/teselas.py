@@ -0,0 +1,59 @@
+"""Tamaño de las teselas de evaluación según un presupuesto de memoria.
+
+Los kernels recorren la malla por teselas de puntos y las fuentes por
+bloques, de modo que los temporales (bloque × tesela) nunca ocupan más que
+el presupuesto. Los únicos arreglos del tamaño de la malla son los de
+salida; con dtype=np.float32 ocupan la mitad.
+"""
+import os
+
+import numpy as np
+
+# Presupuesto por defecto para los temporales de una evaluación, configurable
+# por entorno. El valor por defecto mantiene los bloques dentro de la caché
+# del procesador, que es además lo más rápido.
+MEMORIA_BLOQUE_MB = float(os.environ.get("EM_BLOQUE_MB", "2"))
+
+
+def presupuesto(memoria=None):
+    """Presupuesto en bytes: `memoria` si se da, si no EM_BLOQUE_MB."""
+    return int(MEMORIA_BLOQUE_MB * 2**20 if memoria is None else memoria)
+
+
+def dimensionar(n_puntos, n_fuentes, bytes_por_par, memoria=None,
+                tesela_max=4096, bloque_max=None, bytes_por_punto=0):
+    """Devuelve (tesela, bloque): puntos por tesela y fuentes por bloque
+    tales que tesela × (bloque × bytes_por_par + bytes_por_punto) no supera
+    el presupuesto. Siempre se usa al menos un punto y una fuente."""
+    memoria = presupuesto(memoria)
+    tesela = max(1, min(n_puntos, tesela_max,
+                        memoria // (bytes_por_par + bytes_por_punto)))
+    bloque = max(1, min(n_fuentes, (memoria // tesela - bytes_por_punto) // bytes_por_par))
+    if bloque_max is not None:
+        bloque = min(bloque, bloque_max)
+    return int(tesela), int(bloque)
+
+
+def tipo_salida(dtype):
+    """Valida el tipo de los arreglos de salida (float64 o float32)."""
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float64, np.float32):
+        raise ValueError(f"dtype debe ser float64 o float32, no {dtype}")
+    return dtype
+
+
+def aplanar(X, Y, Z=None):
+    """Coordenadas de la malla como vectores planos (vistas si la malla es
+    contigua). Un Z escalar o ausente se deja como escalar para no crear un
+    arreglo del tamaño de la malla. Devuelve (forma, [x, y, z])."""
+    X = np.asarray(X)
+    z = 0.0 if Z is None else \
+        np.broadcast_to(np.asarray(Z), X.shape).ravel() if np.ndim(Z) else float(Z)
+    return X.shape, [X.ravel(), np.asarray(Y).ravel(), z]
+
+
+def puntos_tesela(coordenadas, sl, n_puntos):
+    """Arreglo (n, 3) en float64 con los puntos de la tesela `sl`."""
+    n = len(range(*sl.indices(n_puntos)))
+    return np.column_stack([np.asarray(c[sl], dtype=float) if np.ndim(c) else np.full(n, c)
+                            for c in coordenadas])
@@ -0,0 +1,305 @@
+"""FDTD en 2D (modos TM y TE) y 3D sobre la malla de Yee, con capas CPML.
+
+Cada componente activa de E y H es un arreglo (nx, ny, nz) en orden C;
+en 2D nz = 1 y sólo se reservan las componentes del modo: TMz usa Ez, Hx,
+Hy y TEz usa Hz, Ex, Ey. Como en la celda de Yee del cuaderno, las
+componentes están desplazadas media celda entre sí, pero se guardan con el
+mismo índice (i, j, k): E_x[i, j, k] está en (i + ½, j, k), H_x[i, j, k] en
+(i, j + ½, k + ½), etc. La malla termina en paredes conductoras perfectas
+en los nodos 0 y n - 1 de cada eje, detrás de las capas absorbentes.
+
+El rotacional se calcula por losas de planos x contiguos, del tamaño que
+fija EM_BLOQUE_MB: cada losa recorre los campos en orden de memoria y los
+temporales caben en la caché, así que el costo por celda no crece con la
+malla. Las capas CPML (Roden y Gedney, 2000) sólo guardan sus variables
+auxiliares ψ en las capas, no en toda la malla, y se corrigen aparte
+después de cada actualización.
+
+Las fuentes son tuplas (componente, región, onda), donde la región indexa
+el arreglo de la componente y onda(t) da la amplitud en el paso t (por
+ejemplo fdtd.pulso_gaussiano). Se suman al campo (fuentes suaves).
+"""
+import numpy as np
+
+from electromagnetismo.fdtd import C0, EPSILON_0
+from electromagnetismo.teselas import presupuesto
+
+MU_0 = 4e-7 * np.pi  # H/m
+ETA_0 = np.sqrt(MU_0 / EPSILON_0)
+
+EJES = "xyz"
+
+# Componentes de cada modo: (eléctricas, magnéticas)
+MODOS = {"TM": ("z", "xy"), "TE": ("xy", "z"), "3D": ("xyz", "xyz")}
+
+
+def fuente_puntual(componente, posicion, onda):
+    """Fuente en una celda (i, j) o (i, j, k)."""
+    return componente, tuple(posicion) + (0,) * (3 - len(posicion)), onda
+
+
+def fuente_linea(componente, eje, posicion, onda):
+    """Fuente a lo largo de toda la malla en la dirección `eje`, pasando por
+    la celda `posicion` (sus índices en los otros dos ejes, en orden)."""
+    indices = list(posicion) + [0] * (2 - len(posicion))
+    region = [slice(None) if e == eje else indices.pop(0) for e in EJES]
+    return componente, tuple(region), onda
+
+
+def onda_plana(componente, eje, indice, onda):
+    """Lámina de corriente en el plano perpendicular a `eje` que pasa por
+    `indice`: emite una onda plana hacia cada lado. La onda debe tener
+    promedio nulo (fdtd.derivada_gaussiana, fdtd.senoidal): si no, la
+    corriente deja carga en las paredes y un campo estático."""
+    return componente, tuple(indice if e == eje else slice(None) for e in EJES), onda
+
+
+def _desplazar(region, eje, d):
+    region = list(region)
+    s = region[eje]
+    region[eje] = slice(s.start + d, s.stop + d)
+    return tuple(region)
+
+
+def _recortar(region, eje, inicio, fin):
+    region = list(region)
+    s = region[eje]
+    region[eje] = slice(max(s.start, inicio), min(s.stop, fin))
+    return tuple(region)
+
+
+def _perfil_cpml(n, capas, dx, dt, en_medio, kappa_max, alfa_max, orden=3):
+    """Coeficientes (b, c, 1/κ - 1) de la CPML a lo largo de un eje de n
+    celdas, en los nodos enteros (E) o en los intermedios (H)."""
+    i = np.arange(n) + (0.5 if en_medio else 0.0)
+    bajo = (capas - i) / capas
+    alto = (i - (n - 1 - capas)) / capas
+    rho = np.clip(np.maximum(bajo, alto), 0, 1)
+    sigma = 0.8 * (orden + 1) / (ETA_0 * dx) * rho**orden
+    kappa = 1 + (kappa_max - 1) * rho**orden
+    alfa = alfa_max * (1 - rho) * (rho > 0)
+    b = np.exp(-(sigma / kappa + alfa) * dt / EPSILON_0)
+    denominador = kappa * (sigma + kappa * alfa)
+    c = np.divide(sigma * (b - 1), denominador, out=np.zeros(n), where=denominador > 0)
+    return b, c, 1 / kappa - 1
+
+
+class Yee:
+    """Malla de Yee de forma (nx, ny) con modo "TM" o "TE", o (nx, ny, nz).
+
+    dx es el lado de la celda (m); el paso de tiempo es courant veces el
+    límite de estabilidad. epsilon_r y sigma (S/m) son escalares o arreglos
+    de la forma de la malla. capas es el espesor de la CPML en celdas, el
+    mismo en todos los ejes o uno por eje (0 para paredes conductoras; una
+    onda plana TE entre dos paredes paralelas a su dirección es exacta).
+    """
+
+    def __init__(self, forma, dx=0.01, modo=None, epsilon_r=1.0, sigma=0.0, capas=10,
+                 courant=0.99, kappa_max=5.0, alfa_max=0.05, dtype=np.float32,
+                 memoria=None):
+        forma = tuple(forma)
+        if len(forma) == 2:
+            if modo not in ("TM", "TE"):
+                raise ValueError('una malla 2D necesita modo="TM" o modo="TE"')
+            forma += (1,)
+        elif len(forma) == 3:
+            modo = "3D"
+        else:
+            raise ValueError(f"la malla debe ser 2D o 3D, no {forma}")
+        self.forma = forma
+        self.modo = modo
+        self.dx = dx
+        dimensiones = sum(n > 1 for n in forma)
+        self.dt = courant * dx / (C0 * np.sqrt(dimensiones))
+        self.capas = tuple(capas) + (0,) * (3 - len(capas)) if np.ndim(capas) else (capas,) * 3
+        self.t = 0
+        self.fuentes = []
+
+        componentes_e, componentes_h = MODOS[modo]
+        self.E = {c: np.zeros(forma, dtype=dtype) for c in componentes_e}
+        self.H = {c: np.zeros(forma, dtype=dtype) for c in componentes_h}
+
+        # Coeficientes: E = ca E + cb ΔH, H = H - ch ΔE (Δ: diferencias de
+        # una celda); escalares si el medio es homogéneo
+        epsilon = EPSILON_0 * np.asarray(epsilon_r, dtype=float)
+        perdida = np.asarray(sigma, dtype=float) * self.dt / (2 * epsilon)
+        self.ca = self._coeficiente((1 - perdida) / (1 + perdida), dtype)
+        self.cb = self._coeficiente(self.dt / (epsilon * dx * (1 + perdida)), dtype)
+        self.ch = self.dt / (MU_0 * dx)
+        self._perdidas = bool(np.any(self.ca != 1))
+
+        # Planos x por losa: el acumulador y el temporal caben en el presupuesto
+        plano = forma[1] * forma[2] * np.dtype(dtype).itemsize
+        self.losa = max(1, min(forma[0], presupuesto(memoria) // (2 * plano)))
+        self._acumulador = np.empty((self.losa,) + forma[1:], dtype=dtype)
+        self._temporal = np.empty_like(self._acumulador)
+
+        self._terminos_e = self._terminos(self.E, self.H, -1)
+        self._terminos_h = self._terminos(self.H, self.E, +1)
+        self._pml_h = self._cpml(self._terminos_h, -self.ch, True, kappa_max, alfa_max, dtype)
+        self._pml_e = self._cpml(self._terminos_e, self.cb, False, kappa_max, alfa_max, dtype)
+        # Temporales de las correcciones CPML, del tamaño de la capa más grande
+        mayor = max((psi.size for *_, psi, _, _, _, _ in self._pml_h + self._pml_e), default=0)
+        self._delta = np.empty(mayor, dtype=dtype)
+        self._producto = np.empty(mayor, dtype=dtype)
+
+    def _coeficiente(self, valor, dtype):
+        valor = np.asarray(valor)
+        if valor.ndim == 0:
+            return float(valor)
+        # Un perfil 2D (nx, ny) se extiende al eje z de un solo plano
+        valor = valor.reshape(valor.shape + (1,) * (3 - valor.ndim))
+        return np.ascontiguousarray(np.broadcast_to(valor, self.forma), dtype=dtype)
+
+    def _terminos(self, destino, origen, desplazamiento):
+        """Por componente de `destino`: su región actualizable y los términos
+        (eje, componente de origen, signo) de su rotacional. E usa
+        diferencias hacia atrás (desplazamiento -1) y H hacia adelante."""
+        terminos = {}
+        for c in destino:
+            i = EJES.index(c)
+            # Las paredes están en los nodos 0 y n - 1 de cada eje: allí E
+            # tangencial y H normal son nulos, y lo que queda fuera no se
+            # actualiza (E_c y H_o, o ≠ c, están a media celda de los nodos
+            # en los ejes c y o, respectivamente)
+            region = []
+            for eje, n in enumerate(self.forma):
+                if n == 1:
+                    region.append(slice(0, 1))
+                elif (eje == i) == (desplazamiento < 0):
+                    region.append(slice(0, n - 1))
+                else:
+                    region.append(slice(1, n - 1))
+            lista = []
+            # rot_c F = ∂F_o/∂a - ∂F_a/∂o con (c, a, o) en orden cíclico
+            for eje, otra, signo in ((EJES[(i + 1) % 3], EJES[(i + 2) % 3], 1),
+                                     (EJES[(i + 2) % 3], EJES[(i + 1) % 3], -1)):
+                a = EJES.index(eje)
+                if otra in origen and self.forma[a] > 1:
+                    lista.append((a, otra, signo))
+            terminos[c] = (tuple(region), lista)
+        return terminos
+
+    def _cpml(self, terminos, escala, en_medio, kappa_max, alfa_max, dtype):
+        """Variables ψ y coeficientes de la CPML para cada término y extremo:
+        el campo recibe signo · escala · ((1/κ - 1) Δ + ψ) en la capa."""
+        pml = []
+        for c, (region, lista) in terminos.items():
+            for a, otra, signo in lista:
+                n, capas = self.forma[a], self.capas[a]
+                if capas <= 0:
+                    continue
+                b, cc, kappa = _perfil_cpml(n, capas, self.dx, self.dt, en_medio,
+                                            kappa_max, alfa_max)
+                forma_perfil = [1, 1, 1]
+                for inicio, fin in ((0, capas), (n - capas, n)):
+                    sub = _recortar(region, a, inicio, fin)
+                    indices = sub[a]
+                    forma_perfil[a] = indices.stop - indices.start
+                    coeficientes = [np.asarray(v[indices], dtype=dtype).reshape(forma_perfil)
+                                    for v in (b, cc, kappa)]
+                    psi = np.zeros(tuple(s.stop - s.start for s in sub), dtype=dtype)
+                    factor = signo * (escala if np.ndim(escala) == 0 else escala[sub])
+                    pml.append((c, a, otra, sub, psi, *coeficientes, factor))
+        return pml
+
+    def _actualizar(self, destino, origen, terminos, desplazamiento, escala, factor):
+        """destino += escala · factor · Σ signo Δ_a origen, losa por losa."""
+        d = 1 if desplazamiento > 0 else -1
+        for c, (region, lista) in terminos.items():
+            if not lista:
+                continue
+            campo = destino[c]
+            x = region[0]
+            for x0 in range(x.start, x.stop, self.losa):
+                x1 = min(x0 + self.losa, x.stop)
+                losa = (slice(x0, x1),) + region[1:]
+                acumulador = self._acumulador[(slice(0, x1 - x0),) + region[1:]]
+                temporal = self._temporal[(slice(0, x1 - x0),) + region[1:]]
+                for n, (a, otra, signo) in enumerate(lista):
+                    F = origen[otra]
+                    vecino = _desplazar(losa, a, d)
+                    # Diferencia F[i] - F[i - 1] (E) o F[i + 1] - F[i] (H)
+                    pares = (F[losa], F[vecino]) if d < 0 else (F[vecino], F[losa])
+                    if signo < 0:
+                        pares = pares[::-1]
+                    np.subtract(*pares, out=acumulador if n == 0 else temporal)
+                    if n:
+                        acumulador += temporal
+                acumulador *= escala if np.ndim(escala) == 0 else escala[losa]
+                if factor is not None and np.ndim(factor):
+                    campo[losa] *= factor[losa]
+                elif factor is not None and factor != 1:
+                    campo[losa] *= factor
+                campo[losa] += acumulador
+
+    def _corregir_cpml(self, destino, origen, pml, desplazamiento):
+        d = 1 if desplazamiento > 0 else -1
+        for c, a, otra, region, psi, b, cc, kappa, factor in pml:
+            F = origen[otra]
+            vecino = _desplazar(region, a, d)
+            delta = self._delta[:psi.size].reshape(psi.shape)
+            producto = self._producto[:psi.size].reshape(psi.shape)
+            np.subtract(*((F[vecino], F[region]) if d > 0 else (F[region], F[vecino])),
+                        out=delta)
+            psi *= b
+            np.multiply(cc, delta, out=producto)
+            psi += producto
+            delta *= kappa
+            delta += psi
+            delta *= factor
+            destino[c][region] += delta
+
+    def paso(self):
+        """Un paso de tiempo: H, E (con sus correcciones CPML) y fuentes."""
+        self._actualizar(self.H, self.E, self._terminos_h, 1, -self.ch, None)
+        self._corregir_cpml(self.H, self.E, self._pml_h, 1)
+        self._actualizar(self.E, self.H, self._terminos_e, -1, self.cb,
+                         self.ca if self._perdidas else None)
+        self._corregir_cpml(self.E, self.H, self._pml_e, -1)
+        for componente, region, onda in self.fuentes:
+            campo = self.E if componente[0] == "E" else self.H
+            campo[componente[1].lower()][region] += onda(self.t)
+        self.t += 1
+
+    def campo(self, nombre):
+        """Componente por nombre, p. ej. "Ez" o "Hx"."""
+        return (self.E if nombre[0] == "E" else self.H)[nombre[1].lower()]
+
+    def avanzar(self, pasos, cada=0, campos=(), escritor=None):
+        """Da `pasos` pasos. Con cada > 0 devuelve (tiempos, instantáneas):
+        por cada nombre de `campos` ("Ez", "Hx", ...) un arreglo
+        (n_instantáneas, nx, ny, nz) con la componente tras cada `cada` pasos.
+        Con un escritor (instantaneas.EscritorInstantaneas) las instantáneas
+        se le entregan, cada `cada` pasos o cada escritor.cada, y no se
+        guardan en memoria: así caben corridas largas de mallas grandes."""
+        if escritor is not None:
+            cada = cada or escritor.cada
+            for _ in range(pasos // cada):
+                for _ in range(cada):
+                    self.paso()
+                escritor.agregar(self.t, {nombre: self.campo(nombre) for nombre in campos})
+            for _ in range(pasos % cada):
+                self.paso()
+            return None
+        if cada <= 0:
+            for _ in range(pasos):
+                self.paso()
+            return None
+        n = pasos // cada
+        tiempos = np.empty(n, dtype=int)
+        instantaneas = {nombre: np.empty((n,) + self.forma, dtype=self.campo(nombre).dtype)
+                        for nombre in campos}
+        for i in range(n):
+            for _ in range(cada):
+                self.paso()
+            tiempos[i] = self.t
+            for nombre, destino in instantaneas.items():
+                destino[i] = self.campo(nombre)
+        for _ in range(pasos - n * cada):
+            self.paso()
+        return tiempos, instantaneas
+
+    @property
+    def celdas(self):
+        return int(np.prod(self.forma))
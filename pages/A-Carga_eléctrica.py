@@ -1,28 +1,35 @@
 
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
-import math
 
-
-st.sidebar.image(
-    "https://raw.githubusercontent.com/Jmontoyaor/Computational-electromagnetics/main/Imagenes/Propela_logo.png",
-    use_container_width=True
-)
+from electromagnetismo.almacen import almacen_compartido
+from electromagnetismo.cache import obtener_cache
+from electromagnetismo import perfil
+from electromagnetismo.electrostatica import calcular_distancia
+from electromagnetismo.escenarios import (
+    RANGO_COORDENADA_A, clave_A, figura_A_distancias, figura_A_ubicacion, lienzo_A_distancias,
+    lienzo_A_ubicacion, puntos_por_defecto)
+from electromagnetismo.recursos import ANCHO_ENCABEZADO, miniatura
+
+# Instrumentación opcional de las etapas de la página: ?perfil=1 la activa sólo
+# en esta sesión (EM_PERFIL=1, en todo el proceso)
+if st.query_params.get("perfil") == "1":
+    st.session_state["perfil"] = True
+perfil_sesion = st.session_state.get("perfil", False)
+perfil.fijar_pagina("A", perfil_sesion)
+
+st.sidebar.image(miniatura("Propela_logo.png"), width="stretch")
 # --- Estilos CSS Personalizados ---
 custom_css = """
 <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;700&display=swap');
-
     .stApp {
         background-color: #0e1a40; /* Fondo de la app */
         color: #E0E0E0; /* Texto principal */
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     h1, h2, h3 {
         color: #00BFFF; /* Títulos */
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     /* --- INICIO DE LA CORRECCIÓN --- */
@@ -74,8 +81,8 @@ st.markdown(custom_css, unsafe_allow_html=True)
 col_img, col_title = st.columns([0.3, 1])
 
 with col_img:
-    # URL corregida para mostrar la imagen directamente desde GitHub
-    st.image("https://raw.githubusercontent.com/Jmontoyaor/Computational-electromagnetics/main/Imagenes/Carga_Electrica.png", width=150)
+    # Miniatura local a la medida en que se muestra (electromagnetismo.recursos)
+    st.image(miniatura("Carga_Electrica.png"), width=ANCHO_ENCABEZADO)
 
 with col_title:
     st.title("Carga Eléctrica")
@@ -112,9 +119,8 @@ Estos marcos de referencia permiten estudiar trayectorias, posiciones y movimien
 col1, col2, col3 = st.columns([1, 2, 1])  # Proporción para centrar la imagen
 with col2:
     st.image(
-        # Esta es la nueva URL de la imagen de los planos
-        "https://github.com/Jmontoyaor/Computational-electromagnetics/blob/main/Imagenes/Planos.png?raw=true",
-        use_container_width=True,
+        miniatura("Planos.png"),
+        width="stretch",
         # Pie de foto actualizado para la nueva imagen
         caption="Ilustración de los planos de coordenadas"
     )
@@ -150,154 +156,133 @@ with st.expander("Ver Enunciado del Ejercicio 2.1 - Distancias entre Partículas
 # (El código anterior: CSS, Título y Sección Teórica permanece igual)
 # ...
 
-# --- PARÁMETROS DE ENTRADA (AHORA EN LA PÁGINA PRINCIPAL) ---
-st.header("Parámetros de Entrada")
-st.markdown("Define las coordenadas para cada punto usando los sliders.")
-
-# Crear tres columnas para los controles
-col_a, col_b, col_c = st.columns(3)
-
-# Entradas para el Punto A en la primera columna
-with col_a:
-    st.subheader("Punto A")
-    ax_coord = st.slider('Coordenada X de A', min_value=-10.0,
-                         max_value=10.0, value=2.0, step=0.1, format="%.2f", key="ax")
-    ay_coord = st.slider('Coordenada Y de A', min_value=-10.0,
-                         max_value=10.0, value=1.5, step=0.1, format="%.2f", key="ay")
-A = (ax_coord, ay_coord)
-
-# Entradas para el Punto B en la segunda columna
-with col_b:
-    st.subheader("Punto B")
-    bx_coord = st.slider('Coordenada X de B', min_value=-10.0,
-                         max_value=10.0, value=-3.0, step=0.1, format="%.2f", key="bx")
-    by_coord = st.slider('Coordenada Y de B', min_value=-10.0,
-                         max_value=10.0, value=1.5, step=0.1, format="%.2f", key="by")
-B = (bx_coord, by_coord)
-
-# Entradas para el Punto C en la tercera columna
-with col_c:
-    st.subheader("Punto C")
-    cx_coord = st.slider('Coordenada X de C', min_value=-10.0,
-                         max_value=10.0, value=-2.0, step=0.1, format="%.2f", key="cx")
-    cy_coord = st.slider('Coordenada Y de C', min_value=-10.0,
-                         max_value=10.0, value=-3.0, step=0.1, format="%.2f", key="cy")
-C = (cx_coord, cy_coord)
-
-
-# --- CÁLCULOS ---
-# (El resto del código: Cálculos, Visualización, etc. permanece igual)
-# ...
-# --- CÁLCULOS ---
-# Función para calcular la distancia euclidiana
-def calcular_distancia(p1, p2):
-    return math.sqrt((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)
-
-
-# Calcular distancias
-dist_AB = calcular_distancia(A, B)
-dist_AC = calcular_distancia(A, C)
-dist_BC = calcular_distancia(B, C)
-
-# --- VISUALIZACIÓN GRÁFICA ---
-st.header("📊 Visualización Gráfica")
-col1, col2 = st.columns(2)
-
-# Determinar límites dinámicos para los gráficos para que siempre se vean bien
-all_x = [A[0], B[0], C[0], 0]
-all_y = [A[1], B[1], C[1], 0]
-x_min, x_max = min(all_x) - 1, max(all_x) + 1
-y_min, y_max = min(all_y) - 1, max(all_y) + 1
-
-# Gráfico 1: Ubicación de puntos
-with col1:
-    st.subheader("a. Ubicación de puntos")
-    fig1, ax1 = plt.subplots(figsize=(6, 5))
-    ax1.set_xlim(x_min, x_max)
-    ax1.set_ylim(y_min, y_max)
-    ax1.grid(True, alpha=0.3)
-    ax1.axhline(y=0, color='k', linewidth=0.8)
-    ax1.axvline(x=0, color='k', linewidth=0.8)
-
-    # Plotear y anotar puntos
-    for point, name in [(A, 'A'), (B, 'B'), (C, 'C')]:
-        ax1.plot(point[0], point[1], 'ro', markersize=6)
-        ax1.annotate(f'{name}=({point[0]:.2f}, {point[1]:.2f})', xy=point, xytext=(
-            point[0] + 0.1, point[1] + 0.1), fontsize=9, color='red')
-        ax1.plot([point[0], point[0]], [0, point[1]],
-                 'k--', alpha=0.5, linewidth=0.8)
-        ax1.plot([0, point[0]], [point[1], point[1]],
-                 'k--', alpha=0.5, linewidth=0.8)
-
-    ax1.set_xlabel('Eje X')
-    ax1.set_ylabel('Eje Y')
-    ax1.set_title('Ubicación en el Plano Cartesiano')
-    st.pyplot(fig1)
-
-# Gráfico 2: Trazo de distancias
-with col2:
-    st.subheader("b. Trazo de distancias")
-    fig2, ax2 = plt.subplots(figsize=(6, 5))
-    ax2.set_xlim(x_min, x_max)
-    ax2.set_ylim(y_min, y_max)
-    ax2.grid(True, alpha=0.3)
-    ax2.axhline(y=0, color='k', linewidth=0.8)
-    ax2.axvline(x=0, color='k', linewidth=0.8)
-
-    # Plotear puntos y anotar
-    for point, name in [(A, 'A'), (B, 'B'), (C, 'C')]:
-        ax2.plot(point[0], point[1], 'ro', markersize=6)
-        ax2.annotate(f'{name}=({point[0]:.2f}, {point[1]:.2f})', xy=point, xytext=(
-            point[0] + 0.1, point[1] + 0.1), fontsize=9, color='red')
-
-    # Dibujar las líneas de distancia
-    ax2.plot([A[0], B[0]], [A[1], B[1]], 'b-',
-             linewidth=2, label=f'AB = {dist_AB:.2f}')
-    ax2.plot([A[0], C[0]], [A[1], C[1]], 'g-',
-             linewidth=2, label=f'AC = {dist_AC:.2f}')
-    ax2.plot([B[0], C[0]], [B[1], C[1]], 'm-',
-             linewidth=2, label=f'BC = {dist_BC:.2f}')
-    ax2.legend()
-
-    ax2.set_xlabel('Eje X')
-    ax2.set_ylabel('Eje Y')
-    ax2.set_title('Distancias entre Puntos')
-    st.pyplot(fig2)
-
-# --- CÁLCULOS DETALLADOS ---
-st.header("Cálculos de Distancias")
-st.markdown("A continuación se muestra el cálculo paso a paso para cada distancia, utilizando la fórmula de la distancia euclidiana:")
-st.latex(r"d = \sqrt{(x_2 - x_1)^2 + (y_2 - y_1)^2}")
-
-with st.expander("Distancia AB"):
-    st.latex(
-        fr"d(A,B) = \sqrt{{({B[0]:.2f} - {A[0]:.2f})^2 + ({B[1]:.2f} - {A[1]:.2f})^2}}")
-    st.latex(
-        fr"d(A,B) = \sqrt{{({B[0] - A[0]:.2f})^2 + ({B[1] - A[1]:.2f})^2}}")
-    st.latex(
-        fr"d(A,B) = \sqrt{{{(B[0] - A[0])**2:.2f} + {(B[1] - A[1])**2:.2f} }}")
-    st.latex(fr"d(A,B) = \sqrt{{{(B[0] - A[0])**2 + (B[1] - A[1])**2:.2f} }}")
-    st.success(f"**Distancia AB = {dist_AB:.2f}**")
-
-with st.expander("Distancia AC"):
-    st.latex(
-        fr"d(A,C) = \sqrt{{({C[0]:.2f} - {A[0]:.2f})^2 + ({C[1]:.2f} - {A[1]:.2f})^2}}")
-    st.latex(
-        fr"d(A,C) = \sqrt{{({C[0] - A[0]:.2f})^2 + ({C[1] - A[1]:.2f})^2}}")
-    st.latex(
-        fr"d(A,C) = \sqrt{{{(C[0] - A[0])**2:.2f} + {(C[1] - A[1])**2:.2f} }}")
-    st.latex(fr"d(A,C) = \sqrt{{{(C[0] - A[0])**2 + (C[1] - A[1])**2:.2f} }}")
-    st.success(f"**Distancia AC = {dist_AC:.2f}**")
-
-with st.expander("Distancia BC"):
-    st.latex(
-        fr"d(B,C) = \sqrt{{({C[0]:.2f} - {B[0]:.2f})^2 + ({C[1]:.2f} - {B[1]:.2f})^2}}")
-    st.latex(
-        fr"d(B,C) = \sqrt{{({C[0] - B[0]:.2f})^2 + ({C[1] - B[1]:.2f})^2}}")
-    st.latex(
-        fr"d(B,C) = \sqrt{{{(C[0] - B[0])**2:.2f} + {(C[1] - B[1])**2:.2f} }}")
-    st.latex(fr"d(B,C) = \sqrt{{{(C[0] - B[0])**2 + (C[1] - B[1])**2:.2f} }}")
-    st.success(f"**Distancia BC = {dist_BC:.2f}**")
+# --- GRÁFICOS ---
+# Cada sesión conserva sus dos figuras y en cada ejecución sólo cambia los
+# datos de sus artistas (puntos, rótulos, segmentos y límites)
+def lienzo_sesion(nombre, crear):
+    if nombre not in st.session_state:
+        st.session_state[nombre] = crear()
+    return st.session_state[nombre]
+
+
+# Las figuras se guardan como PNG por posición de los puntos en la caché
+# compartida: sólo se dibujan de nuevo cuando cambia algún punto
+almacen = almacen_compartido()
+cache_figuras = obtener_cache("figuras", respaldo=almacen)
+
+
+# Los controles, las figuras y los cálculos paso a paso forman un fragmento:
+# al mover un slider no se vuelven a emitir la teoría, el CSS ni las imágenes.
+# Los cambios que llegan mientras el fragmento se ejecuta se agrupan en una
+# sola nueva ejecución con los valores más recientes.
+@st.fragment
+@perfil.pagina("A", perfil_sesion)
+def ejercicio():
+    # --- PARÁMETROS DE ENTRADA (AHORA EN LA PÁGINA PRINCIPAL) ---
+    st.header("Parámetros de Entrada")
+    st.markdown("Define las coordenadas para cada punto usando los sliders.")
+
+    # Crear tres columnas para los controles
+    with perfil.tramo("widgets"):
+        col_a, col_b, col_c = st.columns(3)
+        c_min, c_max, c_paso = RANGO_COORDENADA_A
+        (ax0, ay0), (bx0, by0), (cx0, cy0) = puntos_por_defecto()
+
+        # Entradas para el Punto A en la primera columna
+        with col_a:
+            st.subheader("Punto A")
+            ax_coord = st.slider('Coordenada X de A', min_value=c_min, max_value=c_max,
+                                 value=ax0, step=c_paso, format="%.2f", key="ax")
+            ay_coord = st.slider('Coordenada Y de A', min_value=c_min, max_value=c_max,
+                                 value=ay0, step=c_paso, format="%.2f", key="ay")
+        A = (ax_coord, ay_coord)
+
+        # Entradas para el Punto B en la segunda columna
+        with col_b:
+            st.subheader("Punto B")
+            bx_coord = st.slider('Coordenada X de B', min_value=c_min, max_value=c_max,
+                                 value=bx0, step=c_paso, format="%.2f", key="bx")
+            by_coord = st.slider('Coordenada Y de B', min_value=c_min, max_value=c_max,
+                                 value=by0, step=c_paso, format="%.2f", key="by")
+        B = (bx_coord, by_coord)
+
+        # Entradas para el Punto C en la tercera columna
+        with col_c:
+            st.subheader("Punto C")
+            cx_coord = st.slider('Coordenada X de C', min_value=c_min, max_value=c_max,
+                                 value=cx0, step=c_paso, format="%.2f", key="cx")
+            cy_coord = st.slider('Coordenada Y de C', min_value=c_min, max_value=c_max,
+                                 value=cy0, step=c_paso, format="%.2f", key="cy")
+        C = (cx_coord, cy_coord)
+
+    # --- CÁLCULOS ---
+    # Calcular distancias
+    with perfil.tramo("campo"):
+        dist_AB = calcular_distancia(A, B)
+        dist_AC = calcular_distancia(A, C)
+        dist_BC = calcular_distancia(B, C)
+
+    # --- VISUALIZACIÓN GRÁFICA ---
+    st.header("📊 Visualización Gráfica")
+    col1, col2 = st.columns(2)
+
+    # Gráfico 1: Ubicación de puntos
+    with col1:
+        st.subheader("a. Ubicación de puntos")
+        png = cache_figuras.obtener_o_calcular(
+            clave_A("ubicacion", A, B, C),
+            lambda: figura_A_ubicacion(
+                A, B, C, lienzo=lienzo_sesion("lienzo_ubicacion", lienzo_A_ubicacion)))
+        with perfil.tramo("emitir"):
+            st.image(png, width="stretch")
+
+    # Gráfico 2: Trazo de distancias
+    with col2:
+        st.subheader("b. Trazo de distancias")
+        png = cache_figuras.obtener_o_calcular(
+            clave_A("distancias", A, B, C),
+            lambda: figura_A_distancias(
+                A, B, C, lienzo=lienzo_sesion("lienzo_distancias", lienzo_A_distancias)))
+        with perfil.tramo("emitir"):
+            st.image(png, width="stretch")
+
+    # --- CÁLCULOS DETALLADOS ---
+    st.header("Cálculos de Distancias")
+    st.markdown("A continuación se muestra el cálculo paso a paso para cada distancia, utilizando la fórmula de la distancia euclidiana:")
+    st.latex(r"d = \sqrt{(x_2 - x_1)^2 + (y_2 - y_1)^2}")
+
+    with st.expander("Distancia AB"):
+        st.latex(
+            fr"d(A,B) = \sqrt{{({B[0]:.2f} - {A[0]:.2f})^2 + ({B[1]:.2f} - {A[1]:.2f})^2}}")
+        st.latex(
+            fr"d(A,B) = \sqrt{{({B[0] - A[0]:.2f})^2 + ({B[1] - A[1]:.2f})^2}}")
+        st.latex(
+            fr"d(A,B) = \sqrt{{{(B[0] - A[0])**2:.2f} + {(B[1] - A[1])**2:.2f} }}")
+        st.latex(fr"d(A,B) = \sqrt{{{(B[0] - A[0])**2 + (B[1] - A[1])**2:.2f} }}")
+        st.success(f"**Distancia AB = {dist_AB:.2f}**")
+
+    with st.expander("Distancia AC"):
+        st.latex(
+            fr"d(A,C) = \sqrt{{({C[0]:.2f} - {A[0]:.2f})^2 + ({C[1]:.2f} - {A[1]:.2f})^2}}")
+        st.latex(
+            fr"d(A,C) = \sqrt{{({C[0] - A[0]:.2f})^2 + ({C[1] - A[1]:.2f})^2}}")
+        st.latex(
+            fr"d(A,C) = \sqrt{{{(C[0] - A[0])**2:.2f} + {(C[1] - A[1])**2:.2f} }}")
+        st.latex(fr"d(A,C) = \sqrt{{{(C[0] - A[0])**2 + (C[1] - A[1])**2:.2f} }}")
+        st.success(f"**Distancia AC = {dist_AC:.2f}**")
+
+    with st.expander("Distancia BC"):
+        st.latex(
+            fr"d(B,C) = \sqrt{{({C[0]:.2f} - {B[0]:.2f})^2 + ({C[1]:.2f} - {B[1]:.2f})^2}}")
+        st.latex(
+            fr"d(B,C) = \sqrt{{({C[0] - B[0]:.2f})^2 + ({C[1] - B[1]:.2f})^2}}")
+        st.latex(
+            fr"d(B,C) = \sqrt{{{(C[0] - B[0])**2:.2f} + {(C[1] - B[1])**2:.2f} }}")
+        st.latex(fr"d(B,C) = \sqrt{{{(C[0] - B[0])**2 + (C[1] - B[1])**2:.2f} }}")
+        st.success(f"**Distancia BC = {dist_BC:.2f}**")
+
+
+ejercicio()
 
 st.info(
     """
@@ -307,3 +292,9 @@ st.info(
     3.  La visualización gráfica de las distancias como segmentos de línea.
     """
 )
+
+if perfil_sesion:
+    with st.sidebar.expander("⏱️ Perfil de ejecución"):
+        st.dataframe(perfil.resumen(), hide_index=True)
+        st.download_button("JSON lines", perfil.exportar_jsonl(), file_name="perfil.jsonl")
+        st.download_button("Prometheus", perfil.exportar_prometheus(), file_name="perfil.prom")
@@ -1,30 +1,47 @@
 
+import hashlib
+
 import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 
+from electromagnetismo import perfil
+from electromagnetismo.almacen import almacen_compartido
+from electromagnetismo.arbol import N_DIRECTO, campo_arbol
+from electromagnetismo.cache import cuantizar, estadisticas as estadisticas_cache, obtener_cache
+from electromagnetismo.datos import cargar_cargas
+from electromagnetismo.electrostatica import campo_electrico_malla, energia_electrostatica
+from electromagnetismo.escenarios import (
+    LINEAS_B, RANGO_POSICION_B, RANGO_Q_NC, cargas_por_defecto, clave_B, exportar_B,
+    figura_B, figura_B_lineas, fuentes_B, lienzo_B, lienzo_B_lineas, lineas_B, malla_B)
+from electromagnetismo.figuras import figura_a_png
+from electromagnetismo.incremental import SuperposicionIncremental
+from electromagnetismo.recursos import ANCHO_ENCABEZADO, miniatura
+
 
 # --- CONFIGURACIÓN DE LA BARRA LATERAL Y ESTILOS ---
 st.set_page_config(layout="wide", page_title="Campo Eléctrico")
 
-st.sidebar.image(
-    "https://raw.githubusercontent.com/Jmontoyaor/Computational-electromagnetics/main/Imagenes/Propela_logo.png",
-    use_container_width=True
-)
+# Instrumentación opcional de las etapas de la página: ?perfil=1 la activa sólo
+# en esta sesión (EM_PERFIL=1, en todo el proceso)
+if st.query_params.get("perfil") == "1":
+    st.session_state["perfil"] = True
+perfil_sesion = st.session_state.get("perfil", False)
+perfil.fijar_pagina("B", perfil_sesion)
+
+st.sidebar.image(miniatura("Propela_logo.png"), width="stretch")
 
 custom_css = """
 <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;700&display=swap');
-
     .stApp {
         background-color: #0e1a40; /* Fondo de la app */
         color: #E0E0E0; /* Texto principal */
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     h1, h2, h3 {
         color: #00BFFF; /* Títulos */
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     /* --- INICIO DE LA CORRECCIÓN --- */
@@ -73,7 +90,7 @@ col_img, col_title = st.columns([0.2, 1])
 
 with col_img:
     # URL actualizada a una imagen más relevante para el tema
-    st.image("https://raw.githubusercontent.com/Jmontoyaor/Computational-electromagnetics/main/Imagenes/Distribucci%C3%B3n.png", width=150)
+    st.image(miniatura("Distribucción.png"), width=ANCHO_ENCABEZADO)
 
 with col_title:
     st.title("Campo Eléctrico")
@@ -123,84 +140,187 @@ Donde:
 """)
 
 
-# --- Constante de Coulomb ---
-k = 8.987e9  # N·m²/C²
-
-# --- Función para calcular el campo eléctrico de una carga puntual ---
-
-
-def campo_electrico_punto(q, r_carga, r_eval):
-    r_vec = r_eval - r_carga
-    r_mag = np.linalg.norm(r_vec)
-    if r_mag < 1e-6:
-        return np.array([0, 0])
-    r_unit = r_vec / r_mag
-    return k * q * r_unit / r_mag**2
-
-
 # --- Interfaz en Streamlit ---
 st.title("⚡ Visualización del Campo Eléctrico con 3 Cargas Puntuales")
 
-st.header("🔧 Parámetros de las cargas")
-
-# Tres columnas para las tres cargas
-col1, col2, col3 = st.columns(3)
-cargas = []
-
-for i, col in enumerate([col1, col2, col3]):
-    with col:
-        st.subheader(f"Carga {i+1}")
-        q = st.slider(f"q{i+1} (nC)", -5.0, 5.0, 1.0, step=0.1, key=f"q{i}")
-        x = st.slider(f"x{i+1} (m)", -6.0, 6.0,
-                      float(i*2 - 2), step=0.1, key=f"x{i}")
-        y = st.slider(f"y{i+1} (m)", -6.0, 6.0,
-                      float(i - 1), step=0.1, key=f"y{i}")
-        cargas.append({'q': q*1e-9, 'pos': np.array([x, y])})
-
-
-# --- Preparación de la malla ---
-nx, ny = 40, 40
-x = np.linspace(-6, 6, nx)
-y = np.linspace(-6, 6, ny)
-X, Y = np.meshgrid(x, y)
-
-Ex, Ey = np.zeros(X.shape), np.zeros(Y.shape)
-
-# --- Cálculo del campo ---
-for i in range(nx):
-    for j in range(ny):
-        punto_eval = np.array([X[i, j], Y[i, j]])
-        E_total = np.array([0.0, 0.0])
-        for carga in cargas:
-            E_total += campo_electrico_punto(carga['q'],
-                                             carga['pos'], punto_eval)
-        Ex[i, j] = E_total[0]
-        Ey[i, j] = E_total[1]
-
-# --- Visualización ---
-fig, ax = plt.subplots(figsize=(8, 8))
-
-magnitud = np.sqrt(Ex**2 + Ey**2)
-Ex_norm = Ex / magnitud
-Ey_norm = Ey / magnitud
-
-quiver = ax.quiver(X, Y, Ex_norm, Ey_norm, magnitud, cmap='viridis', scale=40)
-plt.colorbar(quiver, ax=ax, label='Magnitud del Campo Eléctrico (N/C)')
-
-# Dibujar cargas
-for carga in cargas:
-    color = 'blue' if carga['q'] > 0 else 'red'
-    ax.scatter(carga['pos'][0], carga['pos'][1], color=color,
-               s=150, zorder=5, edgecolors='white')
-    ax.text(carga['pos'][0] + 0.2, carga['pos'][1] +
-            0.2, f'{carga["q"]*1e9:.1f} nC', fontsize=10)
-
-ax.set_title('Campo Eléctrico de Cargas Puntuales')
-ax.set_xlabel('x (m)')
-ax.set_ylabel('y (m)')
-ax.axis('equal')
-ax.set_xlim(-6, 6)
-ax.set_ylim(-6, 6)
-ax.grid(True, linestyle=':', alpha=0.6)
-
-st.pyplot(fig)
+# Los campos y las figuras ya calculados (en esta o en otra sesión, o antes
+# de reiniciar el servidor) se reutilizan desde la caché compartida y el
+# almacén en disco
+almacen = almacen_compartido()
+cache_campos = obtener_cache("campos", respaldo=almacen)
+cache_figuras = obtener_cache("figuras", respaldo=almacen)
+
+
+# La simulación es un fragmento: al mover un slider sólo se vuelven a
+# ejecutar los controles, el kernel y la figura, no la teoría, el CSS ni las
+# imágenes del encabezado. Los cambios que llegan mientras el fragmento se
+# ejecuta se agrupan en una sola nueva ejecución con los valores más recientes.
+@st.fragment
+@perfil.pagina("B", perfil_sesion)
+def simulacion():
+    st.header("🔧 Parámetros de las cargas")
+
+    # Tres columnas para las tres cargas
+    with perfil.tramo("widgets"):
+        col1, col2, col3 = st.columns(3)
+        cargas_nc = []
+        q_min, q_max, q_paso = RANGO_Q_NC
+        p_min, p_max, p_paso = RANGO_POSICION_B
+
+        for i, (col, (q0, x0, y0)) in enumerate(zip([col1, col2, col3], cargas_por_defecto())):
+            with col:
+                st.subheader(f"Carga {i+1}")
+                q = st.slider(f"q{i+1} (nC)", q_min, q_max, q0, step=q_paso, key=f"q{i}")
+                x = st.slider(f"x{i+1} (m)", p_min, p_max, x0, step=p_paso, key=f"x{i}")
+                y = st.slider(f"y{i+1} (m)", p_min, p_max, y0, step=p_paso, key=f"y{i}")
+                cargas_nc.append((q, x, y))
+
+    # --- Preparación de la malla ---
+    with perfil.tramo("malla"):
+        X, Y = malla_B()
+
+    # --- Cálculo del campo ---
+    # Cada carga aporta su propio campo y potencial (calculados juntos, con una
+    # sola evaluación de las distancias); entre ejecuciones sólo se recalcula la
+    # contribución de la carga cuyo slider cambió.
+    fuentes = fuentes_B(cargas_nc)
+    clave = clave_B(fuentes)
+    superposicion = st.session_state.get("superposicion_E")
+    if superposicion is None or superposicion.clave != clave[2:]:
+        superposicion = SuperposicionIncremental(
+            lambda f: campo_electrico_malla([f[1:]], [f[0]], X, Y, potencial=True),
+            clave=clave[2:])
+        st.session_state.superposicion_E = superposicion
+
+    # Cada sesión conserva sus figuras y sólo actualiza los datos de sus
+    # artistas; se liberan con la sesión
+    def lienzo(nombre, crear):
+        if nombre not in st.session_state:
+            st.session_state[nombre] = crear()
+        return st.session_state[nombre]
+
+    def graficar_campo():
+        with perfil.tramo("campo"):
+            Ex, Ey, phi = cache_campos.obtener_o_calcular(
+                clave, lambda: superposicion.actualizar(fuentes))
+        return figura_B(fuentes, X, Y, Ex, Ey, phi, lienzo=lienzo("lienzo_B", lienzo_B))
+
+    def graficar_lineas():
+        with perfil.tramo("campo"):
+            lineas = cache_campos.obtener_o_calcular(clave_lineas, lambda: lineas_B(fuentes))
+        return figura_B_lineas(fuentes, lineas,
+                               lienzo=lienzo("lienzo_B_lineas", lienzo_B_lineas))
+
+    representacion = st.radio("Representación", ["Vectores", "Líneas de campo"],
+                              horizontal=True, key="representacion_B")
+    if representacion == "Vectores":
+        png = cache_figuras.obtener_o_calcular(clave, graficar_campo)
+    else:
+        # Las líneas se integran con RK4 desde semillas alrededor de cada carga,
+        # en número proporcional a |q|, y se guardan por conjunto de parámetros
+        clave_lineas = ("B-lineas", clave[1], LINEAS_B)
+        png = cache_figuras.obtener_o_calcular(clave_lineas, graficar_lineas)
+    with perfil.tramo("emitir"):
+        st.image(png, width="stretch")
+
+    energia = energia_electrostatica([f[1:] for f in fuentes], [f[0] for f in fuentes])
+    st.markdown(rf"""
+    En la vista de vectores, las curvas de color son **equipotenciales** ($\phi$ constante), siempre
+    perpendiculares al campo. Energía electrostática de la configuración:
+    $U = \frac{{1}}{{2}}\sum_i q_i \phi_i =$ **{energia:.3e} J**
+    """)
+
+    with st.expander("🖼️ Exportar en alta resolución"):
+        st.markdown("La malla se evalúa por teselas, así que incluso 2000×2000 puntos caben en "
+                    "la memoria del servidor; en float32 los resultados ocupan la mitad, con un "
+                    "error relativo menor que 1e-7.")
+        col_n, col_precision = st.columns(2)
+        with col_n:
+            n_exportar = st.select_slider("Puntos por lado", [500, 1000, 2000], value=1000)
+        with col_precision:
+            precision = st.radio("Precisión", ["float32", "float64"], horizontal=True)
+        if st.button("Generar imagen"):
+            with st.spinner("Calculando..."):
+                png_exportar = exportar_B(fuentes, n_exportar, dtype=precision)
+            st.download_button("Descargar PNG", png_exportar, file_name="campo_electrico.png",
+                               mime="image/png")
+
+
+simulacion()
+
+with st.sidebar.expander("Caché de resultados"):
+    for nombre, datos in estadisticas_cache().items():
+        st.markdown(f"**{nombre}**: {datos['aciertos']} aciertos, "
+                    f"{datos['fallos']} fallos, {datos['memoria_mb']:.1f} MB")
+
+# --- Distribuciones grandes de carga ---
+st.write("---")
+st.header("📂 Distribuciones Grandes de Carga")
+st.markdown(r"""
+Carga un archivo con miles de cargas puntuales (CSV con columnas `x, y, q` o `x, y, z, q`
+en metros y coulombs, o un NPZ con los arreglos `posiciones` y `cargas`).
+Para más de algunos miles de cargas el campo se calcula con el algoritmo de **Barnes–Hut**:
+los grupos de cargas lejanos se reemplazan por su expansión multipolar. El ángulo de
+apertura $\theta$ controla la precisión; con $\theta = 0$ se obtiene la suma directa.
+""")
+
+@st.fragment
+@perfil.pagina("B", perfil_sesion)
+def distribucion():
+    archivo = st.file_uploader("Archivo de cargas", type=["csv", "npz"])
+    col_theta, col_orden = st.columns(2)
+    with col_theta:
+        theta = st.slider("Ángulo de apertura θ", 0.0, 1.0, 0.5, step=0.05)
+    with col_orden:
+        orden = st.selectbox("Orden de la expansión", [0, 1, 2], index=2,
+                             format_func=lambda o: ["Monopolo", "Dipolo", "Cuadrupolo"][o])
+
+    if archivo is not None:
+        try:
+            pos_nube, q_nube = cargar_cargas(archivo)
+        except ValueError as error:
+            st.error(f"No se pudo leer el archivo: {error}")
+        else:
+            st.caption(f"{len(q_nube):,} cargas · "
+                       f"{'Barnes–Hut' if len(q_nube) > N_DIRECTO else 'suma directa'}")
+            clave_nube = ("B-nube", hashlib.sha256(archivo.getvalue()).hexdigest(),
+                          cuantizar(theta), orden)
+
+            def graficar_nube():
+                margen = 0.1 * np.ptp(pos_nube[:, :2], axis=0).max() + 1e-9
+                x_min, y_min = pos_nube[:, :2].min(axis=0) - margen
+                x_max, y_max = pos_nube[:, :2].max(axis=0) + margen
+                Xn, Yn = np.meshgrid(np.linspace(x_min, x_max, 60),
+                                     np.linspace(y_min, y_max, 60))
+                with perfil.tramo("campo"):
+                    *E_nube, phi_nube = cache_campos.obtener_o_calcular(
+                        clave_nube, lambda: campo_arbol(pos_nube, q_nube, Xn, Yn,
+                                                        potencial=True, theta=theta, orden=orden))
+                Exn, Eyn = E_nube[0], E_nube[1]
+
+                with perfil.tramo("figura"):
+                    fig_nube, ax_nube = plt.subplots(figsize=(8, 8))
+                    relleno = ax_nube.contourf(Xn, Yn, phi_nube, levels=30, cmap='coolwarm')
+                    plt.colorbar(relleno, ax=ax_nube, label='Potencial (V)')
+                    mag_nube = np.hypot(Exn, Eyn)
+                    ax_nube.quiver(Xn[::3, ::3], Yn[::3, ::3],
+                                   (Exn / mag_nube)[::3, ::3], (Eyn / mag_nube)[::3, ::3],
+                                   color='k', scale=40)
+                    ax_nube.set_title('Potencial y dirección del campo de la distribución')
+                    ax_nube.set_xlabel('x (m)')
+                    ax_nube.set_ylabel('y (m)')
+                    ax_nube.set_aspect('equal')
+                return figura_a_png(fig_nube)
+
+            png = cache_figuras.obtener_o_calcular(clave_nube, graficar_nube)
+            with perfil.tramo("emitir"):
+                st.image(png, width="stretch")
+
+
+distribucion()
+
+if perfil_sesion:
+    with st.sidebar.expander("⏱️ Perfil de ejecución"):
+        st.dataframe(perfil.resumen(), hide_index=True)
+        st.download_button("JSON lines", perfil.exportar_jsonl(), file_name="perfil.jsonl")
+        st.download_button("Prometheus", perfil.exportar_prometheus(), file_name="perfil.prom")
@@ -1,30 +1,45 @@
 
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
+
+from electromagnetismo import perfil
+from electromagnetismo.almacen import almacen_compartido
+from electromagnetismo.bobinas import helmholtz, solenoide
+from electromagnetismo.cache import estadisticas as estadisticas_cache, obtener_cache
+from electromagnetismo.escenarios import (
+    RADIO_BOBINA, RANGO_CORRIENTE, RANGO_POSICION_C, RESOLUCION_BOBINA, campo_bobina,
+    campo_espira, campo_hilos, clave_bobina, clave_C, clave_espira, clave_hilos,
+    conductor_por_defecto, figura_bobina, figura_C, figura_C_lineas, figura_espira,
+    figura_hilos, hilos_por_defecto, lienzo_C, lienzo_C_lineas, lineas_C, malla_bobina,
+    malla_C, malla_superposicion)
+from electromagnetismo.incremental import SuperposicionIncremental
+from electromagnetismo.recursos import ANCHO_ENCABEZADO, miniatura
+from electromagnetismo.magnetostatica import campo_h_conductor
 
 
 # --- CONFIGURACIÓN DE LA BARRA LATERAL Y ESTILOS ---
 st.set_page_config(layout="wide", page_title="Campo Eléctrico")
 
-st.sidebar.image(
-    "https://raw.githubusercontent.com/Jmontoyaor/Computational-electromagnetics/main/Imagenes/Propela_logo.png",
-    use_container_width=True
-)
+# Instrumentación opcional de las etapas de la página: ?perfil=1 la activa sólo
+# en esta sesión (EM_PERFIL=1, en todo el proceso)
+if st.query_params.get("perfil") == "1":
+    st.session_state["perfil"] = True
+perfil_sesion = st.session_state.get("perfil", False)
+perfil.fijar_pagina("C", perfil_sesion)
+
+st.sidebar.image(miniatura("Propela_logo.png"), width="stretch")
 
 custom_css = """
 <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;700&display=swap');
-
     .stApp {
         background-color: #0e1a40; /* Fondo de la app */
         color: #E0E0E0; /* Texto principal */
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     h1, h2, h3 {
         color: #00BFFF; /* Títulos */
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     /* --- INICIO DE LA CORRECCIÓN --- */
@@ -73,7 +88,7 @@ col_img, col_title = st.columns([0.2, 1])
 
 with col_img:
     # URL actualizada a una imagen más relevante para el tema
-    st.image("https://raw.githubusercontent.com/Jmontoyaor/Computational-electromagnetics/main/Imagenes/Campo.png", width=150)
+    st.image(miniatura("Campo.png"), width=ANCHO_ENCABEZADO)
 
 with col_title:
     st.title("Campo Magnestostático")
@@ -174,48 +189,233 @@ en la dirección **+z**.
 Ahora puedes mover el conductor en el plano XY y observar cómo cambia el campo.
 """)
 
+# Campos y figuras compartidos entre sesiones y persistidos en disco
+almacen = almacen_compartido()
+cache_campos = obtener_cache("campos", respaldo=almacen)
+cache_figuras = obtener_cache("figuras", respaldo=almacen)
+
 # --- Parámetros controlados por el usuario ---
-I = st.slider("Corriente (A)", min_value=-10.0,
-              max_value=10.0, value=5.0, step=1.0)
-x0 = st.slider("Posición X del conductor", -5.0, 5.0, 0.0, 0.1)
-y0 = st.slider("Posición Y del conductor", -5.0, 5.0, 0.0, 0.1)
-
-plotlim = [-5, 5, -5, 5]
-
-# --- Malla ---
-dx = (plotlim[1] - plotlim[0]) / 20
-dy = (plotlim[3] - plotlim[2]) / 20
-xrange = np.arange(plotlim[0], plotlim[1] + dx, dx)
-yrange = np.arange(plotlim[2], plotlim[3] + dy, dy)
-X, Y = np.meshgrid(xrange, yrange)
-
-# --- Distancia radial al nuevo centro ---
-R = np.sqrt((X - x0)**2 + (Y - y0)**2)
-R[R == 0] = np.nan  # evitar división por cero
-
-# Vectores unitarios en dirección phi (-Δy, Δx)
-phiX = -(Y - y0) / R
-phiY = (X - x0) / R
-
-# --- Campo magnético ---
-H = I / (2 * np.pi * R)
-U = H * phiX
-V = H * phiY
-
-# --- Graficar ---
-fig, ax = plt.subplots(figsize=(6, 6))
-ax.quiver(X, Y, U, V, color="blue")
-ax.set_aspect("equal")
-ax.set_xlim(plotlim[0], plotlim[1])
-ax.set_ylim(plotlim[2], plotlim[3])
-ax.set_xlabel("X location (m)")
-ax.set_ylabel("Y location (m)")
-ax.set_title(
-    f"Campo Magnético para I = {I:.1f} A, Conductor en ({x0:.1f}, {y0:.1f})")
-ax.grid(True)
-
-# Dibujar la posición del conductor
-ax.plot(x0, y0, "ro", markersize=10, label="Conductor")
-ax.legend()
-
-st.pyplot(fig)
+I_defecto, x0_defecto, y0_defecto = conductor_por_defecto()
+i_min, i_max, i_paso = RANGO_CORRIENTE
+p_min, p_max, p_paso = RANGO_POSICION_C
+
+
+# Cada simulación es un fragmento: al mover un slider sólo se vuelven a
+# ejecutar sus controles, el kernel y la figura, no la teoría, el CSS ni las
+# imágenes del encabezado. Los cambios que llegan mientras el fragmento se
+# ejecuta se agrupan en una sola nueva ejecución con los valores más recientes.
+@st.fragment
+@perfil.pagina("C", perfil_sesion)
+def conductor():
+    with perfil.tramo("widgets"):
+        I = st.slider("Corriente (A)", min_value=i_min,
+                      max_value=i_max, value=I_defecto, step=i_paso)
+        x0 = st.slider("Posición X del conductor", p_min, p_max, x0_defecto, p_paso)
+        y0 = st.slider("Posición Y del conductor", p_min, p_max, y0_defecto, p_paso)
+
+    # --- Malla ---
+    with perfil.tramo("malla"):
+        X, Y = malla_C()
+
+    # --- Campo magnético (superposición incremental por conductor) ---
+    conductores = [(I, x0, y0)]
+    clave = clave_C(conductores)
+    superposicion = st.session_state.get("superposicion_H")
+    if superposicion is None or superposicion.clave != clave[2]:
+        superposicion = SuperposicionIncremental(
+            lambda c: campo_h_conductor(*c, X, Y), clave=clave[2])
+        st.session_state.superposicion_H = superposicion
+
+    # Cada sesión conserva sus figuras y sólo actualiza los datos de sus
+    # artistas; se liberan con la sesión
+    def lienzo(nombre, crear):
+        if nombre not in st.session_state:
+            st.session_state[nombre] = crear()
+        return st.session_state[nombre]
+
+    def graficar_campo():
+        with perfil.tramo("campo"):
+            U, V = cache_campos.obtener_o_calcular(
+                clave, lambda: superposicion.actualizar(conductores))
+        return figura_C(conductores, X, Y, U, V, lienzo=lienzo("lienzo_C", lienzo_C))
+
+    def graficar_lineas():
+        with perfil.tramo("campo"):
+            lineas = cache_campos.obtener_o_calcular(clave_lineas, lambda: lineas_C(conductores))
+        return figura_C_lineas(conductores, lineas,
+                               lienzo=lienzo("lienzo_C_lineas", lienzo_C_lineas))
+
+    representacion = st.radio("Representación", ["Vectores", "Líneas de campo"],
+                              horizontal=True, key="representacion_C")
+    if representacion == "Vectores":
+        png = cache_figuras.obtener_o_calcular(clave, graficar_campo)
+    else:
+        clave_lineas = ("C-lineas", clave[1])
+        png = cache_figuras.obtener_o_calcular(clave_lineas, graficar_lineas)
+    with perfil.tramo("emitir"):
+        st.image(png, width="stretch")
+
+
+conductor()
+
+with st.sidebar.expander("Caché de resultados"):
+    for nombre, datos in estadisticas_cache().items():
+        st.markdown(f"**{nombre}**: {datos['aciertos']} aciertos, "
+                    f"{datos['fallos']} fallos, {datos['memoria_mb']:.1f} MB")
+
+# --- Superposición de varios conductores y espiras ---
+st.write("---")
+st.header("🧲 Superposición: Varios Conductores y Espiras")
+st.markdown(r"""
+El campo de cualquier circuito formado por tramos rectos se obtiene sumando el aporte de
+cada segmento. Para un segmento de $\vec{r}_1$ a $\vec{r}_2$ (medidos desde el punto de
+observación) la ley de Biot-Savart se integra en forma cerrada:
+""")
+st.latex(r"\vec{B} = \frac{\mu_0 I}{4\pi}\,"
+         r"\frac{(|\vec{r}_1| + |\vec{r}_2|)\,(\vec{r}_1 \times \vec{r}_2)}"
+         r"{|\vec{r}_1||\vec{r}_2|\,(|\vec{r}_1||\vec{r}_2| + \vec{r}_1 \cdot \vec{r}_2)}")
+st.markdown("""
+Una espira circular se aproxima con un polígono regular: con más lados, el resultado se
+acerca al de la espira ideal.
+""")
+
+
+@st.fragment
+@perfil.pagina("C", perfil_sesion)
+def superposicion_conductores():
+    configuracion = st.radio("Configuración", ["Conductores paralelos", "Espira poligonal"],
+                             horizontal=True)
+    with perfil.tramo("malla"):
+        X_sup, Y_sup = malla_superposicion()
+
+    if configuracion == "Conductores paralelos":
+        st.markdown("Cada fila es un conductor infinito paralelo al eje z "
+                    "(corriente positiva saliendo del plano).")
+        I_h, x_h, y_h = zip(*hilos_por_defecto())
+        tabla = st.data_editor(
+            {"I (A)": list(I_h), "x (m)": list(x_h), "y (m)": list(y_h)},
+            num_rows="dynamic", key="conductores_paralelos")
+        hilos = [fila for fila in zip(tabla["I (A)"], tabla["x (m)"], tabla["y (m)"])
+                 if all(v is not None and np.isfinite(v) for v in fila)]
+        clave_sup = clave_hilos(hilos)
+        # Cada conductor de la tabla guarda su aporte: agregar, quitar o
+        # editar una fila sólo evalúa ese conductor
+        superposicion = st.session_state.get("superposicion_hilos")
+        if superposicion is None or superposicion.clave != X_sup.shape:
+            superposicion = SuperposicionIncremental(
+                lambda h: campo_hilos([h], X_sup, Y_sup), clave=X_sup.shape)
+            st.session_state.superposicion_hilos = superposicion
+
+        def calcular_superposicion():
+            if not hilos:
+                return campo_hilos(hilos, X_sup, Y_sup)
+            return superposicion.actualizar(hilos)
+
+        def dibujar(Hx, Hy):
+            return figura_hilos(hilos, X_sup, Y_sup, Hx, Hy)
+    else:
+        col_a, col_n, col_i = st.columns(3)
+        with col_a:
+            radio_espira = st.slider("Radio de la espira (m)", 0.5, 4.0, 2.0, step=0.1)
+        with col_n:
+            lados = st.slider("Número de lados", 3, 200, 64)
+        with col_i:
+            I_espira = st.slider("Corriente de la espira (A)", i_min, i_max, I_defecto, i_paso)
+        st.markdown("La espira está en el plano x = 0 con su eje a lo largo de x; "
+                    "la figura muestra el corte en el plano z = 0.")
+        clave_sup = clave_espira(radio_espira, lados, I_espira)
+
+        def calcular_superposicion():
+            return campo_espira(radio_espira, lados, I_espira, X_sup, Y_sup)
+
+        def dibujar(Hx, Hy):
+            return figura_espira(radio_espira, lados, I_espira, X_sup, Y_sup, Hx, Hy)
+
+    def graficar_superposicion():
+        with perfil.tramo("campo"):
+            Hx, Hy = cache_campos.obtener_o_calcular(clave_sup, calcular_superposicion)
+        return dibujar(Hx, Hy)
+
+    png = cache_figuras.obtener_o_calcular(clave_sup, graficar_superposicion)
+    with perfil.tramo("emitir"):
+        st.image(png, width="stretch")
+
+
+superposicion_conductores()
+
+# --- Espiras circulares, Helmholtz y solenoides (forma cerrada) ---
+st.write("---")
+st.header("🌀 Espiras Circulares, Bobinas de Helmholtz y Solenoides")
+st.markdown(r"""
+El campo de una espira circular de radio $a$ se puede escribir en forma cerrada con las
+integrales elípticas completas $K(m)$ y $E(m)$, con $m = \frac{4a\rho}{(a+\rho)^2 + z^2}$:
+""")
+st.latex(r"B_z = \frac{\mu_0 I}{2\pi\sqrt{(a+\rho)^2+z^2}}"
+         r"\left[K(m) + \frac{a^2-\rho^2-z^2}{(a-\rho)^2+z^2}E(m)\right]")
+st.markdown(r"""
+Un par de **Helmholtz** (dos espiras separadas una distancia igual al radio) produce un
+campo casi uniforme entre ellas, y un **solenoide** es una pila de muchas espiras. Las
+líneas de campo son las curvas de nivel de $\rho A_\phi$, donde $A_\phi$ es el potencial
+vectorial. Las espiras están en planos perpendiculares al eje x; la figura es el corte z = 0.
+""")
+
+
+@st.fragment
+@perfil.pagina("C", perfil_sesion)
+def bobinas():
+    with perfil.tramo("widgets"):
+        col_tipo, col_res = st.columns(2)
+        with col_tipo:
+            tipo_bobina = st.selectbox("Tipo de bobina",
+                                       ["Espira", "Par de Helmholtz", "Solenoide"])
+        with col_res:
+            resolucion = st.slider("Resolución de la malla", 100, 400, RESOLUCION_BOBINA,
+                                   step=50)
+        col_ra, col_ib = st.columns(2)
+        with col_ra:
+            radio_bobina = st.slider("Radio (m)", 0.5, 3.0, RADIO_BOBINA, step=0.1,
+                                     key="radio_bobina")
+        with col_ib:
+            I_bobina = st.slider("Corriente (A)", i_min, i_max, I_defecto, i_paso, key="I_bobina")
+        if tipo_bobina == "Solenoide":
+            col_v, col_l = st.columns(2)
+            with col_v:
+                vueltas = st.slider("Número de vueltas", 2, 60, 20)
+            with col_l:
+                longitud = st.slider("Longitud (m)", 0.5, 8.0, 4.0, step=0.5)
+            espiras = solenoide(I_bobina, radio_bobina, longitud, vueltas, eje="x")
+        elif tipo_bobina == "Par de Helmholtz":
+            espiras = helmholtz(I_bobina, radio_bobina, eje="x")
+        else:
+            espiras = [(I_bobina, radio_bobina, (0.0, 0.0, 0.0), "x")]
+
+    adaptativo = st.checkbox(
+        "Muestreo adaptativo", value=True,
+        help="Refina la malla sólo donde el campo cambia rápido (junto a los conductores) "
+             "y remuestrea el resultado sobre la malla de la figura.")
+    clave_espiras = clave_bobina(espiras, resolucion, adaptativo)
+    with perfil.tramo("malla"):
+        X_b, Y_b = malla_bobina(resolucion)
+
+    with perfil.tramo("campo"):
+        Bx, By, Az, evaluaciones = cache_campos.obtener_o_calcular(
+            clave_espiras, lambda: campo_bobina(espiras, X_b, Y_b, adaptativo))
+
+    def graficar_bobina():
+        return figura_bobina(tipo_bobina, espiras, X_b, Y_b, Bx, By, Az)
+
+    # El tipo va en el título: bobinas distintas pueden dar las mismas espiras
+    png = cache_figuras.obtener_o_calcular(clave_espiras + (tipo_bobina,), graficar_bobina)
+    with perfil.tramo("emitir"):
+        st.image(png, width="stretch")
+    st.caption(f"{int(evaluaciones):,} evaluaciones del campo para una figura de "
+               f"{resolucion}×{resolucion} puntos")
+
+
+bobinas()
+
+if perfil_sesion:
+    with st.sidebar.expander("⏱️ Perfil de ejecución"):
+        st.dataframe(perfil.resumen(), hide_index=True)
+        st.download_button("JSON lines", perfil.exportar_jsonl(), file_name="perfil.jsonl")
+        st.download_button("Prometheus", perfil.exportar_prometheus(), file_name="perfil.prom")
@@ -2,6 +2,8 @@ import streamlit as st
 import json
 from typing import Dict, List
 
+from electromagnetismo import perfil
+
 # --- CONFIGURACIÓN DE PÁGINA Y ESTILOS ---
 st.set_page_config(
     layout="wide",
@@ -9,26 +11,31 @@ st.set_page_config(
     page_icon="🤖"
 )
 
+# Instrumentación opcional de las etapas de la página: ?perfil=1 la activa sólo
+# en esta sesión (EM_PERFIL=1, en todo el proceso)
+if st.query_params.get("perfil") == "1":
+    st.session_state["perfil"] = True
+perfil_sesion = st.session_state.get("perfil", False)
+perfil.fijar_pagina("D", perfil_sesion)
+
 # CSS personalizado con tu paleta de colores preferida
 custom_css = """
 <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;500;600;700&display=swap');
-
     .stApp {
         background-color: #0e1a40;
         color: #E0E0E0;
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     h1, h2, h3 {
         color: #00BFFF;
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     section[data-testid="stSidebar"] {
         background-color: #222f5b !important;
         border-radius: 10px;
-        font-family: 'Poppins', sans-serif;
+        font-family: sans-serif;
     }
 
     section[data-testid="stSidebar"] * {
@@ -338,7 +345,7 @@ if not st.session_state.quiz_completed:
         """, unsafe_allow_html=True)
 
         # Opciones de respuesta
-        with st.container():
+        with st.container(), perfil.tramo("widgets"):
             answer = st.radio(
                 "Selecciona tu respuesta:",
                 options=range(len(question['options'])),
@@ -379,7 +386,8 @@ if not st.session_state.quiz_completed:
 
 # --- MOSTRAR RESULTADOS ---
 if st.session_state.quiz_completed:
-    correct, total = calculate_score()
+    with perfil.tramo("puntuacion"):
+        correct, total = calculate_score()
     percentage = (correct / total) * 100
 
     # Resultado general
@@ -469,3 +477,9 @@ with st.sidebar:
     - Conceptos fundamentales de electrostática (cargas en reposo e interacciones)
     - Fundamentos del modelado computacional de campos eléctricos
     """)
+
+if perfil_sesion:
+    with st.sidebar.expander("⏱️ Perfil de ejecución"):
+        st.dataframe(perfil.resumen(), hide_index=True)
+        st.download_button("JSON lines", perfil.exportar_jsonl(), file_name="perfil.jsonl")
+        st.download_button("Prometheus", perfil.exportar_prometheus(), file_name="perfil.prom")
@@ -0,0 +1,195 @@
+import os
+import tempfile
+
+import streamlit as st
+import numpy as np
+
+from electromagnetismo import perfil
+from electromagnetismo.almacen import almacen_compartido
+from electromagnetismo.cache import cuantizar, estadisticas as estadisticas_cache, obtener_cache
+from electromagnetismo.escenarios import (
+    CADA_E, FUENTES_E, INICIO_BLOQUE_E, KE_E, KS_E, OPCIONES_PASOS_E, RANGO_EPSILON_E,
+    RANGO_SIGMA_E, barrido, clave_E, figura_E, figura_reflexion_E, lector_E, reflexion_E,
+    video_E)
+from electromagnetismo.instantaneas import formato_video
+from electromagnetismo.recursos import miniatura
+
+
+# --- CONFIGURACIÓN DE LA BARRA LATERAL Y ESTILOS ---
+st.set_page_config(layout="wide", page_title="Ondas con FDTD")
+
+# Instrumentación opcional de las etapas de la página: ?perfil=1 la activa sólo
+# en esta sesión (EM_PERFIL=1, en todo el proceso)
+if st.query_params.get("perfil") == "1":
+    st.session_state["perfil"] = True
+perfil_sesion = st.session_state.get("perfil", False)
+perfil.fijar_pagina("E", perfil_sesion)
+
+st.sidebar.image(miniatura("Propela_logo.png"), width="stretch")
+
+custom_css = """
+<style>
+    .stApp {
+        background-color: #0e1a40; /* Fondo de la app */
+        color: #E0E0E0; /* Texto principal */
+        font-family: sans-serif;
+    }
+
+    h1, h2, h3 {
+        color: #00BFFF; /* Títulos */
+        font-family: sans-serif;
+    }
+
+    label {
+        color: #E0E0E0 !important; /* Asegura que el texto de los sliders sea visible */
+    }
+
+    [data-testid="stExpander"] {
+        border: 1px solid #00BFFF !important;
+        border-radius: 10px;
+        background-color: #1c2a59;
+    }
+
+    [data-testid="stExpander"] summary {
+        background-color: #222f5b !important;
+        color: #E0E0E0 !important;
+        border-radius: 10px;
+    }
+
+    section[data-testid="stSidebar"] {
+        background-color: #222f5b;
+        border-radius: 10px;
+    }
+
+    section[data-testid="stSidebar"] * {
+        color: #c6e2ff !important;
+    }
+
+    [data-testid="stExpander"] summary p {
+        color: #E0E0E0 !important;
+    }
+</style>
+"""
+st.markdown(custom_css, unsafe_allow_html=True)
+
+st.title("Ondas Electromagnéticas con FDTD")
+st.markdown("#### Simula la propagación de un pulso en una dimensión con el método de diferencias finitas en el dominio del tiempo.")
+st.write("---")
+
+# --- CUERPO TEÓRICO ---
+st.header("Fundamentos del Método FDTD")
+st.markdown(r"""
+El método **FDTD** (algoritmo de Yee) discretiza las ecuaciones de Maxwell en el espacio y en
+el tiempo. En una dimensión, con la onda viajando en $z$, sólo intervienen $E_x$ y $H_y$, que se
+calculan en puntos intercalados medio paso de espacio y medio paso de tiempo:
+""")
+st.latex(r"H_y^{n+1/2}(k) = H_y^{n-1/2}(k) + \tfrac{1}{2}\left[E_x^n(k+1) - E_x^n(k)\right]")
+st.latex(r"E_x^{n+1}(k) = c_a(k)\,E_x^n(k) + c_b(k)\left[H_y^{n+1/2}(k) - H_y^{n+1/2}(k-1)\right]")
+st.markdown(r"""
+Con $\Delta t = \Delta x / 2c$, en el vacío $c_a = 1$ y $c_b = 1/2$. Un material de permitividad
+$\varepsilon_r$ y conductividad $\sigma$ cambia los coeficientes:
+""")
+st.latex(r"c_a = \frac{1 - \frac{\sigma \Delta t}{2\varepsilon_0\varepsilon_r}}"
+         r"{1 + \frac{\sigma \Delta t}{2\varepsilon_0\varepsilon_r}}, \qquad "
+         r"c_b = \frac{1/2}{\varepsilon_r\left(1 + \frac{\sigma \Delta t}{2\varepsilon_0\varepsilon_r}\right)}")
+st.markdown(r"""
+En los extremos, una **frontera absorbente** copia el valor que tenía la celda vecina dos pasos
+antes: es lo que tarda la onda en cruzar una celda, así que el pulso sale de la malla sin
+reflejarse (exactamente en el vacío; dentro del material queda un pequeño eco).
+""")
+
+# Campos y figuras compartidos entre sesiones y persistidos en disco
+almacen = almacen_compartido()
+cache_campos = obtener_cache("campos", respaldo=almacen)
+cache_figuras = obtener_cache("figuras", respaldo=almacen)
+# Los fotogramas son muchos y baratos de redibujar desde las instantáneas:
+# se guardan sólo en memoria para no llenar el almacén con una figura por paso
+cache_fotogramas = obtener_cache("fotogramas", memoria_max=64 * 2**20)
+
+st.title("🌊 Pulso Gaussiano sobre un Material")
+st.markdown(f"""
+La fuente está en la celda {KS_E} y, desde la celda {INICIO_BLOQUE_E}, la malla de {KE_E} celdas
+(Δx = 1 cm) se llena con el material. Durante la simulación se escribe en disco una instantánea
+cada {CADA_E} pasos; el control de tiempo recorre las instantáneas guardadas sin volver a simular
+y sin cargar la corrida completa en memoria.
+""")
+
+e_min, e_max, e_paso = RANGO_EPSILON_E
+s_min, s_max, s_paso = RANGO_SIGMA_E
+
+
+# La simulación es un fragmento: mover un slider no vuelve a ejecutar la
+# teoría ni el CSS, y recorrer el tiempo sólo dibuja otra instantánea
+@st.fragment
+@perfil.pagina("E", perfil_sesion)
+def simulacion():
+    with perfil.tramo("widgets"):
+        col_epsilon, col_sigma = st.columns(2)
+        with col_epsilon:
+            epsilon_r = st.slider("Permitividad relativa εr", e_min, e_max, 4.0, e_paso,
+                                  key="epsilon_E")
+        with col_sigma:
+            sigma = st.slider("Conductividad σ (S/m)", s_min, s_max, s_min, s_paso,
+                              format="%.3f", key="sigma_E")
+        col_fuente, col_pasos = st.columns(2)
+        with col_fuente:
+            fuente = st.radio("Fuente", FUENTES_E, horizontal=True, key="fuente_E")
+        with col_pasos:
+            pasos = st.select_slider("Pasos de tiempo", OPCIONES_PASOS_E, key="pasos_E")
+        # Un control por duración, para que su valor siempre esté en el rango
+        paso = st.slider("Paso de tiempo", CADA_E, pasos, min(505, pasos), CADA_E,
+                         key=f"paso_E_{pasos}")
+
+    clave = clave_E(epsilon_r, sigma, fuente, pasos)
+    with perfil.tramo("campo"):
+        lector = lector_E(epsilon_r, sigma, fuente, pasos, almacen)
+    indice = paso // CADA_E - 1
+
+    png = cache_fotogramas.obtener_o_calcular(clave + (indice,), lambda: figura_E(lector, indice))
+    with perfil.tramo("emitir"):
+        st.image(png, width="stretch")
+
+    st.markdown(r"""
+    Parte del pulso se **refleja** en la interfaz con signo opuesto y el resto se **transmite**
+    más lento ($v = c/\sqrt{\varepsilon_r}$) y más corto. Con $\sigma > 0$ el pulso transmitido
+    se atenúa a medida que avanza por el material.
+    """)
+
+    with st.expander("🎞️ Exportar animación"):
+        formato = formato_video()
+        st.markdown(f"El video se dibuja cuadro a cuadro desde las instantáneas en disco "
+                    f"({len(lector)} cuadros, formato {formato.upper()}).")
+        if st.button("Generar animación"):
+            with st.spinner("Dibujando..."), tempfile.TemporaryDirectory() as carpeta:
+                ruta = video_E(lector, os.path.join(carpeta, f"onda.{formato}"))
+                with open(ruta, "rb") as archivo:
+                    video = archivo.read()
+            st.download_button("Descargar animación", video, file_name=f"onda_fdtd.{formato}",
+                               mime=f"video/{formato}" if formato == "mp4" else "image/gif")
+
+    with st.expander("📈 Barrido de la permitividad"):
+        st.markdown("Todas las permitividades se simulan a la vez, como filas de un mismo "
+                    "arreglo, y se mide el pico del pulso reflejado.")
+        valores = np.array(barrido(RANGO_EPSILON_E))
+        clave_barrido = ("E-reflexion", cuantizar(sigma), len(valores))
+        with perfil.tramo("campo"):
+            R = cache_campos.obtener_o_calcular(clave_barrido,
+                                                lambda: reflexion_E(valores, sigma))
+        png_barrido = cache_figuras.obtener_o_calcular(
+            clave_barrido, lambda: figura_reflexion_E(valores, R, sigma))
+        with perfil.tramo("emitir"):
+            st.image(png_barrido, width="stretch")
+
+
+simulacion()
+
+with st.sidebar.expander("Caché de resultados"):
+    for nombre, datos in estadisticas_cache().items():
+        st.markdown(f"**{nombre}**: {datos['aciertos']} aciertos, "
+                    f"{datos['fallos']} fallos, {datos['memoria_mb']:.1f} MB")
+
+if perfil_sesion:
+    with st.sidebar.expander("⏱️ Perfil de ejecución"):
+        st.dataframe(perfil.resumen(), hide_index=True)
+        st.download_button("JSON lines", perfil.exportar_jsonl(), file_name="perfil.jsonl")
+        st.download_button("Prometheus", perfil.exportar_prometheus(), file_name="perfil.prom")
@@ -0,0 +1,59 @@
+"""Punto de entrada ASGI de la aplicación con caché de larga duración.
+
+`streamlit run servidor.py` (o `uvicorn servidor:app`) sirve la misma
+aplicación que `streamlit run Introducción.py`, pero marca como inmutables
+las respuestas cuya URL depende del contenido: las imágenes y figuras de
+/media (identificadas por un resumen de sus bytes) y los recursos de
+/app/static/img (con el resumen del original en el nombre). El navegador
+las guarda un año y no vuelve a pedirlas al cambiar de página o de sesión.
+
+Antes de aceptar conexiones calienta el proceso (electromagnetismo.arranque):
+importaciones, matplotlib y los escenarios iniciales de las páginas A, B y
+C. Con EM_CALENTAR=0 arranca en frío, para comparar.
+"""
+import asyncio
+import contextlib
+
+import streamlit as st
+from starlette.middleware import Middleware
+
+from electromagnetismo import arranque
+
+# Prefijos de las URL que nunca cambian de contenido
+INMUTABLES = ("/media/", "/app/static/img/")
+CACHE_CONTROL = b"public, max-age=31536000, immutable"
+
+
+class CacheInmutable:
+    """Middleware ASGI que agrega Cache-Control a las respuestas 200 de las
+    rutas en INMUTABLES."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(INMUTABLES):
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start" and mensaje["status"] == 200:
+                encabezados = [(k, v) for k, v in mensaje.get("headers", [])
+                               if k.lower() != b"cache-control"]
+                encabezados.append((b"cache-control", CACHE_CONTROL))
+                mensaje = {**mensaje, "headers": encabezados}
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+
+
+@contextlib.asynccontextmanager
+async def calentar(app):
+    if arranque.CALENTAR:
+        # En un hilo, para no bloquear el bucle de eventos del servidor
+        tiempos = await asyncio.to_thread(arranque.calentar)
+        print(arranque.informe(tiempos), flush=True)
+    yield
+
+
+app = st.App("Introducción.py", lifespan=calentar, middleware=[Middleware(CacheInmutable)])